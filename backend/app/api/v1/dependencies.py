@@ -1,23 +1,46 @@
 """API dependencies for authentication and database"""
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthCredentials
-from sqlalchemy.orm import Session
-from app.database import get_db
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db
+from app.core.admission import TOKEN_CLAIMS_STATE
+from app.core.principal import Principal, principal_cache
 from app.core.security import decode_token
-from app.models.user import User
 from app.services.user_service import UserService
 
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+    request: Request = None,
+) -> Principal:
+    """Get current authenticated user
+
+    Resolved principals are cached per token, so repeat requests skip both
+    the JWT decode and the user lookup. Claims the admission control
+    middleware already decoded are reused.
+    """
     token = credentials.credentials
-    payload = decode_token(token)
+    decoded = getattr(request.state, TOKEN_CLAIMS_STATE, None) if request is not None else None
+    claims = decoded[1] if decoded is not None and decoded[0] == token else None
+    return await authenticate_token(token, db, claims)
+
+
+async def authenticate_token(token: str, db: AsyncSession, claims: Optional[dict] = None) -> Principal:
+    """Resolve a bearer token to its principal, raising 401 if it isn't valid
+
+    ``claims`` are the token's, if it has been decoded already.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    payload = claims if claims is not None else decode_token(token)
     
     if payload is None:
         raise HTTPException(
@@ -34,7 +57,8 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = UserService.get_user_by_username(db, username=username)
+    generation = principal_cache.generation()
+    user = await UserService.get_user_by_username(db, username=username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,4 +66,6 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
+    principal = Principal.from_user(user, payload)
+    principal_cache.put(token, principal, generation)
+    return principal
@@ -0,0 +1,95 @@
+"""Project and board analytics endpoints"""
+
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.dependencies import get_current_user
+from app.core.principal import Principal
+from app.db.session import get_db
+from app.jobs.handlers import REBUILD_ROLLUPS
+from app.jobs.queue import JobQueue
+from app.schemas.analytics import CumulativeFlow, CycleTimeStats, RebuildQueued
+from app.services.analytics_service import AnalyticsService
+from app.services.project_service import ProjectService
+
+router = APIRouter()
+
+DEFAULT_WINDOW_DAYS = 90
+MAX_WINDOW_DAYS = 366
+
+
+async def resolve_scope(
+    project_id: uuid.UUID,
+    board_id: Optional[uuid.UUID] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+) -> Tuple[uuid.UUID, date, date]:
+    """The board or project a chart covers and its date range (UTC days, inclusive)"""
+    if await ProjectService.get_project(db, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    if board_id is not None and not await AnalyticsService.board_in_project(db, board_id, project_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
+
+    until = until or datetime.utcnow().date()
+    since = since or until - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    if since > until:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="since must not be after until")
+    if (until - since).days >= MAX_WINDOW_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Range is limited to {MAX_WINDOW_DAYS} days"
+        )
+    return board_id or project_id, since, until
+
+
+@router.get("/{project_id}/analytics/flow", response_model=CumulativeFlow)
+async def get_cumulative_flow(
+    scope: Tuple[uuid.UUID, date, date] = Depends(resolve_scope),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Cumulative flow: tasks per status at the end of each day, and daily completions
+
+    Covers the project, or one board with ``board_id``; the range defaults
+    to the last 90 days.
+    """
+    return await AnalyticsService.cumulative_flow(db, *scope)
+
+
+@router.get("/{project_id}/analytics/cycle-time", response_model=CycleTimeStats)
+async def get_cycle_time(
+    scope: Tuple[uuid.UUID, date, date] = Depends(resolve_scope),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Cycle time (first leaving "todo" until done) of the tasks completed in the range
+
+    Covers the project, or one board with ``board_id``; the range defaults
+    to the last 90 days.
+    """
+    return await AnalyticsService.cycle_time(db, *scope)
+
+
+@router.post(
+    "/{project_id}/analytics/rebuild", response_model=RebuildQueued, status_code=status.HTTP_202_ACCEPTED
+)
+async def rebuild_analytics(
+    project_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Queue a recomputation of the project's rollups from its recorded transitions
+
+    For repairs and backfills; a background worker does the work.
+    """
+    if await ProjectService.get_project(db, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    job_id = await JobQueue.enqueue(
+        db, REBUILD_ROLLUPS, {"project_id": str(project_id)}, dedup_key=f"rollups:{project_id}"
+    )
+    await db.commit()
+    return RebuildQueued(job_id=job_id)
@@ -1,6 +1,16 @@
 """Health check endpoint"""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.admission import concurrency_limits
+from app.core.invalidation import invalidation_bus
+from app.core.principal import principal_cache
+from app.core.response_cache import response_cache
+from app.core.security import password_hasher
+from app.db.session import get_all_pool_stats, get_db
+from app.jobs.queue import JobQueue
+from app.realtime.hub import board_hub
 
 router = APIRouter()
 
@@ -12,3 +22,51 @@ async def health_check():
         "status": "ok",
         "message": "TaskFlow API is running"
     }
+
+
+@router.get("/health/db", tags=["health"])
+async def database_pool_stats():
+    """Per-engine pool usage: queries, checked-out connections, waiters and wait time"""
+    return get_all_pool_stats()
+
+
+@router.get("/health/auth-cache", tags=["health"])
+async def auth_cache_stats():
+    """Authenticated-principal cache hit and miss counters"""
+    return principal_cache.stats()
+
+
+@router.get("/health/cache", tags=["health"])
+async def response_cache_stats():
+    """Response cache hit rate per endpoint"""
+    return response_cache.stats()
+
+
+@router.get("/health/invalidation", tags=["health"])
+async def invalidation_stats():
+    """Cache invalidations exchanged with other workers and their publish-to-evict lag"""
+    return invalidation_bus.stats()
+
+
+@router.get("/health/hashing", tags=["health"])
+async def password_hashing_stats():
+    """Password hashing pool concurrency and queue depth"""
+    return password_hasher.stats()
+
+
+@router.get("/health/realtime", tags=["health"])
+async def realtime_stats():
+    """Board subscribers and event delivery counters for this worker"""
+    return board_hub.stats()
+
+
+@router.get("/health/admission", tags=["health"])
+async def admission_stats():
+    """Requests in flight against this worker's limits, and how many were turned away"""
+    return concurrency_limits.stats()
+
+
+@router.get("/health/jobs", tags=["health"])
+async def job_queue_stats(db: AsyncSession = Depends(get_db)):
+    """Queued, running and failed jobs per kind, and how long the oldest due job has waited"""
+    return await JobQueue.depth(db)
@@ -0,0 +1,305 @@
+"""Project endpoints"""
+
+import uuid
+from typing import List, Optional
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.dependencies import get_current_user
+from app.core.pagination import InvalidCursor
+from app.core.principal import Principal
+from app.core.response_cache import boards_key, project_key, response_cache
+from app.core.responses import rows_to_dicts
+from app.db.session import get_db
+from app.schemas.board import BoardSummary
+from app.schemas.project import ProjectChanges, ProjectResponse, ProjectSnapshot
+from app.schemas.task import TaskImportResponse, TaskPage, TaskPriority, TaskResponse, TaskStatus
+from app.services.export_service import FORMATS, ExportService
+from app.services.import_service import ImportConflict, ImportService, InvalidUpload
+from app.services.project_service import ProjectService
+from app.services.search_service import SearchService
+from app.services.task_service import TaskService
+
+router = APIRouter()
+
+_board_list = TypeAdapter(List[BoardSummary])
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header matches ``etag``"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Whether the request's Accept-Encoding allows gzip"""
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def json_response(body: bytes) -> Response:
+    """Wrap an already serialized JSON body"""
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/{project_id}", response_model=ProjectResponse)
+async def get_project(
+    project_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Get a project (served from the response cache)"""
+    async def load() -> Optional[bytes]:
+        project = await ProjectService.get_project(db, project_id)
+        if project is None:
+            return None
+        return ProjectResponse.model_validate(project).model_dump_json().encode()
+
+    body = await response_cache.get_or_load("project", project_key(project_id), load)
+    if body is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return json_response(body)
+
+
+@router.get("/{project_id}/boards", response_model=List[BoardSummary])
+async def list_project_boards(
+    project_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """List a project's boards with task counts (served from the response cache)"""
+    async def load() -> Optional[bytes]:
+        boards = await ProjectService.list_boards(db, project_id)
+        if boards is None:
+            return None
+        return _board_list.dump_json(boards)
+
+    body = await response_cache.get_or_load("project_boards", boards_key(project_id), load)
+    if body is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return json_response(body)
+
+
+@router.get(
+    "/{project_id}/snapshot",
+    response_model=ProjectSnapshot,
+    responses={304: {"description": "Snapshot unchanged since the given ETag"}},
+)
+async def get_project_snapshot(
+    project_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Project, boards and tasks in one response
+
+    Clients should send the returned ETag back in ``If-None-Match``; an
+    unchanged project answers ``304 Not Modified`` after a single query.
+    """
+    etag = await ProjectService.get_snapshot_etag(db, project_id)
+    if etag is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    snapshot = await ProjectService.get_snapshot(db, project_id)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return ORJSONResponse(snapshot, headers=headers)
+
+
+@router.get("/{project_id}/changes", response_model=ProjectChanges)
+async def get_project_changes(
+    project_id: uuid.UUID,
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Project, board and task rows changed since a cursor, plus deletions
+
+    Start without ``since`` to get everything, then pass the returned
+    ``next_cursor`` as ``since``; repeat while ``has_more`` is true.
+    """
+    try:
+        changes = await ProjectService.get_changes(db, project_id, cursor=since, limit=limit)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if changes is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return changes
+
+
+@router.get("/{project_id}/tasks", response_model=TaskPage)
+async def list_project_tasks(
+    project_id: uuid.UUID,
+    board_id: Optional[uuid.UUID] = None,
+    status_filter: Optional[TaskStatus] = Query(None, alias="status"),
+    priority: Optional[TaskPriority] = None,
+    assignee: Optional[uuid.UUID] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """List a project's tasks, most recently updated first
+
+    Results are cursor-paginated: pass the returned ``next_cursor`` as
+    ``cursor`` to get the next page. Archived tasks are left out unless
+    ``include_archived`` is set; then each item also carries
+    ``archived_at``.
+    """
+    if await ProjectService.get_project(db, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    try:
+        tasks, next_cursor = await TaskService.list_project_tasks(
+            db,
+            project_id,
+            board_id=board_id,
+            status=status_filter.value if status_filter else None,
+            priority=priority.value if priority else None,
+            assignee=assignee,
+            cursor=cursor,
+            limit=limit,
+            include_archived=include_archived,
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    return ORJSONResponse({"items": rows_to_dicts(tasks), "next_cursor": next_cursor})
+
+
+@router.get("/{project_id}/search", response_model=TaskPage)
+async def search_project_tasks(
+    project_id: uuid.UUID,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Full-text search over a project's task titles and descriptions
+
+    Results are ranked by relevance; the last word matches as a prefix.
+    """
+    if await ProjectService.get_project(db, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    try:
+        tasks, next_cursor = await SearchService.search_project_tasks(
+            db, project_id, q, cursor=cursor, limit=limit
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    return TaskPage(
+        items=[TaskResponse.model_validate(task) for task in tasks],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/{project_id}/export")
+async def export_project_tasks(
+    request: Request,
+    project_id: uuid.UUID,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Download every task of a project as NDJSON or CSV
+
+    The file is streamed as it is read, gzip-compressed when the client
+    accepts it, so exports of any size use the same memory.
+    """
+    if await ProjectService.get_project(db, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    gzip = accepts_gzip(request)
+
+    async def body():
+        # The request's session is closed before the body is sent; the stream reopens it and closes it after
+        try:
+            async for chunk in ExportService.stream_tasks(
+                db, project_id, export_format, include_archived=include_archived, gzip=gzip
+            ):
+                yield chunk
+        except BaseException:
+            # Cancelled mid-fetch when the client goes away: the connection can't be trusted, discard it
+            with anyio.CancelScope(shield=True):
+                await db.invalidate()
+            raise
+        await db.close()
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="project-{project_id}.{export_format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body(), media_type=FORMATS[export_format], headers=headers)
+
+
+@router.put("/{project_id}/imports/{import_id}", response_model=TaskImportResponse)
+async def import_project_tasks(
+    request: Request,
+    project_id: uuid.UUID,
+    import_id: uuid.UUID,
+    import_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Create tasks in bulk from an NDJSON or CSV upload
+
+    Choose a new id for the import and send the file as the body,
+    gzip-compressed with ``Content-Encoding: gzip`` if you like. Rows are
+    validated and written in batches as they arrive; the response counts
+    imported and rejected rows and lists the reasons. If the upload breaks
+    off, send the same file to the same URL again to carry on where it
+    stopped.
+    """
+    if await ProjectService.get_project(db, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    encoding = request.headers.get("content-encoding", "identity").strip().lower()
+    if encoding not in ("identity", "gzip"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Content-Encoding must be gzip or identity"
+        )
+    try:
+        return await ImportService.import_tasks(
+            db, project_id, import_id, import_format, request.stream(),
+            gzip=encoding == "gzip", created_by=current_user.id,
+        )
+    except ImportConflict as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    except InvalidUpload as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.get("/{project_id}/imports/{import_id}", response_model=TaskImportResponse)
+async def get_project_import(
+    project_id: uuid.UUID,
+    import_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Progress of an import, including while its upload is still running"""
+    task_import = await ImportService.get_import(db, import_id)
+    if task_import is None or task_import.project_id != project_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import not found")
+    return task_import
@@ -0,0 +1,136 @@
+"""Task endpoints"""
+
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.dependencies import get_current_user
+from app.core.principal import Principal
+from app.core.ranking import needs_rebalance
+from app.db.session import get_db
+from app.jobs.handlers import REBALANCE_COLUMN
+from app.jobs.queue import JobQueue
+from app.schemas.task import (
+    TaskBatchRequest,
+    TaskBatchResponse,
+    TaskCreate,
+    TaskMove,
+    TaskResponse,
+    TaskUpdate,
+)
+from app.services.archive_service import ArchiveService
+from app.services.task_service import InvalidMove, TaskService
+
+router = APIRouter()
+
+
+@router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+async def create_task(
+    task: TaskCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Create a task"""
+    return await TaskService.create_task(db, task)
+
+
+@router.post(":batch", response_model=TaskBatchResponse)
+async def batch_tasks(
+    batch: TaskBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Apply many create/update/move/delete operations in one transaction
+
+    Every operation gets a result at its index; invalid ones are skipped
+    and don't prevent the rest from being applied.
+    """
+    results = await TaskService.apply_batch(db, batch.operations)
+    applied = sum(1 for result in results if result.ok)
+    return TaskBatchResponse(applied=applied, failed=len(results) - applied, results=results)
+
+
+@router.get("/{task_id}", response_model=TaskResponse)
+async def get_task(
+    task_id: uuid.UUID,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Get a task; archived tasks are found only with ``include_archived``"""
+    task = await TaskService.get_task(db, task_id)
+    if task is None and include_archived:
+        task = await ArchiveService.get_archived_task(db, task_id)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return task
+
+
+@router.patch("/{task_id}", response_model=TaskResponse)
+async def update_task(
+    task_id: uuid.UUID,
+    task_update: TaskUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Update a task"""
+    task = await TaskService.update_task(db, task_id, task_update)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return task
+
+
+@router.post("/{task_id}/move", response_model=TaskResponse)
+async def move_task(
+    task_id: uuid.UUID,
+    move: TaskMove,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Move a task between two others, or to the end of a column
+
+    Only the moved task's row is written. When its new rank grows too
+    long, a job to respace the column is queued.
+    """
+    try:
+        task = await TaskService.move_task(db, task_id, move)
+    except InvalidMove as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+    if needs_rebalance(task.rank):
+        await JobQueue.enqueue(
+            db,
+            REBALANCE_COLUMN,
+            {"board_id": str(task.board_id), "status": task.status},
+            dedup_key=f"rebalance:{task.board_id}:{task.status}",
+        )
+        await db.commit()
+    return task
+
+
+@router.post("/{task_id}/restore", response_model=TaskResponse)
+async def restore_task(
+    task_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Bring an archived task back to the end of its column"""
+    task = await ArchiveService.restore_task(db, task_id)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archived task not found")
+    return task
+
+
+@router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_task(
+    task_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Delete a task"""
+    if not await TaskService.delete_task(db, task_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,31 @@
+"""User endpoints"""
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.dependencies import get_current_user
+from app.core.principal import Principal
+from app.core.response_cache import response_cache, user_key
+from app.db.session import get_db
+from app.schemas.user import UserResponse
+from app.services.user_service import UserService
+
+router = APIRouter()
+
+
+@router.get("/me", response_model=UserResponse)
+async def get_my_profile(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Get the current user's profile (served from the response cache)"""
+    async def load():
+        user = await UserService.get_user_by_id(db, current_user.id)
+        if user is None:
+            return None
+        return UserResponse.model_validate(user).model_dump_json().encode()
+
+    body = await response_cache.get_or_load("user_profile", user_key(current_user.id), load)
+    if body is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,285 @@
+"""Admission control: shed excess load with fast 429 and 503 responses.
+
+:class:`AdmissionControlMiddleware` turns requests away before they reach
+the database, rather than letting them queue for a pooled connection:
+
+* a token bucket per client caps its request rate; over it, the request
+  gets ``429 Too Many Requests``. Clients are keyed by the ``sub`` of a
+  valid bearer token (the principal ``get_current_user`` will resolve) or,
+  without one, by their IP address. A token decoded here is left on
+  ``request.state`` for ``get_current_user``, so it is decoded once. Behind
+  a proxy, run uvicorn with ``--proxy-headers --forwarded-allow-ips`` so the
+  address is the client's from ``X-Forwarded-For``, not the proxy's. Buckets live in this process
+  (:class:`MemoryRateLimitBackend`) or in Redis, shared by every worker
+  (:class:`RedisRateLimitBackend`);
+* :class:`ConcurrencyLimits` caps the requests in flight in this worker,
+  overall and per route template, at the size of its connection pool; past
+  either cap the request gets ``503 Service Unavailable``. One slow or hot
+  endpoint can then hold at most a share of the pool.
+
+Both responses carry ``Retry-After``. Admitted responses report the
+client's bucket in ``X-RateLimit-Limit`` and ``X-RateLimit-Remaining``.
+"""
+
+import logging
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.principal import principal_cache
+from app.core.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+# request.state attribute holding ``(token, claims)`` when the middleware decoded a bearer token
+TOKEN_CLAIMS_STATE = "token_claims"
+
+
+class RateLimitBackend:
+    """Storage for token buckets."""
+
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[float, float]:
+        """Take one token from ``key``'s bucket, which refills at ``rate`` per second up to ``burst``
+
+        Returns ``(wait, remaining)``: ``wait`` is 0 when a token was taken,
+        otherwise the seconds until one will be available.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets, bounded by key count.
+
+    A bucket left alone for long enough to refill completely is dropped;
+    recreating it full is equivalent.
+    """
+
+    def __init__(self, max_keys: int, timer=time.monotonic) -> None:
+        self._buckets = TTLCache(max_keys, math.inf, timer=timer)
+        self.timer = timer
+
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[float, float]:
+        now = self.timer()
+        state = self._buckets.get(key)
+        tokens = burst if state is None else min(burst, state[0] + (now - state[1]) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets.set(key, (tokens, now), ttl=(burst - tokens) / rate)
+        return wait, tokens
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+# Refill, take and store atomically, on the Redis clock so workers agree
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(state[1]) or burst
+local at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - at) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1)
+return {tostring(wait), tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets shared by every worker. Requires the optional ``redis`` package.
+
+    If Redis can't be reached requests are let through, so the limiter
+    can't take the API down with it.
+    """
+
+    def __init__(self, url: str, prefix: str = "taskflow:ratelimit:") -> None:
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._take = self._redis.register_script(_TAKE_SCRIPT)
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[float, float]:
+        try:
+            wait, tokens = await self._take(keys=[self.prefix + key], args=[rate, burst])
+        except Exception:
+            logger.warning("Rate limit backend unavailable; admitting request", exc_info=True)
+            return 0.0, float(burst)
+        return float(wait), float(tokens)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class ConcurrencyLimits:
+    """Requests in flight in this worker, overall and per route template."""
+
+    def __init__(self, max_in_flight: int, per_route: int) -> None:
+        self.max_in_flight = max_in_flight
+        self.per_route = per_route
+        self.in_flight = 0
+        self.routes: Dict[str, int] = {}
+        self.rejected = 0
+
+    def acquire(self, route: Optional[str]) -> bool:
+        """Admit a request for ``route`` if both limits allow it; never waits"""
+        if self.in_flight >= self.max_in_flight or (
+            route is not None and self.routes.get(route, 0) >= self.per_route
+        ):
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        if route is not None:
+            self.routes[route] = self.routes.get(route, 0) + 1
+        return True
+
+    def release(self, route: Optional[str]) -> None:
+        self.in_flight -= 1
+        if route is not None:
+            self.routes[route] -= 1
+
+    def stats(self) -> dict:
+        """Limits, current usage and the number of requests turned away"""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "per_route": self.per_route,
+            "in_flight": self.in_flight,
+            "routes": {route: count for route, count in self.routes.items() if count},
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionControlMiddleware:
+    """Rate-limit clients and cap in-flight requests, see the module docstring.
+
+    ``routes`` is the application's route list (``app.router.routes``),
+    used to find the route template a request is for before it is routed.
+    Paths starting with one of ``exempt`` are never limited.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: RateLimitBackend,
+        limits: ConcurrencyLimits,
+        routes: List[BaseRoute],
+        user_rate: Tuple[float, int],
+        ip_rate: Tuple[float, int],
+        exempt: Iterable[str] = (),
+        retry_after: int = 1,
+    ) -> None:
+        self.app = app
+        self.backend = backend
+        self.limits = limits
+        self.routes = routes
+        self.user_rate = user_rate
+        self.ip_rate = ip_rate
+        self.exempt = tuple(exempt)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt):
+            await self.app(scope, receive, send)
+            return
+
+        key, (rate, burst) = self._client(scope)
+        wait, remaining = await self.backend.take(key, rate, burst)
+        if wait > 0:
+            response = _reject(429, "Rate limit exceeded", math.ceil(wait), burst, 0)
+            await response(scope, receive, send)
+            return
+
+        route = self._route(scope)
+        if not self.limits.acquire(route):
+            response = _reject(503, "Server busy", self.retry_after, burst, remaining)
+            await response(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(burst)
+                headers["X-RateLimit-Remaining"] = str(int(remaining))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.limits.release(route)
+
+    def _client(self, scope: Scope) -> Tuple[str, Tuple[float, int]]:
+        """Bucket key and ``(rate, burst)`` for the request's client"""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer" or not token:
+                    break
+                principal = principal_cache.get(token)
+                if principal is not None:
+                    claims = principal.claims
+                else:
+                    claims = decode_token(token)
+                    # get_current_user picks these up rather than decoding the token again
+                    scope.setdefault("state", {})[TOKEN_CLAIMS_STATE] = (token, claims)
+                if claims and claims.get("sub"):
+                    return f"user:{claims['sub']}", self.user_rate
+                break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}", self.ip_rate
+
+    def _route(self, scope: Scope) -> Optional[str]:
+        """Template of the route that will serve the request, ``None`` if none will"""
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                # Lets the metrics middleware attribute rejected requests to their route
+                scope["route"] = route
+                return route.path
+        return None
+
+
+def _reject(status: int, detail: str, retry_after: int, limit: int, remaining: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status,
+        headers={
+            "Retry-After": str(retry_after),
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(int(remaining)),
+        },
+    )
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    """Build the backend chosen by ``RATE_LIMIT_BACKEND``."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend(settings.REDIS_URL)
+    return MemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+
+def pool_capacity() -> int:
+    """Connections one worker's pool can hand out at once"""
+    return settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+
+concurrency_limits = ConcurrencyLimits(
+    max_in_flight=pool_capacity(),
+    per_route=max(1, math.ceil(pool_capacity() * settings.ADMISSION_ROUTE_SHARE)),
+)
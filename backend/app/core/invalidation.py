@@ -0,0 +1,257 @@
+"""Buses that carry cache invalidations between application workers.
+
+When a transaction commits, the worker that ran it evicts the affected
+keys from its own caches at once and publishes them here; every other
+worker evicts them as they arrive (see
+:func:`app.core.response_cache.evict_keys`), so in-process caches stay
+coherent across workers and pods.
+
+:class:`PostgresInvalidationBus` sends the keys with ``NOTIFY`` and
+receives them on a ``LISTEN`` connection of its own, so no other broker is
+needed. If that connection drops, notifications may have been missed and
+the worker clears its caches before listening again.
+:class:`InMemoryInvalidationBus` connects buses within one process, for a
+single worker and the tests.
+
+Each message carries its send time; receivers record the lag from publish
+to eviction.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import Callable, Deque, Iterable, Iterator, List, Optional
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Evicts the given keys; ``None`` means every key, after messages may have been lost
+Deliver = Callable[[Optional[List[str]]], None]
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_PAYLOAD_BYTES = 7000
+
+
+def encode(origin: str, sent_at: float, keys: Iterable[str]) -> Iterator[str]:
+    """Messages carrying ``keys``, split to fit a notification payload"""
+    batch: List[str] = []
+    size = 0
+    for key in keys:
+        if batch and size + len(key) + 4 > MAX_PAYLOAD_BYTES:
+            yield json.dumps({"o": origin, "t": sent_at, "k": batch})
+            batch, size = [], 0
+        batch.append(key)
+        size += len(key) + 4
+    if batch:
+        yield json.dumps({"o": origin, "t": sent_at, "k": batch})
+
+
+def _percentile(samples: List[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class InvalidationBus:
+    """Interface for sharing committed cache keys with every other worker."""
+
+    def __init__(self, window: int = 1000) -> None:
+        self.origin = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.published = 0
+        self.received = 0
+        self.resets = 0
+        self._deliver: Optional[Deliver] = None
+        self._lags: Deque[float] = deque(maxlen=window)
+
+    async def start(self, deliver: Deliver) -> None:
+        """Begin evicting keys other workers publish with ``deliver``."""
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
+
+    def publish(self, keys: Iterable[str]) -> None:
+        """Send ``keys`` to every other worker; callable from synchronous session events."""
+        raise NotImplementedError
+
+    def receive(self, message: str) -> None:
+        """Evict the keys of a message from another worker and record how long it took to arrive."""
+        payload = json.loads(message)
+        if payload["o"] == self.origin or self._deliver is None:
+            return
+        self._deliver(payload["k"])
+        self.received += 1
+        self._lags.append(time.time() - payload["t"])
+
+    def reset(self) -> None:
+        """Evict everything: messages may have been missed."""
+        self.resets += 1
+        if self._deliver is not None:
+            self._deliver(None)
+
+    def stats(self) -> dict:
+        """Messages sent and received, and publish-to-evict lag of recent ones"""
+        lags = list(self._lags)
+
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "bus": type(self).__name__,
+            "published": self.published,
+            "received": self.received,
+            "resets": self.resets,
+            "lag_ms_p50": ms(_percentile(lags, 50)),
+            "lag_ms_p99": ms(_percentile(lags, 99)),
+            "lag_ms_max": ms(max(lags, default=None)),
+        }
+
+
+class InMemoryInvalidationBus(InvalidationBus):
+    """Delivers synchronously to the other started buses on the same ``network``.
+
+    With its own network (the default) a bus has no peers, which is right
+    for a single worker.
+    """
+
+    def __init__(self, network: Optional[List["InMemoryInvalidationBus"]] = None) -> None:
+        super().__init__()
+        self.network = network if network is not None else []
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        if self not in self.network:
+            self.network.append(self)
+
+    async def stop(self) -> None:
+        if self in self.network:
+            self.network.remove(self)
+        self._deliver = None
+
+    def publish(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        for message in encode(self.origin, time.time(), keys):
+            self.published += 1
+            for peer in list(self.network):
+                peer.receive(message)
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """``NOTIFY`` on commit, ``LISTEN`` in every worker. Requires ``asyncpg``.
+
+    Publishing never blocks the committing request: keys are queued and a
+    background task sends whatever has accumulated on a connection of its
+    own, coalescing bursts into few notifications.
+    """
+
+    def __init__(self, dsn: str, channel: str = "taskflow_invalidate", reconnect_seconds: float = 1.0) -> None:
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self._listener = None
+        self._publisher = None
+        self._pending: List[tuple] = []
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        await self._listen()
+        self._tasks.append(asyncio.create_task(self._send()))
+
+    async def stop(self) -> None:
+        self._deliver = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        for connection in (self._listener, self._publisher):
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        self._listener = self._publisher = None
+
+    def publish(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if keys and self._deliver is not None:
+            self._pending.append((time.time(), keys))
+            self._wakeup.set()
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        self._listener = await asyncpg.connect(self.dsn)
+        self._listener.add_termination_listener(self._lost)
+        await self._listener.add_listener(self.channel, self._notified)
+
+    def _notified(self, connection, pid, channel, payload) -> None:
+        try:
+            self.receive(payload)
+        except Exception:
+            logger.exception("Bad invalidation message: %r", payload)
+
+    def _lost(self, connection) -> None:
+        if self._deliver is None:
+            return
+        logger.warning("Invalidation listener disconnected; clearing caches and reconnecting")
+        self.reset()
+        self._tasks.append(asyncio.get_running_loop().create_task(self._reconnect()))
+
+    async def _reconnect(self) -> None:
+        while self._deliver is not None:
+            await asyncio.sleep(self.reconnect_seconds)
+            try:
+                await self._listen()
+            except Exception:
+                logger.warning("Invalidation listener reconnect failed", exc_info=True)
+                continue
+            # Anything published while we were away was missed
+            self.reset()
+            return
+
+    async def _send(self) -> None:
+        import asyncpg
+
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            pending, self._pending = self._pending, []
+            # Coalesce: one send time (the earliest, so lag isn't understated) for every queued key
+            sent_at = min(at for at, _ in pending)
+            keys = list(dict.fromkeys(key for _, batch in pending for key in batch))
+            try:
+                if self._publisher is None or self._publisher.is_closed():
+                    self._publisher = await asyncpg.connect(self.dsn)
+                for message in encode(self.origin, sent_at, keys):
+                    await self._publisher.execute("SELECT pg_notify($1, $2)", self.channel, message)
+                    self.published += 1
+            except Exception:
+                # Other workers keep these keys until their TTL runs out
+                logger.warning("Publishing %d invalidations failed", len(keys), exc_info=True)
+                self._publisher = None
+
+
+def create_invalidation_bus() -> InvalidationBus:
+    """Build the bus chosen by ``INVALIDATION_BUS``; ``auto`` uses PostgreSQL when the database is PostgreSQL."""
+    url = make_url(settings.DATABASE_URL)
+    kind = settings.INVALIDATION_BUS
+    if kind == "auto":
+        kind = "postgres" if url.get_backend_name() == "postgresql" else "memory"
+    if kind == "postgres":
+        return PostgresInvalidationBus(url.set(drivername="postgresql").render_as_string(hide_password=False))
+    if kind == "memory":
+        return InMemoryInvalidationBus()
+    raise ValueError(f"Unsupported invalidation bus: {kind}")
+
+
+invalidation_bus = create_invalidation_bus()
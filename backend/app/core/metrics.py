@@ -0,0 +1,254 @@
+"""Per-request performance metrics.
+
+:class:`MetricsMiddleware` times every HTTP request and, through the
+engine hooks in :mod:`app.db.session`, counts the SQL statements it ran,
+the time spent executing them and the time spent waiting for a pooled
+connection. Observations are kept per route template (``/projects/{project_id}``,
+never the raw path) in :data:`metrics` and rendered in the Prometheus text
+format by :meth:`MetricsRegistry.render`.
+"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PREFIX = "taskflow"
+
+# Routing failed (404 or 405); kept as one label so unknown paths can't grow the registry
+UNMATCHED = "unmatched"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+SIZE_BUCKETS = (128, 1024, 10240, 102400, 1048576, 10485760)
+
+
+class RequestMetrics:
+    """Database work done while serving one request."""
+
+    __slots__ = ("statements", "db_time", "pool_wait", "_statement_start")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+        self._statement_start = 0.0
+
+
+_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def get_request_metrics() -> Optional[RequestMetrics]:
+    """Return the metrics of the current request, if any."""
+    return _request_metrics.get()
+
+
+def statement_started() -> None:
+    """Note that a statement is about to run for the current request."""
+    current = _request_metrics.get()
+    if current is not None:
+        current._statement_start = time.perf_counter()
+
+
+def statement_finished() -> None:
+    """Count the statement started last and its execution time."""
+    current = _request_metrics.get()
+    if current is not None and current._statement_start:
+        current.statements += 1
+        current.db_time += time.perf_counter() - current._statement_start
+        current._statement_start = 0.0
+
+
+def record_pool_wait(seconds: float) -> None:
+    """Add time spent waiting for a pooled connection to the current request."""
+    current = _request_metrics.get()
+    if current is not None:
+        current.pool_wait += seconds
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; made cumulative when rendered
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def observe_zero(self) -> None:
+        self.counts[0] += 1
+        self.count += 1
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """``(suffix, le, value)`` for every bucket, then sum and count"""
+        running = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            running += count
+            yield "_bucket", _format(bound), running
+        yield "_sum", "", self.sum
+        yield "_count", "", self.count
+
+
+class RouteMetrics:
+    """Histograms and status counts for one method and route template."""
+
+    __slots__ = ("latency", "statements", "db_time", "pool_wait", "response_size", "statuses")
+
+    def __init__(self) -> None:
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.pool_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+        self.statuses: Dict[int, int] = {}
+
+
+# (attribute, metric name, help) in exposition order
+HISTOGRAMS = (
+    ("latency", "http_request_duration_seconds", "Time to serve the request"),
+    ("statements", "db_statements_per_request", "SQL statements executed per request"),
+    ("db_time", "db_time_per_request_seconds", "Time spent executing SQL per request"),
+    ("pool_wait", "db_pool_wait_per_request_seconds", "Time spent waiting for a pooled connection per request"),
+    ("response_size", "http_response_size_bytes", "Response body size"),
+)
+
+
+class MetricsRegistry:
+    """Per-route request metrics for this worker."""
+
+    def __init__(self) -> None:
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def observe(
+        self, method: str, route: str, status: int, latency: float, request: RequestMetrics, size: int
+    ) -> None:
+        """Record one finished request"""
+        entry = self.routes.get((method, route))
+        if entry is None:
+            entry = self.routes[(method, route)] = RouteMetrics()
+        entry.latency.observe(latency)
+        entry.response_size.observe(size)
+        if request.statements:
+            entry.statements.observe(request.statements)
+            entry.db_time.observe(request.db_time)
+            entry.pool_wait.observe(request.pool_wait)
+        else:
+            # Requests that never touch the database (health checks) take the cheap path
+            entry.statements.observe_zero()
+            entry.db_time.observe_zero()
+            entry.pool_wait.observe_zero()
+        entry.statuses[status] = entry.statuses.get(status, 0) + 1
+
+    def clear(self) -> None:
+        self.routes.clear()
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        routes = sorted(self.routes.items())
+        lines: List[str] = [
+            f"# HELP {PREFIX}_http_requests_total Requests served, by status",
+            f"# TYPE {PREFIX}_http_requests_total counter",
+        ]
+        for (method, route), entry in routes:
+            for status, count in sorted(entry.statuses.items()):
+                labels = _labels(method=method, route=route, status=str(status))
+                lines.append(f"{PREFIX}_http_requests_total{{{labels}}} {count}")
+
+        for attribute, name, help_text in HISTOGRAMS:
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+            for (method, route), entry in routes:
+                labels = _labels(method=method, route=route)
+                for suffix, le, value in getattr(entry, attribute).samples():
+                    bucket = f',le="{le}"' if le else ""
+                    lines.append(f"{PREFIX}_{name}{suffix}{{{labels}{bucket}}} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Record latency, SQL work and response size of each HTTP request.
+
+    With ``server_timing`` the response also carries a ``Server-Timing``
+    header with the app, db and pool-wait durations, which browser dev
+    tools display next to the request.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics, server_timing: bool = False) -> None:
+        self.app = app
+        self.registry = registry
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        current = RequestMetrics()
+        token = _request_metrics.set(current)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", _server_timing(current, start))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_metrics.reset(token)
+            route = scope.get("route")
+            self.registry.observe(
+                scope["method"],
+                route.path if route is not None else UNMATCHED,
+                status,
+                time.perf_counter() - start,
+                current,
+                size,
+            )
+
+
+def _server_timing(current: RequestMetrics, start: float) -> str:
+    elapsed = (time.perf_counter() - start) * 1000
+    return (
+        f"app;dur={elapsed:.1f}, "
+        f'db;dur={current.db_time * 1000:.1f};desc="{current.statements} statements", '
+        f"pool;dur={current.pool_wait * 1000:.1f}"
+    )
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
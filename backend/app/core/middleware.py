@@ -0,0 +1,94 @@
+"""ASGI middleware."""
+
+import logging
+import math
+import time
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.query_budget import QueryBudget, query_budget, record_queries
+from app.db.routing import begin_request_routing, end_request_routing, get_request_routing
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_COOKIE = "tf_primary_until"
+
+
+class DatabaseRoutingMiddleware:
+    """Track primary/replica routing for each HTTP request.
+
+    A request that writes gets a short-lived cookie; follow-up requests
+    carrying it keep reading from the primary until replicas have caught up.
+    Responses report the engines that served them in ``X-DB-Served-By``.
+    """
+
+    def __init__(self, app: ASGIApp, sticky_seconds: float = 5.0) -> None:
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = begin_request_routing(stick_to_primary=self._is_sticky(scope))
+        routing = get_request_routing()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if routing.served_by:
+                    headers.append("X-DB-Served-By", ",".join(sorted(routing.served_by)))
+                if routing.wrote and self.sticky_seconds > 0:
+                    until = time.time() + self.sticky_seconds
+                    headers.append(
+                        "Set-Cookie",
+                        f"{PRIMARY_COOKIE}={until:.3f}; Max-Age={math.ceil(self.sticky_seconds)}; "
+                        "Path=/; HttpOnly; SameSite=Lax",
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            end_request_routing(token)
+
+    def _is_sticky(self, scope: Scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name != b"cookie":
+                continue
+            morsel = SimpleCookie(value.decode("latin-1")).get(PRIMARY_COOKIE)
+            if morsel is None:
+                continue
+            try:
+                return float(morsel.value) > time.time()
+            except ValueError:
+                return False
+        return False
+
+
+class QueryBudgetMiddleware:
+    """Log HTTP requests that break the SQL statement budget.
+
+    Meant for development (``QUERY_BUDGET``): the warning lists every
+    statement the request ran, so N+1 loops show up while clicking around.
+    """
+
+    def __init__(self, app: ASGIApp, budget: QueryBudget = query_budget) -> None:
+        self.app = app
+        self.budget = budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with record_queries() as log:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                violation = self.budget.check(f"{scope['method']} {scope['path']}", log)
+                if violation is not None:
+                    logger.warning("Query budget exceeded: %s", violation)
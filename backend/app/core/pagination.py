@@ -0,0 +1,29 @@
+"""Opaque cursors for keyset pagination."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor this API did not issue."""
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack the sort-key values of the last row on a page into a cursor."""
+    payload = [value.isoformat() if isinstance(value, datetime) else str(value) for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """Unpack a cursor made by :func:`encode_cursor` into ``size`` raw values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Malformed cursor")
+    return values
@@ -0,0 +1,127 @@
+"""Authenticated principal and its per-token cache.
+
+``get_current_user`` resolves a bearer token to a :class:`Principal` once and
+serves repeat requests from :data:`principal_cache` until the entry's TTL
+or the token's own expiry, whichever comes first. Once a change to a user
+commits, :mod:`app.core.response_cache` evicts every cached token for that
+user, on this worker and the others, and a principal read from the
+database before that change is not cached afterwards: callers take
+:meth:`PrincipalCache.generation` before the read and pass it to ``put``.
+"""
+
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Optional, Set
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Snapshot of the authenticated user plus the token claims."""
+
+    id: uuid.UUID
+    email: str
+    name: str
+    is_active: bool
+    claims: dict = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def from_user(cls, user: User, claims: dict) -> "Principal":
+        """Build a snapshot of ``user`` authenticated by ``claims``."""
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            is_active=bool(user.is_active),
+            claims=dict(claims),
+        )
+
+
+class PrincipalCache:
+    """Token -> :class:`Principal` cache with per-user invalidation."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache = TTLCache(maxsize, ttl, on_evict=self._forget_token)
+        self._tokens_by_user: Dict[uuid.UUID, Set[str]] = {}
+        self._user_by_token: Dict[str, uuid.UUID] = {}
+        # Generation at which each user was last invalidated, oldest first, and
+        # the newest generation already dropped from it to keep it bounded
+        self._generation = 0
+        self._invalidated_at: Dict[uuid.UUID, int] = {}
+        self._floor = 0
+        self._max_tracked = maxsize
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[Principal]:
+        """Return the cached principal for ``token``."""
+        return self._cache.get(token)
+
+    def generation(self) -> int:
+        """Return the current generation, to be taken before reading a principal."""
+        return self._generation
+
+    def put(self, token: str, principal: Principal, generation: Optional[int] = None) -> None:
+        """Cache ``principal`` until the cache TTL or the token's ``exp`` claim.
+
+        With ``generation``, the principal is dropped instead if its user was
+        invalidated (or the cache cleared) since that generation was taken.
+        """
+        if generation is not None and (
+            generation < self._floor or self._invalidated_at.get(principal.id, 0) > generation
+        ):
+            return
+        ttl = None
+        expires_at = principal.claims.get("exp")
+        if expires_at is not None:
+            ttl = float(expires_at) - time.time()
+        if self._cache.set(token, principal, ttl):
+            self._user_by_token[token] = principal.id
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        """Evict every cached token that belongs to ``user_id``."""
+        self._generation += 1
+        self._invalidated_at.pop(user_id, None)
+        self._invalidated_at[user_id] = self._generation
+        if len(self._invalidated_at) > self._max_tracked:
+            oldest = next(iter(self._invalidated_at))
+            self._floor = self._invalidated_at.pop(oldest)
+        tokens = self._tokens_by_user.pop(user_id, set())
+        for token in tokens:
+            self._cache.delete(token)
+        if tokens:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every cached principal."""
+        self._generation += 1
+        self._invalidated_at.clear()
+        self._floor = self._generation
+        self._cache.clear()
+
+    def reset_stats(self) -> None:
+        """Zero the cache counters."""
+        self._cache.reset_stats()
+        self.invalidations = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for the cache."""
+        return {**self._cache.stats(), "invalidations": self.invalidations}
+
+    def _forget_token(self, token: Hashable) -> None:
+        user_id = self._user_by_token.pop(token, None)
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
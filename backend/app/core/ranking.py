@@ -0,0 +1,88 @@
+"""Lexicographic ranks for ordering tasks within a column.
+
+Ranks are base-36 strings compared as plain strings. A rank can always be
+generated between any two others, so moving a card rewrites only that
+card's row. Ranks never end in ``"0"``, which keeps string order identical
+to the order of the fractions they represent. Only digits and lowercase
+letters are used, so every database collation sorts them the same way.
+"""
+
+from typing import Iterator, List, Optional
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+# Width of ranks produced when appending to the end of a column
+APPEND_WIDTH = 6
+
+# Ranks longer than this trigger a rebalance of their column
+MAX_RANK_LENGTH = 24
+
+
+def rank_between(before: Optional[str] = None, after: Optional[str] = None) -> str:
+    """Return a rank that sorts strictly between ``before`` and ``after``.
+
+    ``None`` stands for the start (``before``) or end (``after``) of the
+    column.
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"rank {before!r} does not sort before {after!r}")
+
+    digits = []
+    bounded = after is not None
+    position = 0
+    while True:
+        low = DIGITS.index(before[position]) if before and position < len(before) else 0
+        high = DIGITS.index(after[position]) if bounded and position < len(after) else BASE
+        if high - low > 1:
+            digits.append(DIGITS[(low + high) // 2])
+            return "".join(digits)
+        digits.append(DIGITS[low])
+        if high > low:
+            # The prefix is now below ``after``; later digits are unconstrained
+            bounded = False
+        position += 1
+
+
+def rank_after(rank: Optional[str]) -> str:
+    """Return a short rank just after ``rank``, for appending to a column.
+
+    Appends step by one unit in the sixth digit, so millions of cards can be
+    added to the end of a column without ranks growing.
+    """
+    if rank is None:
+        return rank_between(None, None)
+
+    digits = [DIGITS.index(char) for char in rank[:APPEND_WIDTH].ljust(APPEND_WIDTH, "0")]
+    for position in range(APPEND_WIDTH - 1, -1, -1):
+        if digits[position] < BASE - 1:
+            digits[position] += 1
+            return "".join(DIGITS[digit] for digit in digits[: position + 1])
+        digits[position] = 0
+    return rank_between(rank, None)
+
+
+def spaced_ranks(count: int) -> List[str]:
+    """Return ``count`` ascending ranks spread evenly over the rank space."""
+    return list(iter_spaced_ranks(count))
+
+
+def iter_spaced_ranks(count: int) -> Iterator[str]:
+    """Yield the ranks of :func:`spaced_ranks` one at a time."""
+    width = 1
+    while BASE ** width <= count * 2:
+        width += 1
+    step = BASE ** width // (count + 1)
+
+    for index in range(1, count + 1):
+        value = index * step
+        chars = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            chars.append(DIGITS[digit])
+        yield "".join(reversed(chars)).rstrip("0")
+
+
+def needs_rebalance(rank: Optional[str]) -> bool:
+    """Whether ``rank`` has grown long enough to respace its column."""
+    return rank is not None and len(rank) > MAX_RANK_LENGTH
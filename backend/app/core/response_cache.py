@@ -0,0 +1,291 @@
+"""Read-through cache for hot read endpoints.
+
+Endpoints cache their serialized JSON under keys built by
+:func:`project_key`, :func:`boards_key` and :func:`user_key`. Flushes
+record which keys the written rows affect and the keys are evicted once
+the transaction commits; code that writes with Core statements calls
+:func:`invalidate_on_commit` itself. Committed keys are also published on
+the :mod:`invalidation bus <app.core.invalidation>` so other workers evict
+them too. Concurrent misses for one key share a single load.
+"""
+
+import asyncio
+import uuid
+from collections import defaultdict
+from itertools import chain
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.principal import principal_cache
+from app.db.changes import lookup_board_projects
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+
+_PENDING_KEYS = "response_cache_keys"
+
+
+def project_key(project_id: uuid.UUID) -> str:
+    """Key of a project's detail response"""
+    return f"project:{project_id}"
+
+
+def boards_key(project_id: uuid.UUID) -> str:
+    """Key of a project's board list"""
+    return f"project:{project_id}:boards"
+
+
+_USER_PREFIX = "user:"
+
+
+def user_key(user_id: uuid.UUID) -> str:
+    """Key of a user's profile (and, for other workers, their cached principals)"""
+    return f"{_USER_PREFIX}{user_id}"
+
+
+class CacheBackend:
+    """Storage for cached response bodies."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, keys: List[str]) -> None:
+        """Evict ``keys``; called from synchronous session events."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU bounded by entry count."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache = TTLCache(maxsize, ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._cache.set(key, value, ttl)
+
+    def invalidate(self, keys: List[str]) -> None:
+        for key in keys:
+            self._cache.delete(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        cache = self._cache.stats()
+        return {"size": cache["size"], "maxsize": cache["maxsize"], "evictions": cache["evictions"]}
+
+
+class RedisBackend(CacheBackend):
+    """Cache shared by every worker. Requires the optional ``redis`` package."""
+
+    def __init__(self, url: str, prefix: str = "taskflow:cache:") -> None:
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+        self._deletes: Set[asyncio.Task] = set()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    def invalidate(self, keys: List[str]) -> None:
+        task = asyncio.get_running_loop().create_task(self._redis.delete(*(self.prefix + key for key in keys)))
+        self._deletes.add(task)
+        task.add_done_callback(self._deletes.discard)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class _LoadAbandoned(Exception):
+    """The request running a load was cancelled before it finished."""
+
+
+class ResponseCache:
+    """Read-through cache with single-flight loading and per-endpoint counters."""
+
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "coalesced": 0})
+
+    async def get_or_load(
+        self, endpoint: str, key: str, loader: Callable[[], Awaitable[Optional[bytes]]]
+    ) -> Optional[bytes]:
+        """Return the cached body for ``key``, calling ``loader`` on a miss.
+
+        Requests that miss while a load for ``key`` is running wait for it
+        instead of loading again; if the request running the load is
+        cancelled, the waiters load it again themselves. A ``None`` result
+        (e.g. not found) is returned but not cached.
+        """
+        counters = self._stats[endpoint]
+        value = await self.backend.get(key)
+        if value is not None:
+            counters["hits"] += 1
+            return value
+
+        flight = self._inflight.get(key)
+        if flight is not None:
+            counters["coalesced"] += 1
+            while flight is not None:
+                try:
+                    return await asyncio.shield(flight)
+                except _LoadAbandoned:
+                    # Wait for whichever waiter took the load over, or take it ourselves
+                    flight = self._inflight.get(key)
+        else:
+            counters["misses"] += 1
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[key] = flight
+        try:
+            value = await loader()
+        except Exception as exc:
+            flight.set_exception(exc)
+            # Mark it retrieved in case nobody was waiting
+            flight.exception()
+            raise
+        except BaseException:
+            # Only this request was cancelled; its waiters retry the load
+            flight.set_exception(_LoadAbandoned())
+            flight.exception()
+            raise
+        else:
+            flight.set_result(value)
+        finally:
+            # An invalidation during the load drops the flight, as its result may be stale
+            current = self._inflight.get(key) is flight
+            if current:
+                del self._inflight[key]
+
+        if value is not None and current:
+            await self.backend.set(key, value, self.ttl)
+        return value
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """Evict ``keys`` and stop in-flight loads of them from being stored."""
+        keys = list(keys)
+        if not keys:
+            return
+        for key in keys:
+            self._inflight.pop(key, None)
+        self.backend.invalidate(keys)
+
+    def clear(self) -> None:
+        """Drop counters and, for the in-process backend, every entry."""
+        self._stats.clear()
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        """Hit rate per endpoint plus backend occupancy."""
+        endpoints = {}
+        for endpoint, counters in self._stats.items():
+            lookups = counters["hits"] + counters["misses"] + counters["coalesced"]
+            endpoints[endpoint] = {
+                **counters,
+                "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+        return {"backend": type(self.backend).__name__, **self.backend.stats(), "endpoints": endpoints}
+
+
+def create_backend() -> CacheBackend:
+    """Build the backend chosen by ``RESPONSE_CACHE_BACKEND``."""
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.REDIS_URL)
+    return MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+response_cache = ResponseCache(create_backend(), ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+def invalidate_on_commit(session, keys: Iterable[str]) -> None:
+    """Evict ``keys`` when ``session`` (sync or async) commits."""
+    session = getattr(session, "sync_session", session)
+    session.info.setdefault(_PENDING_KEYS, set()).update(keys)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_keys(session: Session, flush_context) -> None:
+    """Work out which cached responses the flushed rows appear in."""
+    keys = set()
+    moved_tasks = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        if isinstance(obj, User):
+            keys.add(user_key(obj.id))
+        elif isinstance(obj, Project):
+            keys.add(project_key(obj.id))
+        elif isinstance(obj, Board):
+            keys.update(boards_key(project_id) for project_id in _values(obj, "project_id"))
+        elif isinstance(obj, Task) and (obj not in session.dirty or _changed(obj, "board_id")):
+            # Board lists carry task counts, which only creates, deletes and moves change
+            moved_tasks.update(_values(obj, "board_id"))
+    if moved_tasks:
+        keys.update(boards_key(project_id) for project_id in lookup_board_projects(session, moved_tasks).values())
+    if keys:
+        invalidate_on_commit(session, keys)
+
+
+def evict_keys(keys: Optional[List[str]]) -> None:
+    """Evict keys committed by another worker, or everything if ``None``"""
+    if keys is None:
+        response_cache.backend.clear()
+        principal_cache.clear()
+        return
+    _evict_locally(keys)
+
+
+def _evict_locally(keys: Iterable[str]) -> None:
+    """Evict cached responses, and the cached principals of changed users"""
+    response_cache.invalidate(keys)
+    for key in keys:
+        if key.startswith(_USER_PREFIX):
+            principal_cache.invalidate_user(uuid.UUID(key[len(_USER_PREFIX):]))
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_keys(session: Session) -> None:
+    keys = session.info.pop(_PENDING_KEYS, ())
+    if keys:
+        _evict_locally(keys)
+        invalidation_bus.publish(keys)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_keys(session: Session, previous_transaction) -> None:
+    # Keys from a rolled-back savepoint stay queued; evicting extra keys is harmless
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEYS, None)
+
+
+def _values(obj, attribute: str) -> Set:
+    """Current and pre-flush values of ``attribute``"""
+    history = inspect(obj).attrs[attribute].history
+    return {value for value in chain(history.added, history.unchanged, history.deleted) if value is not None}
+
+
+def _changed(obj, attribute: str) -> bool:
+    return bool(inspect(obj).attrs[attribute].history.deleted)
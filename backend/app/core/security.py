@@ -1,25 +1,144 @@
-"""Security utilities for authentication and password hashing"""
+"""Security utilities for authentication and password hashing
 
+passlib and jose are imported on first use rather than at import time,
+which keeps them off the worker boot path.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, TypeVar
 from app.core.config import get_settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
 settings = get_settings()
 
 
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """Password hashing context; hashes made with any other cost are upgraded on login"""
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+    )
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Runs bcrypt work on a bounded thread pool.
+
+    bcrypt releases the GIL, so hashing on worker threads keeps the event
+    loop responsive; ``max_workers`` caps how many hashes run at once and
+    the rest wait in the executor queue.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.max_queue_depth = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Run ``fn(*args)`` on the hashing pool and await its result."""
+        submitted = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self._call, submitted, fn, args)
+
+    def stats(self) -> dict:
+        """Return concurrency and queue-depth counters."""
+        started = self.completed + self.running
+        average = self.wait_time_total / started if started else 0.0
+        return {
+            "max_workers": self.max_workers,
+            "running": self.running,
+            "queued": self.queued,
+            "completed": self.completed,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_wait_avg_ms": round(average * 1000, 3),
+            "queue_wait_max_ms": round(self.wait_time_max * 1000, 3),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; a later call to :meth:`run` starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+    def _call(self, submitted: float, fn: Callable[..., T], args: tuple) -> T:
+        waited = time.perf_counter() - submitted
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+
+password_hasher = PasswordHasher(max_workers=settings.PASSWORD_HASH_WORKERS)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool"""
+    return await password_hasher.run(get_pwd_context().verify, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password on the hashing pool
+
+    Returns ``(valid, new_hash)``; ``new_hash`` is set when the stored hash
+    uses outdated cost parameters and should be replaced.
+    """
+    return await password_hasher.run(get_pwd_context().verify_and_update, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool"""
+    return await password_hasher.run(get_pwd_context().hash, password)
 
 
 def create_access_token(
@@ -27,6 +146,8 @@ def create_access_token(
     expires_delta: Optional[timedelta] = None
 ) -> str:
     """Create a JWT access token"""
+    from jose import jwt
+
     to_encode = data.copy()
     
     if expires_delta:
@@ -48,6 +169,8 @@ def create_access_token(
 
 def decode_token(token: str) -> Optional[dict]:
     """Decode and validate a JWT token"""
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token,
@@ -1,29 +0,0 @@
-"""Database configuration and session management"""
-
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from app.core.config import get_settings
-
-settings = get_settings()
-
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
-
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Declarative base for models
-Base = declarative_base()
-
-
-def get_db() -> Session:
-    """Get database session dependency"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
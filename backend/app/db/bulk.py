@@ -0,0 +1,68 @@
+"""Bulk row loading.
+
+:func:`copy_rows` writes a stream of row tuples into a table through the
+fastest path the backend offers: binary ``COPY`` on PostgreSQL (asyncpg)
+and batched ``executemany`` elsewhere. Rows are consumed lazily, so memory
+use doesn't depend on how many there are. It bypasses the ORM, so flush
+hooks such as :mod:`app.db.changes` stamping don't run; callers fill
+``change_seq`` and similar columns themselves.
+"""
+
+from itertools import islice
+from typing import Any, Iterable, Sequence, Tuple
+
+from sqlalchemy import Table, insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Rows per executemany call on backends without COPY
+BATCH_SIZE = 5000
+
+
+async def copy_rows(
+    conn: AsyncConnection,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Tuple[Any, ...]],
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """Insert ``rows`` (tuples in ``columns`` order) into ``table``; return the count.
+
+    Runs in ``conn``'s transaction, which the caller commits.
+    """
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg":
+        return await _copy_postgres(conn, table, columns, rows)
+
+    statement = insert(table)
+    count = 0
+    iterator = iter(rows)
+    while True:
+        batch = [dict(zip(columns, row)) for row in islice(iterator, batch_size)]
+        if not batch:
+            return count
+        await conn.execute(statement, batch)
+        count += len(batch)
+
+
+async def _copy_postgres(conn: AsyncConnection, table: Table, columns: Sequence[str], rows) -> int:
+    # The asyncpg adapter opens its transaction lazily on the first statement;
+    # run one so the COPY below is part of it rather than autocommitted
+    await conn.exec_driver_sql("SELECT 1")
+    raw = await conn.get_raw_connection()
+    counted = _Counter(rows)
+    await raw.driver_connection.copy_records_to_table(
+        table.name, records=counted, columns=list(columns), schema_name=table.schema
+    )
+    return counted.count
+
+
+class _Counter:
+    """Iterable passing rows through while counting them."""
+
+    def __init__(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
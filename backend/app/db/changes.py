@@ -0,0 +1,143 @@
+"""Per-project change sequence for delta sync.
+
+Every insert or update of a project, board or task stamps the row's
+``change_seq`` with the next number from its project's counter, and every
+deleted board or task leaves a :class:`~app.models.change.Tombstone`
+carrying one. Clients remember the highest number they have seen and ask
+for everything above it.
+
+Numbers are reserved by incrementing the project's ``change_counters`` row,
+which stays locked until the transaction ends, so writers to the same
+project commit in sequence order and a reader never sees number ``n + 1``
+before ``n``. ORM flushes are stamped automatically by a ``before_flush``
+hook; code that writes with Core statements calls :func:`stamp_rows`.
+"""
+
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.board import Board
+from app.models.change import ChangeCounter, Tombstone
+from app.models.project import Project
+from app.models.task import Task
+
+
+def _reserve_statement(dialect_name: str, project_id: uuid.UUID, count: int):
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert(ChangeCounter).values(project_id=project_id, value=count)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ChangeCounter.project_id],
+        set_={"value": ChangeCounter.value + count},
+    )
+    return statement.returning(ChangeCounter.value)
+
+
+async def reserve_change_seqs(db: AsyncSession, project_id: uuid.UUID, count: int) -> int:
+    """Reserve ``count`` consecutive sequence numbers and return the first."""
+    statement = _reserve_statement(db.get_bind().dialect.name, project_id, count)
+    last = (await db.execute(statement)).scalar_one()
+    return last - count + 1
+
+
+async def stamp_rows(db: AsyncSession, rows: Iterable[Tuple[uuid.UUID, Dict[str, Any]]]) -> None:
+    """Set ``change_seq`` on each ``(project_id, row)``, one reservation per project."""
+    by_project: Dict[uuid.UUID, List[Dict[str, Any]]] = defaultdict(list)
+    for project_id, row in rows:
+        by_project[project_id].append(row)
+    for project_id, project_rows in by_project.items():
+        seq = await reserve_change_seqs(db, project_id, len(project_rows))
+        for row in project_rows:
+            row["change_seq"] = seq
+            seq += 1
+
+
+def lookup_board_projects(session: Session, board_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, uuid.UUID]:
+    """Map board ids to project ids, querying only boards the session doesn't hold.
+
+    Safe to call from flush events: the lookup bypasses autoflush.
+    """
+    board_ids = set(board_ids)
+    found = {
+        obj.id: obj.project_id for obj in (*session.identity_map.values(), *session.new)
+        if isinstance(obj, Board) and obj.id in board_ids
+    }
+    missing = board_ids - found.keys()
+    if missing:
+        rows = session.connection().execute(select(Board.id, Board.project_id).where(Board.id.in_(missing)))
+        found.update({row.id: row.project_id for row in rows})
+    return found
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_flush(session: Session, flush_context, instances) -> None:
+    """Stamp changed projects, boards and tasks and record deleted ones."""
+    changed = [obj for obj in session.new if isinstance(obj, (Project, Board, Task))]
+    changed += [
+        obj for obj in session.dirty
+        if isinstance(obj, (Project, Board, Task)) and session.is_modified(obj, include_collections=False)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, (Board, Task))]
+    if not changed and not deleted:
+        return
+
+    new_projects = set()
+    for obj in changed:
+        # Ids are needed now to key the reservation, not at INSERT time
+        if obj.id is None:
+            obj.id = uuid.uuid4()
+        if isinstance(obj, Project) and obj in session.new:
+            new_projects.add(obj.id)
+
+    moved_from = {
+        obj: inspect(obj).attrs.board_id.history.deleted[0]
+        for obj in changed
+        if isinstance(obj, Task) and inspect(obj).attrs.board_id.history.deleted
+    }
+    needed = {obj.board_id for obj in (*changed, *deleted) if isinstance(obj, Task)}
+    board_projects = lookup_board_projects(session, needed | set(moved_from.values()))
+
+    def project_of(obj) -> uuid.UUID:
+        if isinstance(obj, Project):
+            return obj.id
+        if isinstance(obj, Board):
+            return obj.project_id
+        return board_projects[obj.board_id]
+
+    stamped: Dict[uuid.UUID, list] = defaultdict(list)
+    for obj in changed:
+        stamped[project_of(obj)].append(obj)
+    for obj in deleted:
+        stamped[project_of(obj)].append(_tombstone(obj, project_of(obj)))
+    for task, board_id in moved_from.items():
+        # A task that left the project must disappear from the old project's feed
+        old_project = board_projects.get(board_id)
+        if old_project is not None and old_project != project_of(task):
+            stamped[old_project].append(_tombstone(task, old_project))
+
+    dialect_name = session.get_bind().dialect.name
+    for project_id, objects in stamped.items():
+        if project_id in new_projects:
+            session.add(ChangeCounter(project_id=project_id, value=len(objects)))
+            seq = 1
+        else:
+            statement = _reserve_statement(dialect_name, project_id, len(objects))
+            seq = session.connection().execute(statement).scalar_one() - len(objects) + 1
+        for obj in objects:
+            obj.change_seq = seq
+            seq += 1
+            if isinstance(obj, Tombstone):
+                session.add(obj)
+
+
+def _tombstone(obj, project_id: uuid.UUID) -> Tombstone:
+    return Tombstone(
+        project_id=project_id,
+        entity="board" if isinstance(obj, Board) else "task",
+        entity_id=obj.id,
+    )
@@ -0,0 +1,218 @@
+"""Status transitions and the daily flow rollups built from them.
+
+Whenever a task enters a column, leaves one or moves between two (a
+column being a board and status), a :class:`~app.models.analytics.TaskTransition`
+is recorded and, in the same transaction, the day's
+:class:`~app.models.analytics.FlowDaily` counters of the boards and
+projects involved are incremented. Completions also add the task's cycle
+time, from ``Task.started_at`` (or creation) to now, to the day's
+:class:`~app.models.analytics.CycleTimeDaily` histogram. Charts therefore
+read a few rows per day, however many tasks there are.
+
+ORM flushes are recorded automatically by a ``before_flush`` hook; code
+that writes tasks with Core statements calls :func:`record_transitions`
+itself (through ``AsyncSession.run_sync``). :func:`rebuild_rollups`
+recomputes a project's rollups from its transitions.
+"""
+
+import uuid
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, insert, inspect, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.changes import lookup_board_projects
+from app.models.analytics import CycleTimeDaily, FlowDaily, TaskTransition
+from app.models.board import Board
+from app.models.task import Task
+
+TODO = "todo"
+DONE = "done"
+
+# Upper bounds, in hours, of the cycle time histogram buckets; the last bucket is unbounded
+CYCLE_TIME_BUCKETS = (1, 4, 8, 24, 48, 72, 120, 168, 336, 504, 720, 1440, 2160)
+
+
+@dataclass
+class Transition:
+    """One task leaving ``from_*`` and entering ``to_*`` (either side may be empty)."""
+
+    task_id: uuid.UUID
+    from_project_id: Optional[uuid.UUID] = None
+    from_board_id: Optional[uuid.UUID] = None
+    from_status: Optional[str] = None
+    to_project_id: Optional[uuid.UUID] = None
+    to_board_id: Optional[uuid.UUID] = None
+    to_status: Optional[str] = None
+    cycle_seconds: Optional[float] = None
+
+
+def is_completion(from_status: Optional[str], to_status: Optional[str]) -> bool:
+    """Whether a task moving between these statuses is completed"""
+    return from_status is not None and from_status != DONE and to_status == DONE
+
+
+def cycle_bucket(seconds: float) -> int:
+    return bisect_left(CYCLE_TIME_BUCKETS, seconds / 3600)
+
+
+def record_transitions(session: Session, transitions: List[Transition], at: Optional[datetime] = None) -> None:
+    """Insert ``transitions`` and add them to the rollups of ``at``'s day (default now)."""
+    if not transitions:
+        return
+    at = at or datetime.utcnow()
+    connection = session.connection()
+    connection.execute(
+        insert(TaskTransition), [{**vars(transition), "occurred_at": at} for transition in transitions]
+    )
+    flow, cycle_times = _rollup((transition, at.date()) for transition in transitions)
+    _add_rollups(connection, flow, cycle_times)
+
+
+def rebuild_rollups(session: Session, project_id: uuid.UUID) -> int:
+    """Recompute the rollups of a project and its boards from their transitions; return the count read.
+
+    For repairs and backfills; normal writes keep the rollups current.
+    """
+    connection = session.connection()
+    board_ids = list(connection.execute(select(Board.id).where(Board.project_id == project_id)).scalars())
+    scopes = [project_id, *board_ids]
+    for model in (FlowDaily, CycleTimeDaily):
+        connection.execute(delete(model).where(model.scope_id.in_(scopes)))
+
+    fields = list(Transition.__dataclass_fields__)
+    columns = [getattr(TaskTransition, field) for field in fields]
+    rows = session.execute(
+        select(*columns, TaskTransition.occurred_at)
+        .where(or_(TaskTransition.from_project_id == project_id, TaskTransition.to_project_id == project_id))
+        .order_by(TaskTransition.id),
+        execution_options={"yield_per": 5000},
+    )
+    count = 0
+
+    def transitions():
+        nonlocal count
+        for *values, occurred_at in rows:
+            count += 1
+            yield Transition(**dict(zip(fields, values))), occurred_at.date()
+
+    flow, cycle_times = _rollup(transitions())
+    # Transitions touching other projects are read too; keep only this project's rollups
+    flow = {key: value for key, value in flow.items() if key[0] in scopes}
+    cycle_times = {key: value for key, value in cycle_times.items() if key[0] in scopes}
+    _add_rollups(connection, flow, cycle_times)
+    return count
+
+
+def _rollup(transitions: Iterable[Tuple[Transition, date]]):
+    """Counter increments keyed by ``(scope, day, status)`` and ``(scope, day, bucket)``"""
+    flow: Dict[Tuple[uuid.UUID, date, str], List[int]] = defaultdict(lambda: [0, 0])
+    cycle_times: Dict[Tuple[uuid.UUID, date, int], List[float]] = defaultdict(lambda: [0, 0.0])
+    for transition, day in transitions:
+        exits, enters = set(), set()
+        if transition.from_status is not None:
+            exits = {(transition.from_board_id, transition.from_status),
+                     (transition.from_project_id, transition.from_status)}
+        if transition.to_status is not None:
+            enters = {(transition.to_board_id, transition.to_status),
+                      (transition.to_project_id, transition.to_status)}
+        # A move between boards of one project, keeping its status, doesn't change the project's flow
+        same = exits & enters
+        for scope, status in exits - same:
+            flow[(scope, day, status)][1] += 1
+        for scope, status in enters - same:
+            flow[(scope, day, status)][0] += 1
+        if transition.cycle_seconds is not None:
+            bucket = cycle_bucket(transition.cycle_seconds)
+            for scope in {transition.to_board_id, transition.to_project_id}:
+                entry = cycle_times[(scope, day, bucket)]
+                entry[0] += 1
+                entry[1] += transition.cycle_seconds
+    return flow, cycle_times
+
+
+def _add_rollups(connection, flow, cycle_times) -> None:
+    if flow:
+        rows = [
+            {"scope_id": scope, "day": day, "status": status, "entered": entered, "exited": exited}
+            for (scope, day, status), (entered, exited) in flow.items()
+        ]
+        connection.execute(_increment(connection, FlowDaily, ("entered", "exited")), rows)
+    if cycle_times:
+        rows = [
+            {"scope_id": scope, "day": day, "bucket": bucket, "count": count, "total_seconds": seconds}
+            for (scope, day, bucket), (count, seconds) in cycle_times.items()
+        ]
+        connection.execute(_increment(connection, CycleTimeDaily, ("count", "total_seconds")), rows)
+
+
+def _increment(connection, model, counters):
+    """INSERT that adds ``counters`` to an existing row with the same key instead"""
+    insert_ = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    statement = insert_(model)
+    return statement.on_conflict_do_update(
+        index_elements=[column.name for column in model.__table__.primary_key],
+        set_={counter: getattr(model, counter) + statement.excluded[counter] for counter in counters},
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _record_flush(session: Session, flush_context, instances) -> None:
+    """Record the column changes of tasks in this flush."""
+    now = datetime.utcnow()
+    # (task, from board, from status) for every task whose column changes
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Task):
+            if obj.id is None:
+                obj.id = uuid.uuid4()
+            if obj.status is None:
+                obj.status = TODO
+            changes.append((obj, None, None))
+    for obj in session.dirty:
+        if isinstance(obj, Task):
+            state = inspect(obj)
+            board_history = state.attrs.board_id.history
+            status_history = state.attrs.status.history
+            if board_history.deleted or status_history.deleted:
+                from_board = board_history.deleted[0] if board_history.deleted else obj.board_id
+                from_status = status_history.deleted[0] if status_history.deleted else obj.status
+                if (from_board, from_status) != (obj.board_id, obj.status):
+                    changes.append((obj, from_board, from_status))
+    deleted = [obj for obj in session.deleted if isinstance(obj, Task)]
+    if not changes and not deleted:
+        return
+
+    boards = {obj.board_id for obj, _, _ in changes} | {board for _, board, _ in changes if board}
+    boards |= {obj.board_id for obj in deleted}
+    board_projects = lookup_board_projects(session, boards)
+
+    transitions = []
+    for obj, from_board, from_status in changes:
+        transition = Transition(
+            task_id=obj.id,
+            from_project_id=board_projects.get(from_board),
+            from_board_id=from_board,
+            from_status=from_status,
+            to_project_id=board_projects[obj.board_id],
+            to_board_id=obj.board_id,
+            to_status=obj.status,
+        )
+        if is_completion(from_status, obj.status):
+            transition.cycle_seconds = (now - (obj.started_at or obj.created_at or now)).total_seconds()
+        if obj.started_at is None and obj.status != TODO:
+            obj.started_at = now
+        transitions.append(transition)
+    for obj in deleted:
+        transitions.append(Transition(
+            task_id=obj.id,
+            from_project_id=board_projects.get(obj.board_id),
+            from_board_id=obj.board_id,
+            from_status=obj.status,
+        ))
+    record_transitions(session, transitions, now)
@@ -0,0 +1,130 @@
+"""Per-request SQL statement budgets.
+
+Inside :func:`record_queries` every statement the engines execute is
+appended to a :class:`QueryLog` (transaction control such as ``BEGIN`` and
+``SAVEPOINT`` is left out, as it isn't the query pattern under test).
+:class:`QueryBudget` checks a finished request's log against a statement
+limit and, optionally, flags statements that ran more than once, the usual
+sign of an N+1 loop. :class:`app.core.middleware.QueryBudgetMiddleware`
+logs violations in development; the test suite fails tests marked with
+``@pytest.mark.query_budget(n)`` instead.
+"""
+
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+# Longest statement or parameter text shown in a report
+MAX_STATEMENT_LENGTH = 300
+
+
+class QueryLog:
+    """Statements executed while recording, with their parameters."""
+
+    def __init__(self) -> None:
+        self.statements: List[Tuple[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def repeated(self) -> Dict[str, int]:
+        """Statement text run more than once, with how often"""
+        counts = Counter(statement for statement, _ in self.statements)
+        return {statement: count for statement, count in counts.items() if count > 1}
+
+
+_query_log: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryLog]:
+    """Collect the statements executed inside the block"""
+    log = QueryLog()
+    token = _query_log.set(log)
+    try:
+        yield log
+    finally:
+        _query_log.reset(token)
+
+
+def log_statement(statement: str, parameters: Any) -> None:
+    """Add a statement to the current :class:`QueryLog`, if recording."""
+    log = _query_log.get()
+    if log is not None and not statement.lstrip().upper().startswith(TRANSACTION_CONTROL):
+        log.statements.append((statement, parameters))
+
+
+class BudgetViolation:
+    """A request that ran more statements than allowed, or repeated some."""
+
+    def __init__(self, request: str, log: QueryLog, limit: int, repeated: Dict[str, int]) -> None:
+        self.request = request
+        self.log = log
+        self.limit = limit
+        self.repeated = repeated
+
+    def __str__(self) -> str:
+        count = len(self.log)
+        budget = f"budget {self.limit}" if self.limit else "no budget"
+        lines = [f"{self.request} ran {count} SQL statement{'s' if count != 1 else ''} ({budget}):"]
+        lines += [
+            f"  {number}. {_shorten(statement)}  {_shorten(repr(parameters))}"
+            for number, (statement, parameters) in enumerate(self.log.statements, 1)
+        ]
+        if self.repeated:
+            lines.append("Repeated statements:")
+            lines += [f"  {count}x {_shorten(statement)}" for statement, count in self.repeated.items()]
+        return "\n".join(lines)
+
+
+class QueryBudget:
+    """Statement limit applied to each request; ``0`` means no limit."""
+
+    def __init__(self, limit: int = 0, flag_repeats: bool = False) -> None:
+        self.limit = limit
+        self.flag_repeats = flag_repeats
+        self._collected: Optional[List[BudgetViolation]] = None
+        self._lock = threading.Lock()
+
+    def check(self, request: str, log: QueryLog) -> Optional[BudgetViolation]:
+        """Return the violation ``log`` represents, if any"""
+        repeated = log.repeated() if self.flag_repeats else {}
+        if not repeated and (not self.limit or len(log) <= self.limit):
+            return None
+        violation = BudgetViolation(request, log, self.limit, repeated)
+        with self._lock:
+            if self._collected is not None:
+                self._collected.append(violation)
+        return violation
+
+    @contextmanager
+    def override(self, limit: int, flag_repeats: bool = False) -> Iterator[List[BudgetViolation]]:
+        """Apply a different budget inside the block and collect its violations.
+
+        Requests may be served on another thread (e.g. by ``TestClient``),
+        so this changes the shared budget rather than a context variable.
+        """
+        previous = (self.limit, self.flag_repeats, self._collected)
+        collected: List[BudgetViolation] = []
+        self.limit, self.flag_repeats, self._collected = limit, flag_repeats, collected
+        try:
+            yield collected
+        finally:
+            self.limit, self.flag_repeats, self._collected = previous
+
+
+query_budget = QueryBudget(settings.QUERY_BUDGET, settings.QUERY_BUDGET_FLAG_REPEATS)
+
+
+def _shorten(text: str) -> str:
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) > MAX_STATEMENT_LENGTH:
+        return text[:MAX_STATEMENT_LENGTH] + "..."
+    return text
@@ -0,0 +1,118 @@
+"""Primary/replica routing for ORM sessions.
+
+Reads go to the read replica when one is configured. Writes, locking reads
+and anything issued after the session has written stay on the primary, so a
+request always reads its own writes. :func:`stick_to_primary` forces the
+primary for the current request, e.g. for a short window after the client
+last wrote.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+PRIMARY = "primary"
+REPLICA = "replica"
+
+
+@dataclass
+class RequestRouting:
+    """Routing state shared by every session used during one request."""
+
+    stick_to_primary: bool = False
+    wrote: bool = False
+    served_by: Set[str] = field(default_factory=set)
+
+
+_request_routing: ContextVar[Optional[RequestRouting]] = ContextVar("request_routing", default=None)
+
+
+def get_request_routing() -> Optional[RequestRouting]:
+    """Return the routing state of the current request, if any."""
+    return _request_routing.get()
+
+
+def begin_request_routing(stick_to_primary: bool = False):
+    """Start tracking routing for a request; returns a token for :func:`end_request_routing`."""
+    return _request_routing.set(RequestRouting(stick_to_primary=stick_to_primary))
+
+
+def end_request_routing(token) -> None:
+    """Stop tracking routing for the request started with ``token``."""
+    _request_routing.reset(token)
+
+
+@contextmanager
+def stick_to_primary() -> Iterator[None]:
+    """Send every query issued inside the block to the primary."""
+    routing = _request_routing.get()
+    if routing is None:
+        token = _request_routing.set(RequestRouting(stick_to_primary=True))
+        try:
+            yield
+        finally:
+            _request_routing.reset(token)
+        return
+
+    previous = routing.stick_to_primary
+    routing.stick_to_primary = True
+    try:
+        yield
+    finally:
+        routing.stick_to_primary = previous
+
+
+def record_query(engine_name: str) -> None:
+    """Note that ``engine_name`` served a statement for the current request."""
+    routing = _request_routing.get()
+    if routing is not None:
+        routing.served_by.add(engine_name)
+
+
+class RoutingSession(Session):
+    """Session that picks the primary or replica engine per statement.
+
+    The engines are taken from ``session.info["primary"]`` and
+    ``session.info["replica"]``; without a replica every statement goes to
+    the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        primary = self.info["primary"]
+        replica = self.info.get("replica")
+        if replica is None or self._requires_primary(clause):
+            return primary
+        return replica
+
+    def _requires_primary(self, clause) -> bool:
+        if self._flushing or self.info.get("wrote"):
+            return True
+
+        if clause is not None:
+            if clause.is_dml:
+                self._mark_written()
+                return True
+            if isinstance(clause, TextClause):
+                return True
+            if getattr(clause, "_for_update_arg", None) is not None:
+                return True
+
+        routing = _request_routing.get()
+        return routing is not None and (routing.stick_to_primary or routing.wrote)
+
+    def _mark_written(self) -> None:
+        self.info["wrote"] = True
+        routing = _request_routing.get()
+        if routing is not None:
+            routing.wrote = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    """Keep reads on the primary once the session has written."""
+    session._mark_written()
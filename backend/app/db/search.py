@@ -0,0 +1,119 @@
+"""Full-text search index DDL.
+
+On PostgreSQL ``tasks.search_vector`` is a generated ``tsvector`` column with
+a GIN index, so the database keeps it current on every write. On SQLite an
+external-content FTS5 table mirrors ``tasks`` through triggers, keyed by
+task id through ``tasks_fts_keys``. Neither
+exists on the ORM model; :mod:`app.services.search_service` queries them
+directly.
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import DDL, Table, event
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+SEARCH_CONFIG = "english"
+
+_POSTGRES_CREATE = [
+    f"""
+    ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING gin (search_vector)",
+]
+
+# The index is keyed on tasks_fts_keys.id, an INTEGER PRIMARY KEY that
+# VACUUM leaves alone, rather than on the implicit rowid of tasks (whose
+# primary key is a UUID), which VACUUM may renumber. The view maps the keys
+# back to the task rows, so 'rebuild' still works.
+_SQLITE_TABLES = [
+    "CREATE TABLE IF NOT EXISTS tasks_fts_keys (id INTEGER PRIMARY KEY, task_id NOT NULL UNIQUE)",
+    """
+    CREATE VIEW IF NOT EXISTS tasks_fts_content AS
+    SELECT tasks_fts_keys.id AS id, tasks.title AS title, tasks.description AS description
+    FROM tasks_fts_keys JOIN tasks ON tasks.id = tasks_fts_keys.task_id
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks_fts_content', content_rowid='id',
+        prefix='2 3', tokenize='porter unicode61'
+    )
+    """,
+]
+
+_SQLITE_TRIGGER_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts_keys(task_id) VALUES (new.id);
+        INSERT INTO tasks_fts(rowid, title, description)
+        SELECT id, new.title, new.description FROM tasks_fts_keys WHERE task_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        SELECT 'delete', id, old.title, old.description FROM tasks_fts_keys WHERE task_id = old.id;
+        DELETE FROM tasks_fts_keys WHERE task_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        SELECT 'delete', id, old.title, old.description FROM tasks_fts_keys WHERE task_id = old.id;
+        INSERT INTO tasks_fts(rowid, title, description)
+        SELECT id, new.title, new.description FROM tasks_fts_keys WHERE task_id = new.id;
+    END
+    """,
+]
+
+# Key the tasks written without the triggers, forget deleted ones, then index everything
+_SQLITE_REINDEX = [
+    "INSERT INTO tasks_fts_keys(task_id) SELECT id FROM tasks WHERE id NOT IN (SELECT task_id FROM tasks_fts_keys)",
+    "DELETE FROM tasks_fts_keys WHERE task_id NOT IN (SELECT id FROM tasks)",
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+]
+
+_SQLITE_CREATE = _SQLITE_TABLES + _SQLITE_TRIGGER_DDL + _SQLITE_REINDEX
+
+_SQLITE_DROP = [
+    "DROP TABLE IF EXISTS tasks_fts",
+    "DROP VIEW IF EXISTS tasks_fts_content",
+    "DROP TABLE IF EXISTS tasks_fts_keys",
+]
+
+_SQLITE_TRIGGERS = ("tasks_fts_insert", "tasks_fts_delete", "tasks_fts_update")
+
+
+def register_search_ddl(table: Table) -> None:
+    """Create and drop the search index alongside ``table``."""
+    for statement in _POSTGRES_CREATE:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in _SQLITE_CREATE:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in _SQLITE_DROP:
+        event.listen(table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
+
+
+@asynccontextmanager
+async def deferred_search_index(conn: AsyncConnection) -> AsyncIterator[None]:
+    """Index the tasks written inside the block in one pass at its end.
+
+    On SQLite the FTS triggers are dropped for the block, then recreated
+    and the index rebuilt, which is several times faster than per-row
+    triggers for bulk loads. The changes are part of ``conn``'s
+    transaction. PostgreSQL maintains its generated column per row either
+    way, so nothing changes there.
+    """
+    if conn.dialect.name != "sqlite":
+        yield
+        return
+    for trigger in _SQLITE_TRIGGERS:
+        await conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+    yield
+    for statement in _SQLITE_TRIGGER_DDL + _SQLITE_REINDEX:
+        await conn.exec_driver_sql(statement)
@@ -1,28 +1,292 @@
-"""Database session management."""
+"""Database session management.
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+This module owns the async engines used by the application: the primary
+and, when ``DATABASE_READ_URL`` is set, a read replica. Pool sizing,
+recycling and the asyncpg prepared-statement cache are driven by
+``Settings``; pool activity is tracked in :class:`PoolStats` and exposed via
+:func:`get_pool_stats`. Sessions route statements between the engines with
+:class:`app.db.routing.RoutingSession`.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import record_pool_wait, statement_finished, statement_started
+from app.db.query_budget import log_statement
+from app.db.routing import PRIMARY, REPLICA, RoutingSession, record_query
+
+# Async drivers used for each backend when the URL doesn't name one
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+logger = logging.getLogger(__name__)
+
+# Pool counters per sync engine; survives pool re-creation on dispose()
+_pool_stats: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class PoolStats:
+    """Running counters for a connection pool."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.checked_out = 0
+        self.waiters = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        """Record the time one checkout spent waiting for a connection."""
+        self.wait_time_total += seconds
+        if seconds > self.wait_time_max:
+            self.wait_time_max = seconds
+
+    def as_dict(self) -> dict:
+        """Return the counters as a JSON-serializable dict."""
+        average = self.wait_time_total / self.checkouts if self.checkouts else 0.0
+        return {
+            "queries": self.queries,
+            "checked_out": self.checked_out,
+            "waiters": self.waiters,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+            "wait_time_avg_ms": round(average * 1000, 3),
+            "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+        }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+    def _do_get(self):
+        self.stats.waiters += 1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.waiters -= 1
+            waited = time.perf_counter() - start
+            self.stats.record_wait(waited)
+            record_pool_wait(waited)
+
+
+def get_async_url(database_url: str) -> URL:
+    """Return ``database_url`` with an async driver selected."""
+    url = make_url(database_url)
+    if "+" not in url.drivername:
+        url = url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+    return url
+
+
+def create_engine_from_url(database_url: str, name: str = PRIMARY) -> AsyncEngine:
+    """Create a tuned async engine for ``database_url``.
+
+    ``name`` identifies the engine in pool stats and in the per-request
+    record of which engine served each query.
+    """
+    url = get_async_url(database_url)
+    engine_kwargs = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if url.get_backend_name() == "sqlite":
+        # SQLite connections are cheap and single-writer; keep the dialect's pool
+        stats = PoolStats()
+    else:
+        engine_kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+        stats = None
+        if url.get_driver_name() == "asyncpg":
+            engine_kwargs["connect_args"] = {
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            }
+
+    async_engine = create_async_engine(url, **engine_kwargs)
+    pool = async_engine.sync_engine.pool
+    if stats is None:
+        stats = pool.stats
+    _pool_stats[async_engine.sync_engine] = stats
+
+    if url.get_backend_name() == "sqlite":
+        _enable_sqlite_transactions(async_engine)
+
+    @event.listens_for(async_engine.sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.checked_out += 1
+        stats.checkouts += 1
+
+    @event.listens_for(async_engine.sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        stats.checked_out -= 1
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        stats.queries += 1
+        record_query(name)
+        log_statement(statement, parameters)
+        statement_started()
+
+    @event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+    def _on_executed(conn, cursor, statement, parameters, context, executemany):
+        statement_finished()
+
+    @event.listens_for(async_engine.sync_engine, "handle_error")
+    def _on_error(exception_context):
+        statement_finished()
+
+    return async_engine
+
+
+def _enable_sqlite_transactions(async_engine: AsyncEngine) -> None:
+    """Let SQLAlchemy emit BEGIN itself so SAVEPOINTs and rollbacks work on SQLite."""
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(async_engine.sync_engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+def get_pool_stats(target: Optional[AsyncEngine] = None) -> dict:
+    """Return pool size and checkout/wait counters for ``target``."""
+    target = target or engine
+    pool = target.sync_engine.pool
+    data = {"pool": pool.__class__.__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        data.update(size=pool.size(), overflow=pool.overflow())
+    data.update(_pool_stats[target.sync_engine].as_dict())
+    return data
+
+
+def get_all_pool_stats() -> dict:
+    """Return :func:`get_pool_stats` for every configured engine, by name."""
+    data = {PRIMARY: get_pool_stats(engine)}
+    if read_engine is not None:
+        data[REPLICA] = get_pool_stats(read_engine)
+    return data
+
+
+async def warm_pool(target: AsyncEngine, connections: int, timeout: float) -> int:
+    """Open up to ``connections`` pooled connections before traffic arrives.
+
+    Returns how many were opened. A database that is down or slow only
+    delays startup by ``timeout``: the failure is logged and requests
+    connect on demand as usual.
+    """
+    pool = target.sync_engine.pool
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        connections = min(connections, pool.size())
+    else:
+        # SQLite connections are opened per checkout; one proves the file is reachable
+        connections = min(connections, 1)
+    if connections <= 0:
+        return 0
+
+    async def open_one():
+        conn = await target.connect()
+        try:
+            await conn.execute(text("SELECT 1"))
+        except BaseException:
+            await conn.close()
+            raise
+        return conn
+
+    tasks = [asyncio.ensure_future(open_one()) for _ in range(connections)]
+    # Hold every connection at once so the pool grows to ``connections``
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    opened = [task.result() for task in done if task.exception() is None]
+    await asyncio.gather(*(conn.close() for conn in opened), return_exceptions=True)
+    errors = [task.exception() for task in done if task.exception() is not None]
+    if errors or pending:
+        logger.warning(
+            "Pool warm-up for %s opened %d of %d connections (%s)",
+            target.url.render_as_string(), len(opened), connections,
+            errors[0] if errors else f"timed out after {timeout:g}s",
+        )
+    return len(opened)
+
+
+async def warm_pools() -> dict:
+    """Warm every configured engine; returns connections opened, by name"""
+    targets = {PRIMARY: engine}
+    if read_engine is not None:
+        targets[REPLICA] = read_engine
+    counts = await asyncio.gather(*(
+        warm_pool(target, settings.DB_POOL_WARM_CONNECTIONS, settings.DB_POOL_WARM_TIMEOUT)
+        for target in targets.values()
+    ))
+    return dict(zip(targets, counts))
+
+
+def create_session_factory(
+    primary: AsyncEngine, replica: Optional[AsyncEngine] = None
+) -> async_sessionmaker:
+    """Create a session factory that routes reads to ``replica`` when given."""
+    return async_sessionmaker(
+        primary,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        autoflush=False,
+        info={
+            PRIMARY: primary.sync_engine,
+            REPLICA: replica.sync_engine if replica is not None else None,
+        },
+    )
+
+
+# Create async engines
+engine = create_engine_from_url(settings.DATABASE_URL, PRIMARY)
+read_engine = (
+    create_engine_from_url(settings.DATABASE_READ_URL, REPLICA)
+    if settings.DATABASE_READ_URL
+    else None
 )
 
 # Create session factory
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
-)
+AsyncSessionLocal = create_session_factory(engine, read_engine)
 
 
-async def get_db() -> AsyncSession:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session."""
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
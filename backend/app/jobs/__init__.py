@@ -0,0 +1,5 @@
+"""Background jobs: a queue in the database and the workers that run it."""
+
+from app.jobs.queue import JobQueue, job
+
+__all__ = ["JobQueue", "job"]
@@ -0,0 +1,44 @@
+"""Handlers of the jobs the API enqueues.
+
+Each runs with a session of its own and must be safe to run twice (see
+:mod:`app.jobs.queue`). Payload ids arrive as strings.
+"""
+
+import uuid
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.flow import rebuild_rollups
+from app.jobs.queue import job
+from app.services.archive_service import ArchiveService
+from app.services.task_service import TaskService
+
+REBALANCE_COLUMN = "tasks.rebalance_column"
+ARCHIVE_DONE_TASKS = "tasks.archive_done"
+REBUILD_ROLLUPS = "analytics.rebuild_rollups"
+
+
+@job(REBALANCE_COLUMN)
+async def rebalance_column(db: AsyncSession, board_id: str, status: str) -> None:
+    """Respace a column whose ranks have grown long"""
+    await TaskService.rebalance_column(db, uuid.UUID(board_id), status)
+
+
+@job(ARCHIVE_DONE_TASKS)
+async def archive_done_tasks(db: AsyncSession, after_days: int) -> None:
+    """Archive tasks done for more than ``after_days``"""
+    await ArchiveService.archive_done_tasks(
+        db,
+        timedelta(days=after_days),
+        batch_size=settings.ARCHIVE_BATCH_SIZE,
+        pause=settings.ARCHIVE_BATCH_PAUSE_SECONDS,
+    )
+
+
+@job(REBUILD_ROLLUPS)
+async def rebuild_project_rollups(db: AsyncSession, project_id: str) -> None:
+    """Recompute a project's flow and cycle-time rollups from its transitions"""
+    await db.run_sync(rebuild_rollups, uuid.UUID(project_id))
+    await db.commit()
@@ -0,0 +1,232 @@
+"""Job queue stored in the ``jobs`` table.
+
+Producers call :meth:`JobQueue.enqueue` inside their own transaction, so a
+job exists exactly when the work that asked for it was committed, and
+return without waiting for it. Workers (:mod:`app.jobs.worker`) claim due
+jobs in short transactions of their own:
+
+* on PostgreSQL with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number
+  of workers claim disjoint jobs without waiting on each other;
+* on SQLite the same single ``UPDATE ... RETURNING`` statement runs under
+  the database's write lock, which already keeps two claims apart.
+
+A claimed job holds a lease (``locked_until``). Finished jobs are deleted;
+failed attempts go back to the queue with exponential backoff until
+``max_attempts``, then stay in the table with status ``failed``. A job
+whose worker died is claimed again once its lease runs out, so delivery
+is at least once and handlers must be idempotent.
+
+A ``dedup_key`` makes :meth:`JobQueue.enqueue` a no-op while a job with
+the same key is still waiting; once that job is running, a new one may be
+queued to cover changes it might miss.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.job import Job
+
+QUEUED = "queued"
+RUNNING = "running"
+FAILED = "failed"
+
+Handler = Callable[..., Awaitable[Any]]
+
+# Job kind -> coroutine run as ``handler(db, **payload)``, see :func:`job`
+handlers: Dict[str, Handler] = {}
+
+
+def job(kind: str) -> Callable[[Handler], Handler]:
+    """Register the decorated coroutine as the handler of ``kind`` jobs"""
+    def register(handler: Handler) -> Handler:
+        handlers[kind] = handler
+        return handler
+    return register
+
+
+@dataclass
+class ClaimedJob:
+    """A job a worker holds the lease on"""
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int  # including this one
+    max_attempts: int
+    run_at: datetime
+    dedup_key: Optional[str] = None
+
+
+def retry_delay(attempts: int, base: float, cap: float, rng: Callable[[], float] = random.random) -> float:
+    """Seconds before retrying after ``attempts`` failures: doubling from ``base`` up to ``cap``, jittered
+
+    The jitter (between half and all of the delay) keeps jobs that failed
+    together, say while a dependency was down, from all retrying together.
+    """
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return delay * (0.5 + rng() / 2)
+
+
+def _insert(dialect_name: str):
+    return postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+
+
+def _claimed(rows) -> List[ClaimedJob]:
+    return [ClaimedJob(**row._mapping) for row in rows]
+
+
+_RETURNING = (Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts, Job.run_at, Job.dedup_key)
+
+
+class JobQueue:
+    """Enqueue, claim and settle jobs"""
+
+    @staticmethod
+    async def enqueue(
+        db: AsyncSession,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        *,
+        dedup_key: Optional[str] = None,
+        delay: float = 0.0,
+        max_attempts: Optional[int] = None,
+    ) -> Optional[int]:
+        """Queue a ``kind`` job in the caller's transaction; it is visible to workers once that commits
+
+        ``payload`` must be JSON-serialisable (pass ids as strings). Returns
+        the job's id, or ``None`` if a job with ``dedup_key`` is already
+        waiting.
+        """
+        now = datetime.utcnow()
+        values = {
+            "kind": kind,
+            "payload": payload or {},
+            "dedup_key": dedup_key,
+            "status": QUEUED,
+            "attempts": 0,
+            "max_attempts": max_attempts or settings.JOB_MAX_ATTEMPTS,
+            "run_at": now + timedelta(seconds=delay),
+            "created_at": now,
+        }
+        statement = _insert(db.get_bind().dialect.name)(Job).values(**values)
+        if dedup_key is not None:
+            statement = statement.on_conflict_do_nothing(
+                index_elements=[Job.dedup_key], index_where=Job.status == QUEUED
+            )
+        return (await db.execute(statement.returning(Job.id))).scalar_one_or_none()
+
+    @staticmethod
+    async def claim(
+        db: AsyncSession,
+        worker: str,
+        limit: int,
+        lease: float,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> List[ClaimedJob]:
+        """Lease up to ``limit`` due jobs to ``worker``, oldest first, and commit"""
+        now = datetime.utcnow()
+        due = select(Job.id).where(Job.status == QUEUED, Job.run_at <= now)
+        if kinds is not None:
+            due = due.where(Job.kind.in_(list(kinds)))
+        due = due.order_by(Job.run_at, Job.id).limit(limit).with_for_update(skip_locked=True)
+        rows = (await db.execute(
+            update(Job)
+            .where(Job.id.in_(due.scalar_subquery()))
+            .values(
+                status=RUNNING,
+                attempts=Job.attempts + 1,
+                locked_by=worker,
+                locked_until=now + timedelta(seconds=lease),
+            )
+            .returning(*_RETURNING)
+            .execution_options(synchronize_session=False)
+        )).all()
+        await db.commit()
+        return sorted(_claimed(rows), key=lambda claimed: (claimed.run_at, claimed.id))
+
+    @staticmethod
+    async def reclaim_expired(db: AsyncSession, worker: str, limit: int, lease: float) -> List[ClaimedJob]:
+        """Take over up to ``limit`` running jobs whose lease has run out, and commit
+
+        Their workers died or lost the database; each takeover counts as an attempt.
+        """
+        now = datetime.utcnow()
+        expired = (
+            select(Job.id)
+            .where(Job.status == RUNNING, Job.locked_until < now)
+            .order_by(Job.locked_until)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = (await db.execute(
+            update(Job)
+            .where(Job.id.in_(expired.scalar_subquery()), Job.status == RUNNING, Job.locked_until < now)
+            .values(attempts=Job.attempts + 1, locked_by=worker, locked_until=now + timedelta(seconds=lease))
+            .returning(*_RETURNING)
+            .execution_options(synchronize_session=False)
+        )).all()
+        await db.commit()
+        return _claimed(rows)
+
+    @staticmethod
+    async def complete(db: AsyncSession, job_id: int, worker: str) -> None:
+        """Remove a finished job, unless another worker has taken it over"""
+        await db.execute(delete(Job).where(Job.id == job_id, Job.locked_by == worker))
+        await db.commit()
+
+    @staticmethod
+    async def fail(db: AsyncSession, claimed: ClaimedJob, worker: str, error: str, retry_in: Optional[float]) -> None:
+        """Record a failed attempt: back to the queue in ``retry_in`` seconds, or failed for good if ``None``"""
+        now = datetime.utcnow()
+        mine = (Job.id == claimed.id, Job.locked_by == worker)
+        if retry_in is None:
+            await db.execute(
+                update(Job)
+                .where(*mine)
+                .values(status=FAILED, locked_by=None, locked_until=None, last_error=error, finished_at=now)
+            )
+        else:
+            try:
+                async with db.begin_nested():
+                    await db.execute(
+                        update(Job)
+                        .where(*mine)
+                        .values(
+                            status=QUEUED,
+                            run_at=now + timedelta(seconds=retry_in),
+                            locked_by=None,
+                            locked_until=None,
+                            last_error=error,
+                        )
+                    )
+            except IntegrityError:
+                # A job with the same dedup key was queued meanwhile and will do the work
+                await db.execute(delete(Job).where(*mine))
+        await db.commit()
+
+    @staticmethod
+    async def depth(db: AsyncSession) -> Dict[str, Dict[str, Any]]:
+        """Jobs in the table per kind and status, with the age of the oldest due one"""
+        now = datetime.utcnow()
+        rows = await db.execute(
+            select(
+                Job.kind,
+                Job.status,
+                func.count(),
+                func.min(Job.run_at).filter(Job.run_at <= now),
+            ).group_by(Job.kind, Job.status)
+        )
+        kinds: Dict[str, Dict[str, Any]] = {}
+        for kind, job_status, count, oldest in rows:
+            entry = kinds.setdefault(kind, {QUEUED: 0, RUNNING: 0, FAILED: 0, "oldest_due_seconds": None})
+            entry[job_status] = count
+            if job_status == QUEUED and oldest is not None:
+                entry["oldest_due_seconds"] = round((now - oldest).total_seconds(), 3)
+        return kinds
@@ -0,0 +1,250 @@
+"""Asyncio worker that runs queued jobs.
+
+Runs up to ``concurrency`` jobs at once, each with a session of its own,
+claiming more as slots free up and polling every ``poll_interval`` while
+the queue is empty. A job that raises, or outlives its lease, is retried
+with exponential backoff (see :func:`app.jobs.queue.retry_delay`). On
+SIGINT/SIGTERM the worker stops claiming and lets running jobs finish.
+
+    python -m app.jobs.worker --concurrency 8
+
+Per-kind counts, run time and queue wait percentiles and throughput are
+logged every ``JOB_STATS_INTERVAL_SECONDS``.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+from collections import deque
+from contextlib import suppress
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.jobs import handlers as _handlers  # noqa: F401  (registers the handlers)
+from app.jobs.queue import ClaimedJob, JobQueue, handlers, retry_delay
+
+logger = logging.getLogger(__name__)
+
+# How often running jobs with expired leases are looked for
+SWEEP_INTERVAL_SECONDS = 30.0
+# Window over which throughput is reported
+THROUGHPUT_WINDOW_SECONDS = 60.0
+
+
+def _percentile(samples: List[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class KindStats:
+    """Outcomes and timings of one job kind in this worker"""
+
+    def __init__(self, window: int = 1000, timer=time.monotonic) -> None:
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.timer = timer
+        # (finished at, seconds running, seconds waiting since due) of recent attempts
+        self._recent: Deque[Tuple[float, float, float]] = deque(maxlen=window)
+
+    def record(self, outcome: str, run_seconds: float, wait_seconds: float) -> None:
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        self._recent.append((self.timer(), run_seconds, wait_seconds))
+
+    def snapshot(self) -> dict:
+        since = self.timer() - THROUGHPUT_WINDOW_SECONDS
+        runs = [run for _, run, _ in self._recent]
+        waits = [wait for _, _, wait in self._recent]
+
+        def ms(value):
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "per_second": round(sum(1 for at, _, _ in self._recent if at >= since) / THROUGHPUT_WINDOW_SECONDS, 3),
+            "run_ms_p50": ms(_percentile(runs, 50)),
+            "run_ms_p95": ms(_percentile(runs, 95)),
+            "wait_ms_p50": ms(_percentile(waits, 50)),
+            "wait_ms_p95": ms(_percentile(waits, 95)),
+        }
+
+
+class Worker:
+    """Claims jobs from the queue and runs their handlers"""
+
+    def __init__(
+        self,
+        session_factory,
+        *,
+        concurrency: int = settings.JOB_WORKER_CONCURRENCY,
+        poll_interval: float = settings.JOB_POLL_INTERVAL_SECONDS,
+        lease: float = settings.JOB_LEASE_SECONDS,
+        retry_base: float = settings.JOB_RETRY_BASE_SECONDS,
+        retry_max: float = settings.JOB_RETRY_MAX_SECONDS,
+        kinds: Optional[Iterable[str]] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.kinds = list(kinds) if kinds is not None else None
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.kind_stats: Dict[str, KindStats] = {}
+        self._next_sweep = 0.0
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Run jobs until ``stop`` is set, then wait for those in progress"""
+        stop = stop or asyncio.Event()
+        running: Set[asyncio.Task] = set()
+        while not stop.is_set():
+            free = self.concurrency - len(running)
+            timeout = None
+            if free > 0:
+                try:
+                    claimed = await self.claim(free)
+                except Exception:
+                    logger.exception("Claiming jobs failed")
+                    claimed = []
+                for claimed_job in claimed:
+                    task = asyncio.create_task(self.execute(claimed_job))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                if len(claimed) == free:
+                    continue  # maybe more are due; claim again when a slot frees
+                timeout = self.poll_interval
+            # Wake for a free slot only when all are taken, else on the poll interval
+            stopping = asyncio.create_task(stop.wait())
+            await asyncio.wait(
+                [stopping, *running] if timeout is None else [stopping],
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            stopping.cancel()
+        if running:
+            await asyncio.wait(running)
+
+    async def run_until_empty(self) -> int:
+        """Run jobs until none is due; returns how many attempts were made"""
+        attempts = 0
+        while True:
+            claimed = await self.claim(self.concurrency)
+            if not claimed:
+                return attempts
+            await asyncio.gather(*(self.execute(claimed_job) for claimed_job in claimed))
+            attempts += len(claimed)
+
+    async def claim(self, limit: int) -> List[ClaimedJob]:
+        """Lease up to ``limit`` jobs: abandoned ones now and then, then due ones"""
+        async with self.session_factory() as db:
+            claimed = []
+            if time.monotonic() >= self._next_sweep:
+                self._next_sweep = time.monotonic() + SWEEP_INTERVAL_SECONDS
+                claimed = await JobQueue.reclaim_expired(db, self.name, limit, self.lease)
+                for abandoned in claimed:
+                    logger.warning("Reclaimed job %s (%s) after its lease expired", abandoned.id, abandoned.kind)
+            if len(claimed) < limit:
+                claimed += await JobQueue.claim(db, self.name, limit - len(claimed), self.lease, self.kinds)
+            return claimed
+
+    async def execute(self, claimed: ClaimedJob) -> None:
+        """Run one claimed job and record its outcome"""
+        wait = max(0.0, (datetime.utcnow() - claimed.run_at).total_seconds())
+        start = time.perf_counter()
+        error = None
+        try:
+            handler = handlers.get(claimed.kind)
+            if handler is None:
+                raise LookupError(f"No handler for job kind {claimed.kind!r}")
+            async with self.session_factory() as db:
+                await asyncio.wait_for(handler(db, **claimed.payload), timeout=self.lease)
+        except asyncio.TimeoutError:
+            error = f"Timed out after {self.lease:g}s"
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            logger.warning("Job %s (%s) attempt %d failed", claimed.id, claimed.kind, claimed.attempts, exc_info=True)
+        seconds = time.perf_counter() - start
+
+        stats = self.kind_stats.setdefault(claimed.kind, KindStats())
+        try:
+            async with self.session_factory() as db:
+                if error is None:
+                    await JobQueue.complete(db, claimed.id, self.name)
+                    stats.record("succeeded", seconds, wait)
+                elif claimed.attempts < claimed.max_attempts:
+                    delay = retry_delay(claimed.attempts, self.retry_base, self.retry_max)
+                    await JobQueue.fail(db, claimed, self.name, error, retry_in=delay)
+                    stats.record("retried", seconds, wait)
+                else:
+                    await JobQueue.fail(db, claimed, self.name, error, retry_in=None)
+                    stats.record("failed", seconds, wait)
+                    logger.error("Job %s (%s) failed after %d attempts: %s",
+                                 claimed.id, claimed.kind, claimed.attempts, error)
+        except Exception:
+            # The lease will run out and another worker will take the job over
+            logger.exception("Recording the outcome of job %s failed", claimed.id)
+
+    def stats(self) -> dict:
+        """Per-kind outcomes, timings and throughput of this worker"""
+        return {
+            "worker": self.name,
+            "concurrency": self.concurrency,
+            "kinds": {kind: stats.snapshot() for kind, stats in sorted(self.kind_stats.items())},
+        }
+
+
+async def report_stats(worker: Worker, interval: float) -> None:
+    """Log the worker's stats every ``interval`` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        for kind, stats in worker.stats()["kinds"].items():
+            logger.info("jobs %s: %s", kind, stats)
+
+
+async def main(args: argparse.Namespace) -> None:
+    from app.core.invalidation import invalidation_bus
+    from app.core.response_cache import evict_keys
+    from app.db.session import AsyncSessionLocal, engine
+
+    # Jobs' writes must reach the API workers' caches too
+    await invalidation_bus.start(evict_keys)
+    worker = Worker(AsyncSessionLocal, concurrency=args.concurrency, kinds=args.kinds)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    reporter = asyncio.create_task(report_stats(worker, settings.JOB_STATS_INTERVAL_SECONDS))
+    logger.info("Worker %s running up to %d jobs at once", worker.name, worker.concurrency)
+    try:
+        if args.until_empty:
+            await worker.run_until_empty()
+        else:
+            await worker.run(stop)
+    finally:
+        reporter.cancel()
+        with suppress(asyncio.CancelledError):
+            await reporter
+        for kind, stats in worker.stats()["kinds"].items():
+            logger.info("jobs %s: %s", kind, stats)
+        await invalidation_bus.stop()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run queued background jobs")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+    parser.add_argument("--kinds", nargs="+", help="only run jobs of these kinds")
+    parser.add_argument("--until-empty", action="store_true", help="exit once no job is due")
+    logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main(parser.parse_args()))
@@ -1,21 +1,73 @@
 """FastAPI main application"""
 
-from fastapi import FastAPI
+import asyncio
+import uuid
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import Depends, FastAPI, HTTPException, Query, WebSocket, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.admission import AdmissionControlMiddleware, concurrency_limits, create_rate_limit_backend
 from app.core.config import get_settings
+from app.core.invalidation import invalidation_bus
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core.middleware import DatabaseRoutingMiddleware, QueryBudgetMiddleware
 from app.api.v1.api import api_router
-from app.database import Base, engine
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+from app.api.v1.dependencies import authenticate_token
+from app.core.response_cache import evict_keys
+from app.core.security import password_hasher
+from app.db.session import AsyncSessionLocal, engine, get_db, read_engine, warm_pools
+from app.models.board import Board
+from app.realtime.hub import board_hub
+from app.jobs.worker import Worker
+from app.services.archive_service import run_archiver
+from app import models  # noqa: F401  (registers models and their flush hooks)
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the connection pools on startup; release them and the hashing threads on shutdown
+
+    The schema is managed by migrations (``alembic upgrade head``), not here.
+    The archiver runs in the background when ``ARCHIVE_AFTER_DAYS`` is set,
+    and a job worker with ``JOB_WORKER_IN_APP``.
+    """
+    await warm_pools()
+    await board_hub.start()
+    await invalidation_bus.start(evict_keys)
+    archiver = None
+    if settings.ARCHIVE_AFTER_DAYS > 0:
+        archiver = asyncio.create_task(run_archiver(AsyncSessionLocal))
+    stop_worker = asyncio.Event()
+    worker = None
+    if settings.JOB_WORKER_IN_APP:
+        worker = asyncio.create_task(Worker(AsyncSessionLocal).run(stop_worker))
+    yield
+    if worker is not None:
+        stop_worker.set()
+        await worker
+    if archiver is not None:
+        archiver.cancel()
+        with suppress(asyncio.CancelledError):
+            await archiver
+    await invalidation_bus.stop()
+    await board_hub.stop()
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
+    password_hasher.shutdown()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="Project management API for small teams"
+    description="Project management API for small teams",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -27,6 +79,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Route reads to the replica and keep recent writers on the primary
+app.add_middleware(
+    DatabaseRoutingMiddleware,
+    sticky_seconds=settings.DB_PRIMARY_STICKY_SECONDS if settings.DATABASE_READ_URL else 0,
+)
+
+# Development aid: warn about requests that run too many statements
+if settings.QUERY_BUDGET > 0 or settings.QUERY_BUDGET_FLAG_REPEATS:
+    app.add_middleware(QueryBudgetMiddleware)
+
+# Shed excess load before it reaches the database
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        backend=create_rate_limit_backend(),
+        limits=concurrency_limits,
+        routes=app.router.routes,
+        user_rate=(settings.RATE_LIMIT_USER_PER_MINUTE / 60, settings.RATE_LIMIT_USER_BURST),
+        ip_rate=(settings.RATE_LIMIT_IP_PER_MINUTE / 60, settings.RATE_LIMIT_IP_BURST),
+        exempt=("/health", "/metrics", f"{settings.API_V1_STR}/health"),
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    )
+
+# Outermost, so latency covers the other middleware too
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, server_timing=settings.METRICS_SERVER_TIMING)
+
 # Include API routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -36,11 +115,53 @@ async def root():
     """Root endpoint"""
     return {
         "name": settings.APP_NAME,
+        "message": f"{settings.APP_NAME} API",
         "version": settings.APP_VERSION,
         "docs": f"{settings.API_V1_STR}/docs"
     }
 
 
+@app.get("/health")
+async def liveness():
+    """Liveness probe for load balancers"""
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    """Per-route request metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.websocket("/ws/boards/{board_id}")
+async def board_updates(
+    websocket: WebSocket,
+    board_id: uuid.UUID,
+    token: str = Query(...),
+    db: AsyncSession = Depends(get_db),
+):
+    """Push task create/update/move/delete events for one board
+
+    Browsers can't set headers on WebSocket requests, so the access token
+    comes in the ``token`` query parameter. Frames are
+    ``{"type": "events", "events": [...]}`` or ``{"type": "resync"}``.
+    """
+    try:
+        await authenticate_token(token, db)
+        board = await db.get(Board, board_id)
+    except HTTPException:
+        board = None
+    finally:
+        # Don't hold a pooled connection for the lifetime of the socket
+        await db.close()
+    if board is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await board_hub.serve(websocket, board_id)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
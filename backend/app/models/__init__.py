@@ -3,6 +3,16 @@
 from app.models.user import User
 from app.models.project import Project
 from app.models.board import Board
-from app.models.task import Task
+from app.models.task import ArchivedTask, Task
+from app.models.change import ChangeCounter, Tombstone
+from app.models.analytics import CycleTimeDaily, FlowDaily, TaskTransition
+from app.models.job import Job
+from app.models.task_import import TaskImport
 
-__all__ = ["User", "Project", "Board", "Task"]
+__all__ = [
+    "User", "Project", "Board", "Task", "ArchivedTask", "ChangeCounter", "Tombstone", "TaskTransition", "FlowDaily",
+    "CycleTimeDaily", "Job", "TaskImport",
+]
+
+# Stamp change sequences and record status transitions on every flush
+from app.db import changes, flow  # noqa: E402,F401
@@ -0,0 +1,53 @@
+"""Board analytics models."""
+
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, Date, DateTime, Float, Index, Integer, String, Uuid
+
+from app.db.base import Base
+
+
+class TaskTransition(Base):
+    """A task entering a column, leaving one, or both (see app.db.flow)."""
+
+    __tablename__ = "task_transitions"
+    __table_args__ = (
+        Index("ix_task_transitions_task", "task_id", "id"),
+        Index("ix_task_transitions_to_project_occurred", "to_project_id", "occurred_at"),
+        Index("ix_task_transitions_from_project_occurred", "from_project_id", "occurred_at"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    task_id = Column(Uuid, nullable=False)
+    # Null on the "from" side for created tasks and on the "to" side for deleted ones
+    from_project_id = Column(Uuid)
+    from_board_id = Column(Uuid)
+    from_status = Column(String)
+    to_project_id = Column(Uuid)
+    to_board_id = Column(Uuid)
+    to_status = Column(String)
+    occurred_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    cycle_seconds = Column(Float)  # set when the task was completed
+
+
+class FlowDaily(Base):
+    """Tasks entering and leaving a status on one day, for a board or a whole project."""
+
+    __tablename__ = "flow_daily"
+
+    scope_id = Column(Uuid, primary_key=True)  # board or project id
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    entered = Column(Integer, nullable=False, default=0)
+    exited = Column(Integer, nullable=False, default=0)
+
+
+class CycleTimeDaily(Base):
+    """Cycle times of tasks completed on one day, bucketed, for a board or a whole project."""
+
+    __tablename__ = "cycle_time_daily"
+
+    scope_id = Column(Uuid, primary_key=True)  # board or project id
+    day = Column(Date, primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # index into app.db.flow.CYCLE_TIME_BUCKETS
+    count = Column(Integer, nullable=False, default=0)
+    total_seconds = Column(Float, nullable=False, default=0.0)
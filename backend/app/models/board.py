@@ -1,8 +1,7 @@
 """Board model."""
 
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, String, DateTime, ForeignKey, Index, Integer, Uuid
 import uuid
 
 from app.db.base import Base
@@ -12,9 +11,15 @@ class Board(Base):
     """Board database model."""
 
     __tablename__ = "boards"
+    __table_args__ = (
+        # Delta sync; also serves plain project_id lookups
+        Index("ix_boards_project_change_seq", "project_id", "change_seq"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    project_id = Column(Uuid, ForeignKey("projects.id"), nullable=False)
     name = Column(String, nullable=False)
     order = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default="0")  # see app.db.changes
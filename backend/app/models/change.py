@@ -0,0 +1,31 @@
+"""Change-tracking models."""
+
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, String, DateTime, ForeignKey, Index, Integer, Uuid
+
+from app.db.base import Base
+
+
+class ChangeCounter(Base):
+    """Last change sequence number handed out in a project."""
+
+    __tablename__ = "change_counters"
+
+    project_id = Column(Uuid, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+class Tombstone(Base):
+    """Record of a deleted board or task, kept for delta sync."""
+
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_project_change_seq", "project_id", "change_seq"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    project_id = Column(Uuid, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    entity = Column(String, nullable=False)  # board, task
+    entity_id = Column(Uuid, nullable=False)
+    change_seq = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
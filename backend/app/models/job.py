@@ -0,0 +1,38 @@
+"""Background job model."""
+
+from datetime import datetime
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Index, Integer, String, Text, text
+
+from app.db.base import Base
+
+
+class Job(Base):
+    """A unit of background work, queued until a worker claims it (see app.jobs)."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claiming: the oldest due job first
+        Index("ix_jobs_status_run_at", "status", "run_at", "id"),
+        # At most one waiting job per deduplication key
+        Index(
+            "uq_jobs_queued_dedup_key",
+            "dedup_key",
+            unique=True,
+            postgresql_where=text("status = 'queued'"),
+            sqlite_where=text("status = 'queued'"),
+        ),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    dedup_key = Column(String)
+    status = Column(String, nullable=False, default="queued")  # queued, running, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String)
+    locked_until = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime)  # failed jobs only; finished ones are deleted
@@ -1,24 +1,70 @@
 """Task model."""
 
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, String, DateTime, ForeignKey, Index, Text, Uuid
 import uuid
 
 from app.db.base import Base
+from app.db.search import register_search_ddl
 
 
 class Task(Base):
     """Task database model."""
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination over a board, optionally filtered by status;
+        # these also serve plain board_id lookups
+        Index("ix_tasks_board_status_updated", "board_id", "status", "updated_at", "id"),
+        Index("ix_tasks_board_updated", "board_id", "updated_at", "id"),
+        # Card order within a column
+        Index("ix_tasks_board_status_rank", "board_id", "status", "rank"),
+        # Delta sync
+        Index("ix_tasks_board_change_seq", "board_id", "change_seq"),
+        # "My tasks" views
+        Index("ix_tasks_assignee_status", "assignee", "status"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    board_id = Column(UUID(as_uuid=True), ForeignKey("boards.id"), nullable=False, index=True)
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    board_id = Column(Uuid, ForeignKey("boards.id"), nullable=False)
     title = Column(String, nullable=False)
     description = Column(Text)
-    assignee = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    assignee = Column(Uuid, ForeignKey("users.id"))
     priority = Column(String, default="medium")  # low, medium, high
     status = Column(String, default="todo")  # todo, in-progress, done
+    rank = Column(String)  # position within (board_id, status); see app.core.ranking
     created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)  # first left "todo"; cycle time runs from here, see app.db.flow
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default="0")  # see app.db.changes
+
+
+register_search_ddl(Task.__table__)
+
+
+class ArchivedTask(Base):
+    """Task moved out of ``tasks`` after sitting in "done"; see app.services.archive_service.
+
+    Mirrors the columns of :class:`Task`. Only the index behind
+    ``include_archived`` listings is kept, so the cold rows cost little to
+    hold and nothing to the hot set's queries.
+    """
+
+    __tablename__ = "archived_tasks"
+    __table_args__ = (
+        Index("ix_archived_tasks_board_updated", "board_id", "updated_at", "id"),
+    )
+
+    id = Column(Uuid, primary_key=True)
+    board_id = Column(Uuid, ForeignKey("boards.id"), nullable=False)
+    title = Column(String, nullable=False)
+    description = Column(Text)
+    assignee = Column(Uuid, ForeignKey("users.id"))
+    priority = Column(String)
+    status = Column(String)
+    rank = Column(String)
+    created_at = Column(DateTime)
+    started_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
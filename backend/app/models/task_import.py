@@ -0,0 +1,33 @@
+"""Task import model."""
+
+from datetime import datetime
+from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Integer, String, Uuid
+import uuid
+
+from app.db.base import Base
+
+
+class TaskImport(Base):
+    """Progress of a bulk task upload, committed with every batch (see app.services.import_service)."""
+
+    __tablename__ = "task_imports"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)  # chosen by the client, so a retry finds it
+    project_id = Column(Uuid, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    created_by = Column(Uuid, ForeignKey("users.id"))
+    format = Column(String, nullable=False)  # csv, ndjson
+    status = Column(String, nullable=False, default="running")  # running, completed
+    rows_read = Column(Integer, nullable=False, default=0)  # a resumed upload skips this many rows
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=False, default=list)  # the first rejected rows, with reasons
+    elapsed_seconds = Column(Float, nullable=False, default=0.0)  # summed over every upload attempt
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    @property
+    def rows_per_second(self) -> float | None:
+        if not self.elapsed_seconds:
+            return None
+        return round((self.rows_imported + self.rows_failed) / self.elapsed_seconds, 1)
@@ -0,0 +1 @@
+"""Real-time board updates."""
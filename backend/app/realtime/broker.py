@@ -0,0 +1,107 @@
+"""Brokers that carry board events between application workers.
+
+Every worker publishes the events its own requests produce and delivers
+whatever the broker hands back to its local :class:`~app.realtime.hub.BoardHub`.
+:class:`InMemoryBroker` serves a single process (and the tests);
+:class:`RedisBroker` fans events out to every worker subscribed to the
+same channel.
+"""
+
+import asyncio
+import json
+from typing import Callable, List, Optional
+
+Deliver = Callable[[str, List[dict]], None]
+
+
+class Broker:
+    """Interface for publishing board events to every worker."""
+
+    async def start(self, deliver: Deliver) -> None:
+        """Begin passing received events to ``deliver(board_id, events)``."""
+        raise NotImplementedError
+
+    async def stop(self, deliver: Deliver) -> None:
+        """Stop delivering events to ``deliver``."""
+        raise NotImplementedError
+
+    async def publish(self, board_id: str, events: List[dict]) -> None:
+        """Send ``events`` for ``board_id`` to every started worker."""
+        raise NotImplementedError
+
+
+class InMemoryBroker(Broker):
+    """Delivers events synchronously to the hubs of this process."""
+
+    def __init__(self) -> None:
+        self._subscribers: List[Deliver] = []
+
+    async def start(self, deliver: Deliver) -> None:
+        self._subscribers.append(deliver)
+
+    async def stop(self, deliver: Deliver) -> None:
+        if deliver in self._subscribers:
+            self._subscribers.remove(deliver)
+
+    async def publish(self, board_id: str, events: List[dict]) -> None:
+        for deliver in list(self._subscribers):
+            deliver(board_id, events)
+
+
+class RedisBroker(Broker):
+    """Shares events between workers over a Redis pub/sub channel.
+
+    Requires the optional ``redis`` package.
+    """
+
+    def __init__(self, url: str, channel: str = "taskflow:boards") -> None:
+        self.url = url
+        self.channel = channel
+        self._redis = None
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(self.url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel)
+        self._reader = asyncio.create_task(self._read(deliver))
+
+    async def stop(self, deliver: Deliver) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.channel)
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def publish(self, board_id: str, events: List[dict]) -> None:
+        if self._redis is None:
+            return
+        await self._redis.publish(self.channel, json.dumps({"board_id": board_id, "events": events}))
+
+    async def _read(self, deliver: Deliver) -> None:
+        async for message in self._pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            payload = json.loads(message["data"])
+            deliver(payload["board_id"], payload["events"])
+
+
+def create_broker(url: Optional[str]) -> Broker:
+    """Build the broker named by ``url``; no URL means in-process only."""
+    if not url or url == "memory://":
+        return InMemoryBroker()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported realtime broker URL: {url}")
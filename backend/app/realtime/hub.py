@@ -0,0 +1,190 @@
+"""Per-board fan-out of task events to WebSocket subscribers.
+
+Each connection owns a :class:`BoardSubscription` that coalesces pending
+events by task, so a burst of changes reaches the client as one frame per
+tick carrying each task's latest state. A subscriber that falls more than
+``max_pending`` tasks behind has its backlog dropped and receives a single
+``resync`` frame instead, telling it to reload the board.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from pydantic_core import to_jsonable_python
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+from app.realtime.broker import Broker, create_broker
+from app.schemas.task import TaskResponse
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_MOVED = "task.moved"
+TASK_DELETED = "task.deleted"
+COLUMN_REBALANCED = "column.rebalanced"
+
+# When events for one task are merged, the most significant type is kept
+_PRECEDENCE = {TASK_UPDATED: 0, TASK_MOVED: 1, TASK_CREATED: 2}
+
+
+def task_event(kind: str, task: Any) -> dict:
+    """Build an event for a task given as an ORM object or a dict of known fields."""
+    if isinstance(task, dict):
+        payload = to_jsonable_python(task)
+    else:
+        payload = TaskResponse.model_validate(task).model_dump(mode="json")
+    return {"type": kind, "task": payload}
+
+
+def column_event(status: str) -> dict:
+    """Build an event telling clients a whole column was re-ranked."""
+    return {"type": COLUMN_REBALANCED, "status": status}
+
+
+def _event_key(event: dict) -> str:
+    if event["type"] == COLUMN_REBALANCED:
+        return f"column:{event['status']}"
+    return f"task:{event['task']['id']}"
+
+
+def _merge(previous: Optional[dict], event: dict) -> Optional[dict]:
+    """Fold ``event`` into the pending event for the same key; ``None`` drops both."""
+    if previous is None or previous["type"] == TASK_DELETED or event["type"] == COLUMN_REBALANCED:
+        return event
+    if event["type"] == TASK_DELETED:
+        return None if previous["type"] == TASK_CREATED else event
+    kind = max(previous["type"], event["type"], key=_PRECEDENCE.__getitem__)
+    return {"type": kind, "task": {**previous["task"], **event["task"]}}
+
+
+class BoardSubscription:
+    """Bounded, coalescing buffer of events for one connection."""
+
+    def __init__(self, max_pending: int) -> None:
+        self.max_pending = max_pending
+        self._pending: Dict[str, dict] = {}
+        self._resync = False
+        self._ready = asyncio.Event()
+
+    def push(self, events: List[dict]) -> None:
+        """Queue ``events``, switching to a resync when the backlog is too large."""
+        if not self._resync:
+            for event in events:
+                key = _event_key(event)
+                merged = _merge(self._pending.pop(key, None), event)
+                if merged is not None:
+                    self._pending[key] = merged
+            if len(self._pending) > self.max_pending:
+                self._pending.clear()
+                self._resync = True
+        if self._resync or self._pending:
+            self._ready.set()
+
+    async def next_frame(self, tick: float) -> dict:
+        """Wait for events, let the burst gather for ``tick`` seconds, then drain it."""
+        while True:
+            await self._ready.wait()
+            await asyncio.sleep(tick)
+            self._ready.clear()
+            if self._resync:
+                self._resync = False
+                return {"type": "resync"}
+            if self._pending:
+                events = list(self._pending.values())
+                self._pending.clear()
+                return {"type": "events", "events": events}
+
+
+class BoardHub:
+    """Routes events from the broker to the subscribers of each board."""
+
+    def __init__(self, broker: Broker, tick: float, max_pending: int) -> None:
+        self.broker = broker
+        self.tick = tick
+        self.max_pending = max_pending
+        self._boards: Dict[str, Set[BoardSubscription]] = {}
+        self.events_published = 0
+        self.frames_sent = 0
+        self.resyncs = 0
+
+    async def start(self) -> None:
+        """Start receiving events from the broker."""
+        await self.broker.start(self.dispatch)
+
+    async def stop(self) -> None:
+        """Stop receiving events from the broker."""
+        await self.broker.stop(self.dispatch)
+
+    async def publish(self, board_id: Any, events: List[dict]) -> None:
+        """Send ``events`` for ``board_id`` to subscribers on every worker."""
+        if events:
+            self.events_published += len(events)
+            await self.broker.publish(str(board_id), events)
+
+    def dispatch(self, board_id: str, events: List[dict]) -> None:
+        """Hand events received from the broker to this worker's subscribers."""
+        for subscription in self._boards.get(board_id, ()):
+            subscription.push(events)
+
+    def subscribe(self, board_id: Any) -> BoardSubscription:
+        """Register a new subscriber to ``board_id``."""
+        subscription = BoardSubscription(self.max_pending)
+        self._boards.setdefault(str(board_id), set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, board_id: Any, subscription: BoardSubscription) -> None:
+        """Remove a subscriber, forgetting the board once nobody watches it."""
+        subscribers = self._boards.get(str(board_id))
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._boards[str(board_id)]
+
+    async def serve(self, websocket: WebSocket, board_id: Any) -> None:
+        """Stream frames for ``board_id`` to an accepted socket until it disconnects."""
+        subscription = self.subscribe(board_id)
+        sender = asyncio.create_task(self._send_frames(websocket, subscription, str(board_id)))
+        receiver = asyncio.create_task(self._wait_for_disconnect(websocket))
+        try:
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.unsubscribe(board_id, subscription)
+            for task in (sender, receiver):
+                task.cancel()
+            await asyncio.gather(sender, receiver, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Return subscriber and delivery counters for this worker."""
+        return {
+            "boards": len(self._boards),
+            "subscribers": sum(len(subscribers) for subscribers in self._boards.values()),
+            "events_published": self.events_published,
+            "frames_sent": self.frames_sent,
+            "resyncs": self.resyncs,
+        }
+
+    async def _send_frames(self, websocket: WebSocket, subscription: BoardSubscription, board_id: str) -> None:
+        while True:
+            frame = await subscription.next_frame(self.tick)
+            if frame["type"] == "resync":
+                self.resyncs += 1
+            try:
+                await websocket.send_json({**frame, "board_id": board_id})
+            except (WebSocketDisconnect, RuntimeError):
+                return
+            self.frames_sent += 1
+
+    @staticmethod
+    async def _wait_for_disconnect(websocket: WebSocket) -> None:
+        # Clients don't send anything meaningful; reading only notices when they leave
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+
+board_hub = BoardHub(
+    create_broker(settings.REALTIME_BROKER_URL),
+    tick=settings.REALTIME_TICK_SECONDS,
+    max_pending=settings.REALTIME_MAX_PENDING,
+)
@@ -0,0 +1,47 @@
+"""Analytics schemas for responses"""
+
+from datetime import date
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class FlowDay(BaseModel):
+    """Tasks in each status at the end of a day, and tasks completed that day"""
+    day: date
+    todo: int
+    in_progress: int
+    done: int
+    completed: int
+
+
+class CumulativeFlow(BaseModel):
+    """Cumulative flow over a date range"""
+    since: date
+    until: date
+    days: List[FlowDay]
+
+
+class CycleTimeBucket(BaseModel):
+    """Tasks completed within ``le_hours`` (and above the previous bucket); ``None`` is unbounded"""
+    le_hours: Optional[float]
+    count: int
+
+
+class CycleTimeStats(BaseModel):
+    """Cycle times of the tasks completed in a date range
+
+    Percentiles are interpolated within histogram buckets.
+    """
+    since: date
+    until: date
+    completed: int
+    mean_hours: Optional[float] = None
+    p50_hours: Optional[float] = None
+    p85_hours: Optional[float] = None
+    p95_hours: Optional[float] = None
+    buckets: List[CycleTimeBucket]
+
+
+class RebuildQueued(BaseModel):
+    """A queued rollup rebuild; ``job_id`` is ``None`` when one was already waiting"""
+    job_id: Optional[int]
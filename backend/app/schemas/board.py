@@ -0,0 +1,40 @@
+"""Board schemas for request/response validation"""
+
+import uuid
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List
+
+from app.schemas.task import TaskResponse
+
+
+class BoardBase(BaseModel):
+    """Base board schema"""
+    name: str
+    order: int = 0
+
+
+class BoardCreate(BoardBase):
+    """Board creation schema"""
+    project_id: uuid.UUID
+
+
+class BoardResponse(BoardBase):
+    """Board response schema"""
+    id: uuid.UUID
+    project_id: uuid.UUID
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class BoardSummary(BoardResponse):
+    """Board with its task count"""
+    task_count: int = 0
+
+
+class BoardWithTasks(BoardResponse):
+    """Board with its tasks"""
+    tasks: List[TaskResponse] = []
@@ -1,8 +1,12 @@
 """Project schemas for request/response validation"""
 
+import uuid
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+
+from app.schemas.board import BoardResponse, BoardWithTasks
+from app.schemas.task import TaskResponse
 
 
 class ProjectBase(BaseModel):
@@ -24,10 +28,31 @@ class ProjectUpdate(BaseModel):
 
 class ProjectResponse(ProjectBase):
     """Project response schema"""
-    id: int
-    owner_id: int
+    id: uuid.UUID
+    created_by: uuid.UUID
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
+
+
+class ProjectSnapshot(ProjectResponse):
+    """Project with its boards (in board order) and their tasks"""
+    boards: List[BoardWithTasks] = []
+
+
+class DeletedEntity(BaseModel):
+    """A board or task deleted from the project"""
+    entity: str
+    id: uuid.UUID
+
+
+class ProjectChanges(BaseModel):
+    """Rows changed since a delta-sync cursor"""
+    project: Optional[ProjectResponse] = None
+    boards: List[BoardResponse] = []
+    tasks: List[TaskResponse] = []
+    deleted: List[DeletedEntity] = []
+    next_cursor: str
+    has_more: bool = False
@@ -1,8 +1,9 @@
 """Task schemas for request/response validation"""
 
-from pydantic import BaseModel
+import uuid
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional, Union
 from enum import Enum as PyEnum
 
 
@@ -13,18 +14,25 @@ class TaskStatus(str, PyEnum):
     DONE = "done"
 
 
+class TaskPriority(str, PyEnum):
+    """Task priority enumeration"""
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+
 class TaskBase(BaseModel):
     """Base task schema"""
     title: str
     description: Optional[str] = None
     status: TaskStatus = TaskStatus.TODO
-    assigned_to: Optional[int] = None
-    due_date: Optional[datetime] = None
+    priority: TaskPriority = TaskPriority.MEDIUM
+    assignee: Optional[uuid.UUID] = None
 
 
 class TaskCreate(TaskBase):
     """Task creation schema"""
-    pass
+    board_id: uuid.UUID
 
 
 class TaskUpdate(BaseModel):
@@ -32,17 +40,128 @@ class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     status: Optional[TaskStatus] = None
-    assigned_to: Optional[int] = None
-    due_date: Optional[datetime] = None
+    priority: Optional[TaskPriority] = None
+    assignee: Optional[uuid.UUID] = None
 
 
 class TaskResponse(TaskBase):
     """Task response schema"""
-    id: int
-    project_id: int
-    created_by: int
+    id: uuid.UUID
+    board_id: uuid.UUID
+    rank: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
+
+
+class TaskMove(BaseModel):
+    """Move a task within or across columns
+
+    The task is placed after ``after_id`` and before ``before_id``; give
+    either, both or neither (neither appends it to the end of the column).
+    ``board_id`` and ``status`` default to the task's current column.
+    """
+    board_id: Optional[uuid.UUID] = None
+    status: Optional[TaskStatus] = None
+    after_id: Optional[uuid.UUID] = None
+    before_id: Optional[uuid.UUID] = None
+
+
+class TaskPage(BaseModel):
+    """One page of tasks
+
+    Pass ``next_cursor`` back as ``cursor`` to fetch the following page;
+    it is ``None`` on the last page.
+    """
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+
+class TaskCreateOperation(BaseModel):
+    """Batch operation: create a task"""
+    op: Literal["create"]
+    task: TaskCreate
+
+
+class TaskUpdateOperation(BaseModel):
+    """Batch operation: change fields of a task"""
+    op: Literal["update"]
+    id: uuid.UUID
+    changes: TaskUpdate
+
+
+class TaskMoveOperation(BaseModel):
+    """Batch operation: move a task to another board and/or status"""
+    op: Literal["move"]
+    id: uuid.UUID
+    board_id: Optional[uuid.UUID] = None
+    status: Optional[TaskStatus] = None
+
+
+class TaskDeleteOperation(BaseModel):
+    """Batch operation: delete a task"""
+    op: Literal["delete"]
+    id: uuid.UUID
+
+
+TaskOperation = Union[
+    TaskCreateOperation, TaskUpdateOperation, TaskMoveOperation, TaskDeleteOperation
+]
+
+
+class TaskBatchRequest(BaseModel):
+    """Batch of task operations
+
+    Each operation is validated on its own, so one malformed item is
+    reported in its result instead of failing the whole batch.
+    """
+    operations: List[Dict[str, Any]] = Field(..., min_length=1, max_length=1000)
+
+
+class TaskBatchResult(BaseModel):
+    """Outcome of one batch operation"""
+    index: int
+    op: Optional[str] = None
+    id: Optional[uuid.UUID] = None
+    ok: bool
+    error: Optional[str] = None
+
+
+class TaskBatchResponse(BaseModel):
+    """Per-operation results of a batch"""
+    applied: int
+    failed: int
+    results: List[TaskBatchResult]
+
+
+class TaskImportError(BaseModel):
+    """A rejected import row; ``row`` counts data rows from 1, not file lines"""
+    row: int
+    error: str
+
+
+class TaskImportResponse(BaseModel):
+    """Progress of a bulk import
+
+    ``errors`` lists the first rejected rows; ``rows_failed`` counts them all.
+    An import left ``running`` by a dropped upload resumes when the same
+    file is uploaded again under its id.
+    """
+    id: uuid.UUID
+    project_id: uuid.UUID
+    format: str
+    status: str
+    rows_read: int
+    rows_imported: int
+    rows_failed: int
+    errors: List[TaskImportError]
+    elapsed_seconds: float
+    rows_per_second: Optional[float] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,6 @@
 """User schemas."""
 
+import uuid
 from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, EmailStr
@@ -28,7 +29,7 @@ class UserUpdate(BaseModel):
 class UserResponse(UserBase):
     """User response schema."""
 
-    id: str
+    id: uuid.UUID
     is_active: bool
     created_at: datetime
     updated_at: datetime
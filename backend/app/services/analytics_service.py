@@ -0,0 +1,115 @@
+"""Analytics service - charts read from the daily rollups of app.db.flow"""
+
+import uuid
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.flow import CYCLE_TIME_BUCKETS, DONE
+from app.models.analytics import CycleTimeDaily, FlowDaily
+from app.models.board import Board
+from app.schemas.analytics import CumulativeFlow, CycleTimeBucket, CycleTimeStats, FlowDay
+from app.schemas.task import TaskStatus
+
+PERCENTILES = (50, 85, 95)
+
+
+class AnalyticsService:
+    """Service for board and project analytics
+
+    Every chart is keyed by a scope: a board id, or a project id for the
+    whole project. Reads touch a bounded number of rollup rows per day in
+    the range, independent of how many tasks the scope holds.
+    """
+
+    @staticmethod
+    async def board_in_project(db: AsyncSession, board_id: uuid.UUID, project_id: uuid.UUID) -> bool:
+        """Whether ``board_id`` belongs to ``project_id``"""
+        query = select(Board.id).where(Board.id == board_id, Board.project_id == project_id)
+        return (await db.execute(query)).first() is not None
+
+    @staticmethod
+    async def cumulative_flow(db: AsyncSession, scope_id: uuid.UUID, since: date, until: date) -> CumulativeFlow:
+        """Tasks per status at the end of each day from ``since`` to ``until``
+
+        The levels on the day before ``since`` are the sum of all earlier
+        rollups; each day in the range then applies its own.
+        """
+        before = await db.execute(
+            select(FlowDaily.status, func.sum(FlowDaily.entered - FlowDaily.exited))
+            .where(FlowDaily.scope_id == scope_id, FlowDaily.day < since)
+            .group_by(FlowDaily.status)
+        )
+        levels = {status.value: 0 for status in TaskStatus}
+        for status, level in before:
+            if status in levels:
+                levels[status] = level or 0
+
+        rows = await db.execute(
+            select(FlowDaily.day, FlowDaily.status, FlowDaily.entered, FlowDaily.exited)
+            .where(FlowDaily.scope_id == scope_id, FlowDaily.day >= since, FlowDaily.day <= until)
+        )
+        deltas: Dict[date, List[Tuple[str, int, int]]] = {}
+        for day, status, entered, exited in rows:
+            deltas.setdefault(day, []).append((status, entered, exited))
+
+        days = []
+        day = since
+        while day <= until:
+            completed = 0
+            for status, entered, exited in deltas.get(day, ()):
+                if status in levels:
+                    levels[status] += entered - exited
+                if status == DONE:
+                    completed = entered
+            days.append(FlowDay(day=day, completed=completed, **levels))
+            day += timedelta(days=1)
+        return CumulativeFlow(since=since, until=until, days=days)
+
+    @staticmethod
+    async def cycle_time(db: AsyncSession, scope_id: uuid.UUID, since: date, until: date) -> CycleTimeStats:
+        """Cycle time distribution of the tasks completed from ``since`` to ``until``"""
+        rows = await db.execute(
+            select(CycleTimeDaily.bucket, func.sum(CycleTimeDaily.count), func.sum(CycleTimeDaily.total_seconds))
+            .where(CycleTimeDaily.scope_id == scope_id, CycleTimeDaily.day >= since, CycleTimeDaily.day <= until)
+            .group_by(CycleTimeDaily.bucket)
+        )
+        counts = [0] * (len(CYCLE_TIME_BUCKETS) + 1)
+        total_seconds = 0.0
+        for bucket, count, seconds in rows:
+            counts[bucket] += count
+            total_seconds += seconds
+
+        completed = sum(counts)
+        stats = CycleTimeStats(
+            since=since,
+            until=until,
+            completed=completed,
+            buckets=[
+                CycleTimeBucket(le_hours=bound, count=count)
+                for bound, count in zip((*CYCLE_TIME_BUCKETS, None), counts)
+            ],
+        )
+        if completed:
+            stats.mean_hours = round(total_seconds / completed / 3600, 2)
+            for pct in PERCENTILES:
+                setattr(stats, f"p{pct}_hours", _bucket_percentile(counts, pct))
+        return stats
+
+
+def _bucket_percentile(counts: List[int], pct: float) -> Optional[float]:
+    """``pct``-th percentile in hours, interpolated linearly within its bucket"""
+    target = sum(counts) * pct / 100
+    running = 0
+    for index, count in enumerate(counts):
+        if count and running + count >= target:
+            low = CYCLE_TIME_BUCKETS[index - 1] if index else 0
+            if index == len(CYCLE_TIME_BUCKETS):
+                # Unbounded bucket: all that can be said is "at least"
+                return float(low)
+            high = CYCLE_TIME_BUCKETS[index]
+            return round(low + (high - low) * (target - running) / count, 2)
+        running += count
+    return None
@@ -0,0 +1,175 @@
+"""Archive service - moves long-done tasks out of the hot ``tasks`` table
+
+Boards mostly accumulate "done" cards, which every board query and index
+on ``tasks`` then has to step over. Tasks that have sat in "done" (with no
+edits) for a while are moved to :class:`~app.models.task.ArchivedTask` in
+small batches, one short transaction each, with a pause in between so the
+archiver never holds locks or the SQLite write lock for long.
+
+Reads default to the hot set; ``include_archived`` listings and
+:meth:`ArchiveService.restore_task` reach the archive. An archived task
+leaves a tombstone for delta sync and a ``task.deleted`` event for open
+boards, and is no longer found by search. Archiving is not a status
+change, so the flow and cycle-time rollups are untouched.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.ranking import rank_after
+from app.core.response_cache import boards_key, invalidate_on_commit
+from app.db.changes import stamp_rows
+from app.db.flow import DONE
+from app.models.board import Board
+from app.models.change import Tombstone
+from app.models.task import ArchivedTask, Task
+from app.realtime.hub import TASK_CREATED, TASK_DELETED, board_hub, task_event
+from app.services.task_service import TaskService
+
+logger = logging.getLogger(__name__)
+
+# Every column of a task, copied verbatim between the two tables
+TASK_COLUMNS = list(Task.__table__.columns)
+
+
+@dataclass
+class ArchiveRun:
+    """Outcome of one pass over every board"""
+    archived: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+
+class ArchiveService:
+    """Service for archiving and restoring tasks"""
+
+    @staticmethod
+    async def archive_batch(
+        db: AsyncSession, board_id: uuid.UUID, project_id: uuid.UUID, cutoff: datetime, limit: int
+    ) -> int:
+        """Archive up to ``limit`` of a board's tasks done and untouched since before ``cutoff``
+
+        Reads the oldest candidates from the (board_id, status, updated_at)
+        index, copies them to ``archived_tasks``, tombstones and deletes
+        them, and commits. Rows locked by a concurrent archiver are
+        skipped. Returns the number of tasks archived.
+        """
+        rows = (
+            await db.execute(
+                select(*TASK_COLUMNS)
+                .where(Task.board_id == board_id, Task.status == DONE, Task.updated_at < cutoff)
+                .order_by(Task.updated_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        ).mappings().all()
+        if not rows:
+            await db.commit()
+            return 0
+
+        now = datetime.utcnow()
+        ids = [row["id"] for row in rows]
+        tombstones = [{"project_id": project_id, "entity": "task", "entity_id": task_id} for task_id in ids]
+        await stamp_rows(db, ((project_id, tombstone) for tombstone in tombstones))
+        await db.execute(insert(ArchivedTask), [{**row, "archived_at": now} for row in rows])
+        await db.execute(insert(Tombstone), tombstones)
+        await db.execute(delete(Task).where(Task.id.in_(ids)).execution_options(synchronize_session=False))
+        # Board lists carry task counts
+        invalidate_on_commit(db, [boards_key(project_id)])
+        await db.commit()
+        await board_hub.publish(board_id, [task_event(TASK_DELETED, {"id": task_id}) for task_id in ids])
+        return len(ids)
+
+    @staticmethod
+    async def archive_done_tasks(
+        db: AsyncSession,
+        older_than: timedelta,
+        *,
+        batch_size: int = 500,
+        pause: float = 0.0,
+    ) -> ArchiveRun:
+        """Archive every task done and untouched for longer than ``older_than``
+
+        Boards are worked through one at a time, ``batch_size`` tasks per
+        transaction, sleeping ``pause`` seconds between transactions.
+        """
+        started = time.perf_counter()
+        cutoff = datetime.utcnow() - older_than
+        boards = (await db.execute(select(Board.id, Board.project_id).order_by(Board.id))).all()
+        await db.commit()
+
+        run = ArchiveRun()
+        for board_id, project_id in boards:
+            while True:
+                archived = await ArchiveService.archive_batch(db, board_id, project_id, cutoff, batch_size)
+                if archived:
+                    run.archived += archived
+                    run.batches += 1
+                if archived < batch_size:
+                    break
+                await asyncio.sleep(pause)
+        run.seconds = time.perf_counter() - started
+        return run
+
+    @staticmethod
+    async def get_archived_task(db: AsyncSession, task_id: uuid.UUID) -> ArchivedTask | None:
+        """Get an archived task by ID"""
+        return await db.get(ArchivedTask, task_id)
+
+    @staticmethod
+    async def restore_task(db: AsyncSession, task_id: uuid.UUID) -> Task | None:
+        """Move an archived task back to the end of its column
+
+        Returns ``None`` if no such task is archived.
+        """
+        archived = await db.get(ArchivedTask, task_id)
+        if archived is None:
+            return None
+
+        values: Dict[str, Any] = {column.name: getattr(archived, column.name) for column in TASK_COLUMNS}
+        values["rank"] = rank_after(await TaskService.get_last_rank(db, archived.board_id, archived.status))
+        # Restoring counts as a change, so the archiver leaves the task alone for another period
+        values["updated_at"] = datetime.utcnow()
+        project_id = (
+            await db.execute(select(Board.project_id).where(Board.id == archived.board_id))
+        ).scalar_one()
+        await stamp_rows(db, [(project_id, values)])
+        await db.execute(insert(Task), [values])
+        await db.delete(archived)
+        invalidate_on_commit(db, [boards_key(project_id)])
+        await db.commit()
+
+        task = await db.get(Task, task_id)
+        await board_hub.publish(task.board_id, [task_event(TASK_CREATED, task)])
+        return task
+
+
+async def run_archiver(session_factory) -> None:
+    """Archive every ``settings.ARCHIVE_INTERVAL_SECONDS`` until cancelled
+
+    Started from the application lifespan when ``ARCHIVE_AFTER_DAYS`` is
+    set. Concurrent archivers in other workers skip each other's rows.
+    """
+    while True:
+        try:
+            async with session_factory() as db:
+                run = await ArchiveService.archive_done_tasks(
+                    db,
+                    timedelta(days=settings.ARCHIVE_AFTER_DAYS),
+                    batch_size=settings.ARCHIVE_BATCH_SIZE,
+                    pause=settings.ARCHIVE_BATCH_PAUSE_SECONDS,
+                )
+            if run.archived:
+                logger.info("Archived %d tasks in %d batches (%.1fs)", run.archived, run.batches, run.seconds)
+        except Exception:
+            logger.exception("Archiving failed")
+        await asyncio.sleep(settings.ARCHIVE_INTERVAL_SECONDS)
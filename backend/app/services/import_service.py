@@ -0,0 +1,363 @@
+"""Import service - loads tasks from a streamed CSV or NDJSON upload
+
+The upload is decoded as it arrives (gunzipped first if need be) and cut
+into batches of ``IMPORT_BATCH_ROWS`` rows. Each batch is validated
+against :class:`TaskCreate` in one call, its assignee emails are resolved
+to users with one query, and its valid rows are appended to the end of
+their columns through :func:`app.db.bulk.copy_rows` (``COPY`` on
+PostgreSQL, ``executemany`` elsewhere). A batch commits together with the
+import's progress row, so memory holds one batch at a time and a broken
+upload can simply be sent again: rows already read are skipped rather
+than imported twice.
+
+Rows use the export's columns (see :mod:`app.services.export_service`):
+``board`` by name, ``title``, ``description``, ``status``, ``priority``
+and ``assignee_email``. Anything else, such as ``id`` or ``rank``, is
+ignored; imported tasks get new ids. Rejected rows are reported by row
+number with the reason.
+"""
+
+import codecs
+import csv
+import time
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.ranking import rank_after
+from app.core.response_cache import boards_key, invalidate_on_commit
+from app.db.bulk import copy_rows
+from app.db.changes import reserve_change_seqs
+from app.db.flow import TODO, Transition, record_transitions
+from app.models.board import Board
+from app.models.task import Task
+from app.models.task_import import TaskImport
+from app.models.user import User
+from app.realtime.hub import board_hub, column_event
+from app.schemas.task import TaskCreate
+from app.services.task_service import TaskService
+
+# Rows validated, written and committed at a time
+IMPORT_BATCH_ROWS = 5000
+# Rejected rows kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ("ndjson", "csv")
+
+RUNNING = "running"
+COMPLETED = "completed"
+
+TASK_COLUMNS = (
+    "id", "board_id", "title", "description", "assignee", "priority", "status", "rank",
+    "created_at", "started_at", "updated_at", "change_seq",
+)
+
+# Left out when empty, so the TaskCreate defaults apply
+OPTIONAL_FIELDS = ("description", "status", "priority")
+
+_task_list = TypeAdapter(List[TaskCreate])
+
+# A row's fields, or why it couldn't be read
+Record = Union[Dict[str, Any], str]
+
+
+class InvalidUpload(ValueError):
+    """Raised when the upload can't be read at all: bad gzip or text encoding."""
+
+
+class ImportConflict(ValueError):
+    """Raised when an upload doesn't fit the import it names."""
+
+
+async def _lines(chunks: AsyncIterator[bytes], gzip: bool) -> AsyncIterator[List[str]]:
+    """The upload's complete lines, newline included, a chunk's worth at a time"""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzip else None
+    # utf-8-sig drops the byte order mark spreadsheets like to write
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    try:
+        async for chunk in chunks:
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk)
+            # Only "\n" ends a line; str.splitlines would also split on characters allowed inside a field
+            lines = (pending + decoder.decode(chunk)).split("\n")
+            pending = lines.pop()
+            if lines:
+                yield [line + "\n" for line in lines]
+        tail = decompressor.flush() if decompressor is not None else b""
+        pending += decoder.decode(tail, final=True)
+    except zlib.error as exc:
+        raise InvalidUpload(f"Upload is not valid gzip: {exc}") from exc
+    except UnicodeDecodeError as exc:
+        raise InvalidUpload(f"Upload is not valid UTF-8: {exc.reason}") from exc
+    if decompressor is not None and not decompressor.eof:
+        raise InvalidUpload("Upload is not valid gzip: the stream is truncated")
+    if pending:
+        yield [pending]
+
+
+class _NdjsonReader:
+    """Parses one JSON object per line; blank lines are skipped"""
+
+    def feed(self, lines: List[str]) -> List[Record]:
+        records: List[Record] = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                value = orjson.loads(line)
+            except orjson.JSONDecodeError as exc:
+                records.append(f"Invalid JSON: {exc}")
+                continue
+            records.append(value if isinstance(value, dict) else "Expected a JSON object")
+        return records
+
+
+class _CsvReader:
+    """Parses CSV with a header row, holding back the lines of a quoted field until it closes
+
+    With doubled quotes as the only escape, a row is complete when it has
+    seen an even number of quote characters.
+    """
+
+    def __init__(self) -> None:
+        self.header: Optional[List[str]] = None
+        self._partial: List[str] = []
+        self._quotes = 0
+
+    def feed(self, lines: List[str]) -> List[Record]:
+        records: List[Record] = []
+        for line in lines:
+            self._partial.append(line)
+            self._quotes += line.count('"')
+            if not self._quotes % 2:
+                self._parse(records)
+        return records
+
+    def finish(self) -> List[Record]:
+        """The last row, if the upload ended inside a quoted field"""
+        records: List[Record] = []
+        if self._partial:
+            self._parse(records)
+        return records
+
+    def _parse(self, records: List[Record]) -> None:
+        text = "".join(self._partial)
+        self._partial.clear()
+        self._quotes = 0
+        try:
+            row = next(csv.reader([text]), [])
+        except csv.Error as exc:
+            records.append(f"Invalid CSV: {exc}")
+            return
+        if not row:
+            return
+        if self.header is None:
+            self.header = [name.strip() for name in row]
+        elif len(row) != len(self.header):
+            records.append(f"Expected {len(self.header)} fields, got {len(row)}")
+        else:
+            records.append(dict(zip(self.header, row)))
+
+
+def _candidate(
+    fields: Dict[str, Any], boards: Dict[str, uuid.UUID], assignees: Dict[str, Optional[uuid.UUID]]
+) -> Union[Dict[str, Any], str]:
+    """TaskCreate input for a row, or why it can't be imported"""
+    board = fields.get("board")
+    if not isinstance(board, str) or not board:
+        return "board: Field required"
+    if board not in boards:
+        return f"board: No board named {board!r} in this project"
+    candidate: Dict[str, Any] = {"board_id": boards[board]}
+    if "title" in fields:
+        candidate["title"] = fields["title"]
+    email = fields.get("assignee_email")
+    if email:
+        if not isinstance(email, str) or assignees.get(email) is None:
+            return f"assignee_email: No user with email {email!r}"
+        candidate["assignee"] = assignees[email]
+    for name in OPTIONAL_FIELDS:
+        if fields.get(name) not in (None, ""):
+            candidate[name] = fields[name]
+    return candidate
+
+
+def _validate(candidates: List[Dict[str, Any]]) -> Tuple[List[Optional[TaskCreate]], Dict[int, str]]:
+    """Validate a batch in one call; returns the tasks (``None`` where invalid) and errors by position"""
+    try:
+        return _task_list.validate_python(candidates), {}
+    except ValidationError as exc:
+        messages: Dict[int, List[str]] = {}
+        for error in exc.errors():
+            index, *loc = error["loc"]
+            messages.setdefault(index, []).append(f"{'.'.join(str(part) for part in loc)}: {error['msg']}")
+    tasks = iter(_task_list.validate_python(
+        [candidate for index, candidate in enumerate(candidates) if index not in messages]
+    ))
+    return (
+        [None if index in messages else next(tasks) for index in range(len(candidates))],
+        {index: "; ".join(parts) for index, parts in messages.items()},
+    )
+
+
+class ImportService:
+    """Service for bulk task imports"""
+
+    @staticmethod
+    async def get_import(db: AsyncSession, import_id: uuid.UUID) -> TaskImport | None:
+        """Get an import's progress by ID"""
+        return await db.get(TaskImport, import_id)
+
+    @staticmethod
+    async def import_tasks(
+        db: AsyncSession,
+        project_id: uuid.UUID,
+        import_id: uuid.UUID,
+        fmt: str,
+        chunks: AsyncIterator[bytes],
+        *,
+        gzip: bool = False,
+        created_by: Optional[uuid.UUID] = None,
+        on_batch: Optional[Callable[[TaskImport], None]] = None,
+    ) -> TaskImport:
+        """Import the tasks uploaded in ``chunks`` into a project's boards, committing batch by batch
+
+        Starts import ``import_id``, or resumes it if it exists by skipping
+        the rows it has already read. ``on_batch`` is called with the
+        progress after every commit. Raises :class:`ImportConflict` if the
+        import belongs to another project or format, is already completed,
+        or another upload of it committed in the meantime, and
+        :class:`InvalidUpload` if the body can't be decoded; batches
+        committed before either stay imported.
+        """
+        task_import = await ImportService.get_import(db, import_id)
+        if task_import is None:
+            task_import = TaskImport(id=import_id, project_id=project_id, created_by=created_by, format=fmt)
+            db.add(task_import)
+            await db.commit()
+        elif task_import.project_id != project_id:
+            raise ImportConflict("Import belongs to another project")
+        elif task_import.format != fmt:
+            raise ImportConflict(f"Import was started as {task_import.format}")
+        elif task_import.status == COMPLETED:
+            raise ImportConflict("Import is already completed")
+
+        board_rows = await db.execute(
+            # The first board of a name wins
+            select(Board.name, Board.id).where(Board.project_id == project_id).order_by(Board.order.desc())
+        )
+        boards = dict(board_rows.all())
+        last_ranks = await TaskService.get_last_ranks(db, set(boards.values()))
+        # Emails seen so far; None for ones no user has
+        assignees: Dict[str, Optional[uuid.UUID]] = {}
+        checkpoint = time.perf_counter()
+
+        async def write(batch: List[Tuple[int, Record]], last_row: int, finished: bool) -> None:
+            nonlocal checkpoint
+            emails = {
+                fields.get("assignee_email") for _, fields in batch if isinstance(fields, dict)
+            }
+            emails = {email for email in emails if isinstance(email, str) and email and email not in assignees}
+            if emails:
+                assignees.update(dict.fromkeys(emails))
+                found = await db.execute(select(User.email, User.id).where(User.email.in_(emails)))
+                assignees.update(found.all())
+
+            errors: List[Dict[str, Any]] = []
+            rows: List[int] = []
+            candidates: List[Dict[str, Any]] = []
+            for row, record in batch:
+                candidate = _candidate(record, boards, assignees) if isinstance(record, dict) else record
+                if isinstance(candidate, str):
+                    errors.append({"row": row, "error": candidate})
+                else:
+                    rows.append(row)
+                    candidates.append(candidate)
+            tasks, invalid = _validate(candidates)
+            errors.extend({"row": rows[index], "error": message} for index, message in invalid.items())
+            errors.sort(key=lambda error: error["row"])
+
+            now = datetime.utcnow()
+            valid = [task for task in tasks if task is not None]
+            seq = await reserve_change_seqs(db, project_id, len(valid)) if valid else 0
+            values = []
+            transitions = []
+            columns = set()
+            for task in valid:
+                column = (task.board_id, task.status.value)
+                last_ranks[column] = rank_after(last_ranks.get(column))
+                task_id = uuid.uuid4()
+                values.append((
+                    task_id, task.board_id, task.title, task.description, task.assignee, task.priority.value,
+                    task.status.value, last_ranks[column], now, None if task.status == TODO else now, now, seq,
+                ))
+                transitions.append(Transition(
+                    task_id=task_id, to_project_id=project_id, to_board_id=task.board_id, to_status=column[1]
+                ))
+                columns.add(column)
+                seq += 1
+            if values:
+                await copy_rows(await db.connection(), Task.__table__, TASK_COLUMNS, values)
+                await db.run_sync(record_transitions, transitions, now)
+                # Board lists carry task counts
+                invalidate_on_commit(db, [boards_key(project_id)])
+
+            elapsed = time.perf_counter()
+            progress = {
+                "rows_read": last_row,
+                "rows_imported": task_import.rows_imported + len(valid),
+                "rows_failed": task_import.rows_failed + len(errors),
+                "errors": task_import.errors + errors[:max(MAX_REPORTED_ERRORS - len(task_import.errors), 0)],
+                "elapsed_seconds": task_import.elapsed_seconds + elapsed - checkpoint,
+                "updated_at": now,
+            }
+            if finished:
+                progress.update(status=COMPLETED, finished_at=now)
+            # Guarded by the rows read so far, so two uploads of one import can't both write a batch
+            result = await db.execute(
+                update(TaskImport)
+                .where(TaskImport.id == import_id, TaskImport.rows_read == task_import.rows_read)
+                .values(**progress)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                raise ImportConflict("Another upload of this import is in progress")
+            await db.commit()
+            await db.refresh(task_import)
+            checkpoint = elapsed
+            for board_id, status in columns:
+                # Clients reload the column rather than receive thousands of events
+                await board_hub.publish(board_id, [column_event(status)])
+            if on_batch is not None:
+                on_batch(task_import)
+
+        reader = _CsvReader() if fmt == "csv" else _NdjsonReader()
+        row = 0
+        batch: List[Tuple[int, Record]] = []
+        async for lines in _lines(chunks, gzip):
+            for record in reader.feed(lines):
+                row += 1
+                if row > task_import.rows_read:
+                    batch.append((row, record))
+            while len(batch) >= IMPORT_BATCH_ROWS:
+                full, batch = batch[:IMPORT_BATCH_ROWS], batch[IMPORT_BATCH_ROWS:]
+                await write(full, full[-1][0], finished=False)
+        if isinstance(reader, _CsvReader):
+            for record in reader.finish():
+                row += 1
+                if row > task_import.rows_read:
+                    batch.append((row, record))
+        if row < task_import.rows_read:
+            raise ImportConflict(
+                f"Upload has {row} rows but {task_import.rows_read} were already read; resume with the same file"
+            )
+        await write(batch, row, finished=True)
+        return task_import
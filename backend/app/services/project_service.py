@@ -0,0 +1,174 @@
+"""Project service - business logic for project operations"""
+
+import hashlib
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.core.responses import response_columns
+from app.models.board import Board
+from app.models.change import Tombstone
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.board import BoardResponse, BoardSummary
+from app.schemas.project import DeletedEntity, ProjectChanges, ProjectResponse
+from app.schemas.task import TaskResponse
+from app.services.task_service import TASK_RESPONSE_COLUMNS
+
+PROJECT_RESPONSE_COLUMNS = response_columns(Project, ProjectResponse)
+BOARD_RESPONSE_COLUMNS = response_columns(Board, BoardResponse)
+
+
+class ProjectService:
+    """Service for project operations"""
+
+    @staticmethod
+    async def get_project(db: AsyncSession, project_id: uuid.UUID) -> Project | None:
+        """Get project by ID"""
+        return await db.get(Project, project_id)
+
+    @staticmethod
+    async def list_boards(db: AsyncSession, project_id: uuid.UUID) -> Optional[List[BoardSummary]]:
+        """List a project's boards in board order with their task counts
+
+        Returns ``None`` if the project doesn't exist.
+        """
+        if await db.get(Project, project_id) is None:
+            return None
+        rows = await db.execute(
+            select(Board, func.count(Task.id))
+            .outerjoin(Task, Task.board_id == Board.id)
+            .where(Board.project_id == project_id)
+            .group_by(Board.id)
+            .order_by(Board.order, Board.created_at)
+        )
+        return [
+            BoardSummary(**BoardResponse.model_validate(board).model_dump(), task_count=task_count)
+            for board, task_count in rows
+        ]
+
+    @staticmethod
+    async def get_snapshot_etag(db: AsyncSession, project_id: uuid.UUID) -> Optional[str]:
+        """Compute the snapshot's ETag with a single aggregate query
+
+        The tag covers the project row plus the row count and latest
+        ``updated_at`` of its boards and tasks, so any insert, update or
+        delete changes it. Returns ``None`` if the project doesn't exist.
+        """
+        board_ids = select(Board.id).where(Board.project_id == project_id)
+        boards = Board.project_id == project_id
+        tasks = Task.board_id.in_(board_ids)
+        query = select(
+            Project.updated_at,
+            select(func.count(Board.id)).where(boards).scalar_subquery(),
+            select(func.max(Board.updated_at)).where(boards).scalar_subquery(),
+            select(func.count(Task.id)).where(tasks).scalar_subquery(),
+            select(func.max(Task.updated_at)).where(tasks).scalar_subquery(),
+        ).where(Project.id == project_id)
+
+        row = (await db.execute(query)).first()
+        if row is None:
+            return None
+
+        fingerprint = "|".join([str(project_id), *(str(value) for value in row)])
+        return '"' + hashlib.sha1(fingerprint.encode()).hexdigest() + '"'
+
+    @staticmethod
+    async def get_snapshot(db: AsyncSession, project_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+        """Load a project with its boards and tasks in three queries
+
+        Returns plain dicts shaped like :class:`~app.schemas.project.ProjectSnapshot`,
+        read as rows without building ORM objects, ready for orjson.
+        """
+        project = (
+            await db.execute(select(*PROJECT_RESPONSE_COLUMNS).where(Project.id == project_id))
+        ).first()
+        if project is None:
+            return None
+
+        boards = (
+            await db.execute(
+                select(*BOARD_RESPONSE_COLUMNS)
+                .where(Board.project_id == project_id)
+                .order_by(Board.order, Board.created_at)
+            )
+        ).all()
+
+        tasks = (
+            await db.execute(
+                select(*TASK_RESPONSE_COLUMNS)
+                .join(Board, Task.board_id == Board.id)
+                .where(Board.project_id == project_id)
+                .order_by(Task.board_id, Task.status, Task.rank, Task.created_at)
+            )
+        ).all()
+
+        tasks_by_board = defaultdict(list)
+        for task in tasks:
+            tasks_by_board[task.board_id].append(task._asdict())
+
+        return {
+            **project._asdict(),
+            "boards": [
+                {**board._asdict(), "tasks": tasks_by_board.get(board.id, [])}
+                for board in boards
+            ],
+        }
+
+    @staticmethod
+    async def get_changes(
+        db: AsyncSession, project_id: uuid.UUID, cursor: Optional[str] = None, limit: int = 500
+    ) -> Optional[ProjectChanges]:
+        """Rows changed and deleted after ``cursor``, in change-sequence order
+
+        Boards, tasks and tombstones are each read from their
+        ``change_seq`` index with a ``LIMIT``, so a client that is a few
+        changes behind reads a few rows. Without a cursor everything is
+        returned, ``limit`` rows at a time. Returns ``None`` if the project
+        doesn't exist.
+        """
+        since = 0
+        if cursor is not None:
+            (value,) = decode_cursor(cursor, 1)
+            try:
+                since = int(value)
+            except ValueError as exc:
+                raise InvalidCursor("Malformed cursor") from exc
+
+        project = await db.get(Project, project_id)
+        if project is None:
+            return None
+
+        board_ids = select(Board.id).where(Board.project_id == project_id)
+        queries = [
+            select(Board).where(Board.project_id == project_id, Board.change_seq > since)
+            .order_by(Board.change_seq).limit(limit + 1),
+            select(Task).where(Task.board_id.in_(board_ids), Task.change_seq > since)
+            .order_by(Task.change_seq).limit(limit + 1),
+            select(Tombstone).where(Tombstone.project_id == project_id, Tombstone.change_seq > since)
+            .order_by(Tombstone.change_seq).limit(limit + 1),
+        ]
+        changed = [project] if project.change_seq > since else []
+        for query in queries:
+            changed.extend((await db.execute(query)).scalars())
+        changed.sort(key=lambda row: row.change_seq)
+
+        has_more = len(changed) > limit
+        changed = changed[:limit]
+        changes = ProjectChanges(
+            next_cursor=encode_cursor(changed[-1].change_seq if changed else since),
+            has_more=has_more,
+        )
+        for row in changed:
+            if isinstance(row, Project):
+                changes.project = ProjectResponse.model_validate(row)
+            elif isinstance(row, Board):
+                changes.boards.append(BoardResponse.model_validate(row))
+            elif isinstance(row, Task):
+                changes.tasks.append(TaskResponse.model_validate(row))
+            else:
+                changes.deleted.append(DeletedEntity(entity=row.entity, id=row.entity_id))
+        return changes
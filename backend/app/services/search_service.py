@@ -0,0 +1,94 @@
+"""Search service - ranked full-text search over tasks"""
+
+import re
+import uuid
+from typing import List, Optional, Tuple
+
+from sqlalchemy import column, func, literal_column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.db.search import SEARCH_CONFIG
+from app.models.board import Board
+from app.models.task import Task
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+_tasks_fts = table("tasks_fts", column("rowid"))
+_tasks_fts_keys = table("tasks_fts_keys", column("id"), column("task_id"))
+
+
+def search_terms(query: str) -> List[str]:
+    """Split user input into plain search terms, dropping any operators"""
+    return _TERM.findall(query.lower())
+
+
+class SearchService:
+    """Service for task search"""
+
+    @staticmethod
+    async def search_project_tasks(
+        db: AsyncSession,
+        project_id: uuid.UUID,
+        query: str,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> Tuple[List[Task], Optional[str]]:
+        """Find a project's tasks matching every term of ``query``, best first
+
+        The last term matches as a prefix so results update while the user
+        types. Uses the tsvector GIN index on PostgreSQL and the FTS5 table
+        on SQLite. Returns the tasks and the cursor for the next page.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return [], None
+
+        offset = 0
+        if cursor is not None:
+            (raw_offset,) = decode_cursor(cursor, 1)
+            if not raw_offset.isdigit():
+                raise InvalidCursor("Malformed cursor")
+            offset = int(raw_offset)
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = SearchService._postgres_query(terms)
+        elif dialect == "sqlite":
+            statement = SearchService._sqlite_query(terms)
+        else:
+            raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+        board_ids = select(Board.id).where(Board.project_id == project_id)
+        statement = statement.where(Task.board_id.in_(board_ids)).offset(offset).limit(limit + 1)
+        tasks = list((await db.execute(statement)).scalars())
+
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(offset + limit)
+        return tasks, next_cursor
+
+    @staticmethod
+    def _postgres_query(terms: List[str]):
+        tsquery = " & ".join(terms[:-1] + [terms[-1] + ":*"])
+        query = func.to_tsquery(SEARCH_CONFIG, tsquery)
+        vector = literal_column("tasks.search_vector")
+        return (
+            select(Task)
+            .where(vector.op("@@")(query))
+            .order_by(func.ts_rank_cd(vector, query).desc(), Task.id)
+        )
+
+    @staticmethod
+    def _sqlite_query(terms: List[str]):
+        match = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+        fts = literal_column("tasks_fts")
+        return (
+            select(Task)
+            .join(_tasks_fts_keys, _tasks_fts_keys.c.task_id == Task.id)
+            .join(_tasks_fts, _tasks_fts.c.rowid == _tasks_fts_keys.c.id)
+            .where(fts.op("MATCH")(match))
+            # Weight title hits above description hits, like the tsvector weights
+            .order_by(func.bm25(fts, 10.0, 1.0), Task.id)
+        )
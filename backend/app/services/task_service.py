@@ -0,0 +1,512 @@
+"""Task service - business logic for task operations"""
+
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from enum import Enum
+from typing import Annotated, Any, Dict, List, Optional, Set, Tuple
+
+from pydantic import Field, TypeAdapter, ValidationError
+from sqlalchemy import DateTime, Row, cast, delete, func, insert, null, select, tuple_, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.core.ranking import rank_after, rank_between, spaced_ranks
+from app.core.responses import response_columns
+from app.core.response_cache import boards_key, invalidate_on_commit
+from app.db.changes import stamp_rows
+from app.db.flow import TODO, Transition, is_completion, record_transitions
+from app.models.board import Board
+from app.models.change import Tombstone
+from app.models.task import ArchivedTask, Task
+from app.realtime.hub import (
+    TASK_CREATED,
+    TASK_DELETED,
+    TASK_MOVED,
+    TASK_UPDATED,
+    board_hub,
+    column_event,
+    task_event,
+)
+from app.schemas.task import (
+    TaskBatchResult,
+    TaskCreate,
+    TaskCreateOperation,
+    TaskDeleteOperation,
+    TaskMove,
+    TaskMoveOperation,
+    TaskOperation,
+    TaskResponse,
+    TaskUpdate,
+    TaskUpdateOperation,
+)
+
+_operation_adapter = TypeAdapter(Annotated[TaskOperation, Field(discriminator="op")])
+
+# Rows per statement when respacing a column
+REBALANCE_CHUNK_SIZE = 500
+
+# Columns read for list responses, in TaskResponse field order
+TASK_RESPONSE_COLUMNS = response_columns(Task, TaskResponse)
+
+
+class InvalidMove(ValueError):
+    """Raised when a move names neighbours that can't bracket the task."""
+
+
+def _column_values(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Unwrap enum members so values bind as plain column values"""
+    return {key: value.value if isinstance(value, Enum) else value for key, value in data.items()}
+
+
+def _validation_message(exc: ValidationError) -> str:
+    """Condense a pydantic error into one line"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'operation'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def _task_tombstone(project_id: uuid.UUID, task_id: uuid.UUID) -> Dict[str, Any]:
+    """Tombstone row for a task that left ``project_id``"""
+    return {"project_id": project_id, "entity": "task", "entity_id": task_id}
+
+
+class TaskService:
+    """Service for task operations"""
+
+    @staticmethod
+    async def create_task(db: AsyncSession, task: TaskCreate) -> Task:
+        """Create a new task at the end of its column"""
+        values = _column_values(task.model_dump())
+        last = await TaskService.get_last_rank(db, values["board_id"], values["status"])
+        db_task = Task(**values, rank=rank_after(last))
+        db.add(db_task)
+        await db.commit()
+        await db.refresh(db_task)
+        await board_hub.publish(db_task.board_id, [task_event(TASK_CREATED, db_task)])
+        return db_task
+
+    @staticmethod
+    async def get_task(db: AsyncSession, task_id: uuid.UUID) -> Task | None:
+        """Get task by ID"""
+        return await db.get(Task, task_id)
+
+    @staticmethod
+    async def update_task(db: AsyncSession, task_id: uuid.UUID, task_update: TaskUpdate) -> Task | None:
+        """Update task fields"""
+        db_task = await TaskService.get_task(db, task_id)
+        if not db_task:
+            return None
+
+        values = _column_values(task_update.model_dump(exclude_unset=True))
+        if values.get("status", db_task.status) != db_task.status:
+            # A new status is a new column: go to its end rather than keep a rank that may be taken there
+            values["rank"] = rank_after(await TaskService.get_last_rank(db, db_task.board_id, values["status"]))
+        for key, value in values.items():
+            setattr(db_task, key, value)
+
+        await db.commit()
+        await db.refresh(db_task)
+        await board_hub.publish(db_task.board_id, [task_event(TASK_UPDATED, db_task)])
+        return db_task
+
+    @staticmethod
+    async def delete_task(db: AsyncSession, task_id: uuid.UUID) -> bool:
+        """Delete task"""
+        db_task = await TaskService.get_task(db, task_id)
+        if not db_task:
+            return False
+
+        board_id = db_task.board_id
+        await db.delete(db_task)
+        await db.commit()
+        await board_hub.publish(board_id, [task_event(TASK_DELETED, {"id": task_id})])
+        return True
+
+    @staticmethod
+    async def apply_batch(db: AsyncSession, operations: List[Dict[str, Any]]) -> List[TaskBatchResult]:
+        """Validate and apply a batch of task operations in one transaction
+
+        Referenced tasks and boards are checked with one query each, and the
+        tails of the columns being appended to are read with one more; then
+        the valid operations are applied set-wise: one multi-row INSERT for
+        creates, one executemany UPDATE per distinct set of changed fields
+        and one DELETE. Updates and moves of a task are folded into a single
+        row in the order given, and once a task is deleted later operations
+        on it fail. Created and moved tasks, and updated ones whose status
+        changes, are appended to their target column in operation order.
+        Status transitions are recorded with
+        :func:`app.db.flow.record_transitions`. Invalid operations are
+        reported in their result and skipped.
+        """
+        results: List[Optional[TaskBatchResult]] = [None] * len(operations)
+        valid: List[Tuple[int, TaskOperation]] = []
+        for index, raw in enumerate(operations):
+            try:
+                valid.append((index, _operation_adapter.validate_python(raw)))
+            except ValidationError as exc:
+                results[index] = TaskBatchResult(
+                    index=index, op=raw.get("op") if isinstance(raw, dict) else None,
+                    ok=False, error=_validation_message(exc),
+                )
+
+        task_ids = {op.id for _, op in valid if not isinstance(op, TaskCreateOperation)}
+        board_ids = {op.task.board_id for _, op in valid if isinstance(op, TaskCreateOperation)}
+        board_ids |= {op.board_id for _, op in valid if isinstance(op, TaskMoveOperation) and op.board_id}
+        existing_tasks = {}
+        # When each existing task started (or was created), for cycle times
+        started: Dict[uuid.UUID, Tuple[Optional[datetime], Optional[datetime]]] = {}
+        board_projects: Dict[uuid.UUID, uuid.UUID] = {}
+        if task_ids:
+            rows = await db.execute(
+                select(Task.id, Task.board_id, Task.status, Task.started_at, Task.created_at, Board.project_id)
+                .join(Board, Task.board_id == Board.id)
+                .where(Task.id.in_(task_ids))
+            )
+            for row in rows:
+                existing_tasks[row.id] = (row.board_id, row.status)
+                started[row.id] = (row.started_at, row.created_at)
+                board_projects[row.board_id] = row.project_id
+        existing_boards = set()
+        if board_ids:
+            rows = await db.execute(select(Board.id, Board.project_id).where(Board.id.in_(board_ids)))
+            for row in rows:
+                existing_boards.add(row.id)
+                board_projects[row.id] = row.project_id
+
+        # Tails of every column a create or move may append to, in one query
+        target_boards = {op.task.board_id for _, op in valid if isinstance(op, TaskCreateOperation)}
+        target_boards |= {
+            op.board_id or existing_tasks[op.id][0]
+            for _, op in valid if isinstance(op, TaskMoveOperation) and op.id in existing_tasks
+        }
+        target_boards |= {
+            existing_tasks[op.id][0]
+            for _, op in valid
+            if isinstance(op, TaskUpdateOperation) and op.id in existing_tasks and op.changes.status is not None
+        }
+        target_boards &= existing_boards | {board_id for board_id, _ in existing_tasks.values()}
+        last_ranks = await TaskService.get_last_ranks(db, target_boards)
+
+        def append_rank(board_id: uuid.UUID, status: str) -> str:
+            column = (board_id, status)
+            last_ranks[column] = rank_after(last_ranks.get(column))
+            return last_ranks[column]
+
+        now = datetime.utcnow()
+
+        def transition(task_id: uuid.UUID, row: Dict[str, Any], board_id: uuid.UUID, status: str) -> None:
+            """Record a task entering ``board_id``/``status`` and fill the row's ``started_at``"""
+            current_board, current_status = existing_tasks.get(task_id, (None, None))
+            started_at, created_at = started.get(task_id, (None, None))
+            entry = Transition(
+                task_id=task_id,
+                from_project_id=board_projects.get(current_board),
+                from_board_id=current_board,
+                from_status=current_status,
+                to_project_id=board_projects[board_id],
+                to_board_id=board_id,
+                to_status=status,
+            )
+            if is_completion(current_status, status):
+                entry.cycle_seconds = (now - (started_at or created_at or now)).total_seconds()
+            transitions.append(entry)
+            row["started_at"] = started_at or (now if status != TODO else None)
+            if task_id in existing_tasks:
+                # Later operations on the same task start from here
+                existing_tasks[task_id] = (board_id, status)
+                started[task_id] = (row["started_at"], created_at)
+
+        creates: List[Dict[str, Any]] = []
+        # One row of changes per existing task, built up in operation order
+        pending: Dict[uuid.UUID, Dict[str, Any]] = {}
+        deletes: List[uuid.UUID] = []
+        tombstones: List[Dict[str, Any]] = []
+        transitions: List[Transition] = []
+        # Rows to stamp with their project's change sequence
+        stamped: List[Tuple[uuid.UUID, Dict[str, Any]]] = []
+        events: Dict[uuid.UUID, List[dict]] = defaultdict(list)
+        for index, op in valid:
+            error = None
+            if isinstance(op, TaskCreateOperation):
+                if op.task.board_id not in existing_boards:
+                    error = "Board not found"
+                else:
+                    row = {"id": uuid.uuid4(), **_column_values(op.task.model_dump())}
+                    row["rank"] = append_rank(row["board_id"], row["status"])
+                    transition(row["id"], row, row["board_id"], row["status"])
+                    creates.append(row)
+                    stamped.append((board_projects[row["board_id"]], row))
+                    events[row["board_id"]].append(task_event(TASK_CREATED, row))
+                    results[index] = TaskBatchResult(index=index, op=op.op, id=row["id"], ok=True)
+                    continue
+            elif op.id not in existing_tasks:
+                error = "Task not found"
+            elif isinstance(op, TaskMoveOperation) and op.board_id and op.board_id not in existing_boards:
+                error = "Board not found"
+            elif isinstance(op, TaskUpdateOperation):
+                values = _column_values(op.changes.model_dump(exclude_unset=True))
+                if values:
+                    current_board, current_status = existing_tasks[op.id]
+                    row = pending.setdefault(op.id, {"id": op.id})
+                    row.update(values)
+                    if values.get("status", current_status) != current_status:
+                        row["rank"] = append_rank(current_board, values["status"])
+                        transition(op.id, row, current_board, values["status"])
+                    events[current_board].append(task_event(TASK_UPDATED, row))
+            elif isinstance(op, TaskMoveOperation):
+                current_board, current_status = existing_tasks[op.id]
+                board_id = op.board_id or current_board
+                status = op.status.value if op.status else current_status
+                if (board_id, status) != (current_board, current_status):
+                    row = pending.setdefault(op.id, {"id": op.id})
+                    row.update(board_id=board_id, status=status, rank=append_rank(board_id, status))
+                    transition(op.id, row, board_id, status)
+                    if board_projects[board_id] != board_projects[current_board]:
+                        # The old project's feed needs to drop the task
+                        tombstones.append(_task_tombstone(board_projects[current_board], op.id))
+                        stamped.append((board_projects[current_board], tombstones[-1]))
+                    for board in {current_board, board_id}:
+                        events[board].append(task_event(TASK_MOVED, row))
+            elif isinstance(op, TaskDeleteOperation):
+                current_board, current_status = existing_tasks.pop(op.id)
+                pending.pop(op.id, None)
+                deletes.append(op.id)
+                transitions.append(Transition(
+                    task_id=op.id,
+                    from_project_id=board_projects[current_board],
+                    from_board_id=current_board,
+                    from_status=current_status,
+                ))
+                tombstones.append(_task_tombstone(board_projects[current_board], op.id))
+                stamped.append((board_projects[current_board], tombstones[-1]))
+                events[current_board].append(task_event(TASK_DELETED, {"id": op.id}))
+
+            results[index] = TaskBatchResult(
+                index=index, op=op.op, id=getattr(op, "id", None), ok=error is None, error=error
+            )
+
+        # Changed tasks are stamped in the project they end up in
+        stamped.extend((board_projects[existing_tasks[task_id][0]], row) for task_id, row in pending.items())
+        await stamp_rows(db, stamped)
+        # Board lists carry task counts; the flush hook can't see Core statements
+        counted = {board_projects[row["board_id"]] for row in creates}
+        counted |= {board_projects[row["board_id"]] for row in pending.values() if "board_id" in row}
+        counted |= {tombstone["project_id"] for tombstone in tombstones}
+        invalidate_on_commit(db, (boards_key(project_id) for project_id in counted))
+        if creates:
+            await db.execute(insert(Task), creates)
+        if pending:
+            await db.execute(update(Task), [{**row, "updated_at": now} for row in pending.values()])
+        if deletes:
+            await db.execute(
+                delete(Task).where(Task.id.in_(deletes)).execution_options(synchronize_session=False)
+            )
+        if tombstones:
+            await db.execute(insert(Tombstone), tombstones)
+        await db.run_sync(record_transitions, transitions, now)
+        await db.commit()
+        for board_id, board_events in events.items():
+            await board_hub.publish(board_id, board_events)
+        return results
+
+    @staticmethod
+    async def get_last_rank(db: AsyncSession, board_id: uuid.UUID, status: str) -> Optional[str]:
+        """Highest rank in a column, read from the (board_id, status, rank) index"""
+        query = select(func.max(Task.rank)).where(Task.board_id == board_id, Task.status == status)
+        return (await db.execute(query)).scalar()
+
+    @staticmethod
+    async def get_last_ranks(
+        db: AsyncSession, board_ids: Set[uuid.UUID]
+    ) -> Dict[Tuple[uuid.UUID, str], Optional[str]]:
+        """Highest rank of every column on ``board_ids``, keyed by ``(board_id, status)``"""
+        if not board_ids:
+            return {}
+        query = (
+            select(Task.board_id, Task.status, func.max(Task.rank))
+            .where(Task.board_id.in_(board_ids))
+            .group_by(Task.board_id, Task.status)
+        )
+        return {(board_id, status): rank for board_id, status, rank in await db.execute(query)}
+
+    @staticmethod
+    async def move_task(db: AsyncSession, task_id: uuid.UUID, move: TaskMove) -> Task | None:
+        """Place a task between two neighbours, writing only the task's row
+
+        Raises :class:`InvalidMove` if a neighbour is missing, sits in a
+        different column or the two are out of order. Check the returned
+        task with :func:`app.core.ranking.needs_rebalance` to find columns
+        whose ranks have grown long.
+        """
+        db_task = await TaskService.get_task(db, task_id)
+        if not db_task:
+            return None
+
+        board_id = move.board_id or db_task.board_id
+        status = move.status.value if move.status else db_task.status
+        neighbour_ids = [i for i in (move.after_id, move.before_id) if i is not None]
+        if task_id in neighbour_ids:
+            raise InvalidMove("A task can't be placed next to itself")
+
+        if not neighbour_ids:
+            if (board_id, status) != (db_task.board_id, db_task.status):
+                rank = rank_after(await TaskService.get_last_rank(db, board_id, status))
+            else:
+                rank = db_task.rank
+        else:
+            neighbours = await TaskService._get_neighbour_ranks(db, neighbour_ids, board_id, status)
+            if any(rank is None for rank in neighbours.values()):
+                await TaskService.rebalance_column(db, board_id, status)
+                neighbours = await TaskService._get_neighbour_ranks(db, neighbour_ids, board_id, status)
+            after_rank, before_rank = neighbours.get(move.after_id), neighbours.get(move.before_id)
+            # With one neighbour given, the task lands between it and the card next to it
+            if move.before_id is None:
+                before_rank = await TaskService._get_adjacent_rank(db, board_id, status, task_id, above=after_rank)
+            elif move.after_id is None:
+                after_rank = await TaskService._get_adjacent_rank(db, board_id, status, task_id, below=before_rank)
+            try:
+                rank = rank_between(after_rank, before_rank)
+            except ValueError as exc:
+                raise InvalidMove("after_id must sort before before_id") from exc
+
+        previous_board_id = db_task.board_id
+        db_task.board_id = board_id
+        db_task.status = status
+        db_task.rank = rank
+        await db.commit()
+        await db.refresh(db_task)
+        event = task_event(TASK_MOVED, db_task)
+        for board in {previous_board_id, board_id}:
+            await board_hub.publish(board, [event])
+        return db_task
+
+    @staticmethod
+    async def _get_neighbour_ranks(
+        db: AsyncSession, neighbour_ids: List[uuid.UUID], board_id: uuid.UUID, status: str
+    ) -> Dict[uuid.UUID, Optional[str]]:
+        rows = (
+            await db.execute(
+                select(Task.id, Task.board_id, Task.status, Task.rank).where(Task.id.in_(neighbour_ids))
+            )
+        ).all()
+        if len(rows) != len(neighbour_ids):
+            raise InvalidMove("Neighbouring task not found")
+        if any((row.board_id, row.status) != (board_id, status) for row in rows):
+            raise InvalidMove("Neighbouring tasks must be in the target column")
+        return {row.id: row.rank for row in rows}
+
+    @staticmethod
+    async def _get_adjacent_rank(
+        db: AsyncSession,
+        board_id: uuid.UUID,
+        status: str,
+        task_id: uuid.UUID,
+        above: Optional[str] = None,
+        below: Optional[str] = None,
+    ) -> Optional[str]:
+        """Nearest rank above ``above`` or below ``below`` in a column, ignoring ``task_id``"""
+        query = select(func.min(Task.rank) if below is None else func.max(Task.rank)).where(
+            Task.board_id == board_id,
+            Task.status == status,
+            Task.id != task_id,
+            Task.rank > above if below is None else Task.rank < below,
+        )
+        return (await db.execute(query)).scalar()
+
+    @staticmethod
+    async def rebalance_column(db: AsyncSession, board_id: uuid.UUID, status: str) -> int:
+        """Respace the ranks of one column evenly, keeping its order
+
+        Tasks without a rank are placed last, oldest first. Returns the
+        number of tasks re-ranked.
+        """
+        ids = (
+            await db.execute(
+                select(Task.id)
+                .where(Task.board_id == board_id, Task.status == status)
+                .order_by(Task.rank.is_(None), Task.rank, Task.created_at, Task.id)
+            )
+        ).scalars().all()
+
+        rows = [{"id": task_id, "rank": rank} for task_id, rank in zip(ids, spaced_ranks(len(ids)))]
+        if rows:
+            project_id = (await db.execute(select(Board.project_id).where(Board.id == board_id))).scalar_one()
+            await stamp_rows(db, ((project_id, row) for row in rows))
+        now = datetime.utcnow()
+        for start in range(0, len(rows), REBALANCE_CHUNK_SIZE):
+            chunk = rows[start:start + REBALANCE_CHUNK_SIZE]
+            await db.execute(update(Task), [{**row, "updated_at": now} for row in chunk])
+        await db.commit()
+        if ids:
+            await board_hub.publish(board_id, [column_event(status)])
+        return len(ids)
+
+    @staticmethod
+    async def list_project_tasks(
+        db: AsyncSession,
+        project_id: uuid.UUID,
+        *,
+        board_id: Optional[uuid.UUID] = None,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        assignee: Optional[uuid.UUID] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        include_archived: bool = False,
+    ) -> Tuple[List[Row], Optional[str]]:
+        """List a project's tasks, most recently updated first
+
+        Uses keyset pagination on ``(updated_at, id)``: each page seeks
+        straight past the previous page's last row, so deep pages cost the
+        same as the first. Returns plain rows of
+        :data:`TASK_RESPONSE_COLUMNS` (no ORM objects are built) and the
+        cursor for the next page (``None`` on the last page).
+
+        With ``include_archived`` archived tasks are merged in and every
+        row gains an ``archived_at`` column (``None`` for live tasks).
+        """
+        after = None
+        if cursor is not None:
+            updated_at, task_id = decode_cursor(cursor, 2)
+            try:
+                after = (datetime.fromisoformat(updated_at), uuid.UUID(task_id))
+            except ValueError as exc:
+                raise InvalidCursor("Malformed cursor") from exc
+
+        def page_query(model, *extra):
+            query = select(*response_columns(model, TaskResponse), *extra)
+            if board_id is not None:
+                query = query.join(Board, model.board_id == Board.id).where(
+                    Board.project_id == project_id, model.board_id == board_id
+                )
+            else:
+                board_ids = select(Board.id).where(Board.project_id == project_id)
+                query = query.where(model.board_id.in_(board_ids))
+
+            if status is not None:
+                query = query.where(model.status == status)
+            if priority is not None:
+                query = query.where(model.priority == priority)
+            if assignee is not None:
+                query = query.where(model.assignee == assignee)
+            if after is not None:
+                query = query.where(tuple_(model.updated_at, model.id) < after)
+            return query
+
+        if include_archived:
+            merged = union_all(
+                page_query(Task, cast(null(), DateTime).label("archived_at")),
+                page_query(ArchivedTask, ArchivedTask.archived_at),
+            ).subquery()
+            query = select(merged).order_by(merged.c.updated_at.desc(), merged.c.id.desc())
+        else:
+            query = page_query(Task).order_by(Task.updated_at.desc(), Task.id.desc())
+        tasks = list((await db.execute(query.limit(limit + 1))).all())
+
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            last = tasks[-1]
+            next_cursor = encode_cursor(last.updated_at, last.id)
+        return tasks, next_cursor
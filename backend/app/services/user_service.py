@@ -1,57 +1,71 @@
 """User service - business logic for user operations"""
 
-from sqlalchemy.orm import Session
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import (
+    get_password_hash_async,
+    verify_and_update_password_async,
+)
 
 
 class UserService:
     """Service for user operations"""
     
     @staticmethod
-    def create_user(db: Session, user: UserCreate) -> User:
+    async def create_user(db: AsyncSession, user: UserCreate) -> User:
         """Create a new user"""
         db_user = User(
             email=user.email,
-            username=user.username,
-            full_name=user.full_name,
-            hashed_password=get_password_hash(user.password)
+            name=user.name,
+            hashed_password=await get_password_hash_async(user.password)
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         return db_user
     
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> User | None:
+    async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
         """Get user by email"""
-        return db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
     
     @staticmethod
-    def get_user_by_username(db: Session, username: str) -> User | None:
-        """Get user by username"""
-        return db.query(User).filter(User.username == username).first()
+    async def get_user_by_username(db: AsyncSession, username: str) -> User | None:
+        """Get user by username (users sign in with their email address)"""
+        return await UserService.get_user_by_email(db, username)
     
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> User | None:
+    async def get_user_by_id(db: AsyncSession, user_id: uuid.UUID) -> User | None:
         """Get user by ID"""
-        return db.query(User).filter(User.id == user_id).first()
+        return await db.get(User, user_id)
     
     @staticmethod
-    def authenticate_user(db: Session, username: str, password: str) -> User | None:
-        """Authenticate user by username and password"""
-        user = UserService.get_user_by_username(db, username)
+    async def authenticate_user(db: AsyncSession, username: str, password: str) -> User | None:
+        """Authenticate user by username and password
+
+        Hashes made with outdated cost parameters are transparently
+        replaced on a successful login.
+        """
+        user = await UserService.get_user_by_username(db, username)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash is not None:
+            user.hashed_password = new_hash
+            await db.commit()
         return user
     
     @staticmethod
-    def update_user(db: Session, user_id: int, user_update: UserUpdate) -> User | None:
+    async def update_user(db: AsyncSession, user_id: uuid.UUID, user_update: UserUpdate) -> User | None:
         """Update user information"""
-        db_user = UserService.get_user_by_id(db, user_id)
+        db_user = await UserService.get_user_by_id(db, user_id)
         if not db_user:
             return None
         
@@ -59,22 +73,22 @@ class UserService:
         
         # Hash password if provided
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
         
         for key, value in update_data.items():
             setattr(db_user, key, value)
         
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         return db_user
     
     @staticmethod
-    def delete_user(db: Session, user_id: int) -> bool:
+    async def delete_user(db: AsyncSession, user_id: uuid.UUID) -> bool:
         """Delete user"""
-        db_user = UserService.get_user_by_id(db, user_id)
+        db_user = await UserService.get_user_by_id(db, user_id)
         if not db_user:
             return False
         
-        db.delete(db_user)
-        db.commit()
+        await db.delete(db_user)
+        await db.commit()
         return True
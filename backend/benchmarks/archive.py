@@ -0,0 +1,134 @@
+"""Table and index sizes and board query latency before and after archiving.
+
+Runs against a database filled by :mod:`benchmarks.seed` (most of whose
+tasks are done, with update times over the past year). Times the board
+reads of the largest project, archives tasks done for more than
+``--after-days`` with :meth:`ArchiveService.archive_done_tasks`, then
+measures again. ``--vacuum`` compacts the tables in between so the freed
+pages show up in the sizes (``VACUUM`` on SQLite, ``VACUUM FULL`` on
+PostgreSQL, which rewrites the indexes too).
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.seed --reset --tasks 200000
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.archive --after-days 30 --vacuum
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import timedelta
+
+from sqlalchemy import func, select, text
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.board import Board
+from app.models.task import Task
+from app.services.archive_service import ArchiveService
+from app.services.project_service import ProjectService
+from app.services.task_service import TaskService
+
+TABLES = ("tasks", "archived_tasks")
+
+
+async def sizes():
+    """``{table: (table bytes, index bytes)}`` for :data:`TABLES`"""
+    async with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            return {
+                table: tuple((await conn.execute(
+                    text("SELECT pg_relation_size(:table), pg_indexes_size(:table)"), {"table": table}
+                )).one())
+                for table in TABLES
+            }
+        rows = await conn.execute(text(
+            "SELECT m.tbl_name, m.type, SUM(s.pgsize) FROM dbstat s JOIN sqlite_master m ON m.name = s.name "
+            "GROUP BY m.tbl_name, m.type"
+        ))
+        found = {(table, kind): size for table, kind, size in rows}
+        return {table: (found.get((table, "table"), 0), found.get((table, "index"), 0)) for table in TABLES}
+
+
+async def vacuum():
+    # On the driver connection: VACUUM can't run inside the transaction SQLAlchemy would begin
+    async with engine.connect() as conn:
+        driver = (await conn.get_raw_connection()).driver_connection
+        if conn.dialect.name == "postgresql":
+            for table in TABLES:
+                await driver.execute(f"VACUUM FULL ANALYZE {table}")
+        else:
+            await driver.execute("VACUUM")
+            await driver.execute("ANALYZE")
+
+
+async def largest_board():
+    """``(board_id, project_id)`` of the board holding the most tasks"""
+    async with AsyncSessionLocal() as db:
+        board_id = (await db.execute(
+            select(Task.board_id).group_by(Task.board_id).order_by(func.count().desc()).limit(1)
+        )).scalar_one()
+        return board_id, (await db.execute(select(Board.project_id).where(Board.id == board_id))).scalar_one()
+
+
+async def latencies(project_id, board_id, repeat):
+    """Median milliseconds of each board read"""
+    reads = {
+        "snapshot": lambda db: ProjectService.get_snapshot(db, project_id),
+        "board list": lambda db: ProjectService.list_boards(db, project_id),
+        "board page": lambda db: TaskService.list_project_tasks(db, project_id, board_id=board_id),
+        "done page": lambda db: TaskService.list_project_tasks(db, project_id, board_id=board_id, status="done"),
+        "column tails": lambda db: TaskService.get_last_ranks(db, {board_id}),
+    }
+    medians = {}
+    async with AsyncSessionLocal() as db:
+        for name, read in reads.items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                await read(db)
+                timings.append((time.perf_counter() - start) * 1000)
+            medians[name] = statistics.median(timings)
+    return medians
+
+
+def mib(size):
+    return f"{size / 2 ** 20:.1f}"
+
+
+async def run(args):
+    board_id, project_id = await largest_board()
+    before_sizes = await sizes()
+    before = await latencies(project_id, board_id, args.repeat)
+
+    async with AsyncSessionLocal() as db:
+        result = await ArchiveService.archive_done_tasks(
+            db, timedelta(days=args.after_days), batch_size=args.batch_size, pause=args.pause
+        )
+    print(f"archived {result.archived:,} tasks in {result.batches:,} batches, {result.seconds:.1f}s "
+          f"({result.archived / max(result.seconds, 1e-9):,.0f} tasks/s)")
+    if args.vacuum:
+        await vacuum()
+    after_sizes = await sizes()
+    after = await latencies(project_id, board_id, args.repeat)
+
+    print(f"\n{'table':16} {'MiB before':>11} {'MiB after':>10} {'index MiB before':>17} {'index MiB after':>16}")
+    for table in TABLES:
+        (rows_before, index_before), (rows_after, index_after) = before_sizes[table], after_sizes[table]
+        print(f"{table:16} {mib(rows_before):>11} {mib(rows_after):>10} {mib(index_before):>17} {mib(index_after):>16}")
+    print(f"\n{'board read':16} {'ms before':>10} {'ms after':>10}")
+    for name in before:
+        print(f"{name:16} {before[name]:>10.2f} {after[name]:>10.2f}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--after-days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds between batches")
+    parser.add_argument("--vacuum", action="store_true", help="compact the tables before measuring again")
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
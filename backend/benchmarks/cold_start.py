@@ -0,0 +1,112 @@
+"""Worker cold start: import time of ``app.main`` and time to first healthy response.
+
+Each sample runs in a fresh interpreter so nothing is cached in-process:
+
+* import: wall time of ``import app.main``, plus the heaviest modules
+  reported by ``python -X importtime``;
+* boot: time from spawning ``uvicorn app.main:app`` until ``/health``
+  answers 200, i.e. how soon a new pod can take traffic.
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.cold_start --runs 5
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+IMPORT_SNIPPET = (
+    "import sys, time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start); "
+    "print(','.join(name for name in ('passlib', 'jose') if name in sys.modules))"
+)
+
+
+def time_import():
+    """Seconds to import the app, and which lazily imported libraries got loaded anyway"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    return float(output[0]), output[1] if len(output) > 1 else ""
+
+
+def import_offenders(top):
+    """Packages (``app`` by subpackage) by total self time under ``-X importtime``"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    totals = defaultdict(int)
+    for line in stderr.splitlines()[1:]:
+        self_us, _, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        parts = name.split(".")
+        totals[".".join(parts[:2] if parts[0] == "app" else parts[:1])] += int(self_us)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_boot(timeout=30.0):
+    """Seconds from spawning uvicorn until ``/health`` returns 200"""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"server did not become healthy within {timeout:g}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+    interpreter = statistics.median(
+        _timed([sys.executable, "-c", "pass"]) for _ in range(args.runs)
+    )
+    imports = [time_import() for _ in range(args.runs)]
+    print(f"interpreter startup  {interpreter * 1000:8.1f} ms")
+    print(f"import app.main      {statistics.median(t for t, _ in imports) * 1000:8.1f} ms (median of {args.runs})")
+    loaded = imports[-1][1]
+    print(f"eagerly loaded       {loaded or 'none of passlib, jose'}")
+
+    boots = [time_boot() for _ in range(args.runs)]
+    print(f"first healthy /health {statistics.median(boots) * 1000:7.1f} ms (median, max {max(boots) * 1000:.1f} ms)")
+
+    print("\nheaviest imports (self time by package):")
+    for name, micros in import_offenders(args.top):
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+
+def _timed(command):
+    start = time.perf_counter()
+    subprocess.run(command, check=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
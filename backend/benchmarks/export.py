@@ -0,0 +1,166 @@
+"""Peak server memory while exporting a large project.
+
+Starts ``uvicorn app.main:app`` against a database filled by
+:mod:`benchmarks.seed`, downloads the largest project through
+``GET /projects/{id}/export`` in each format (reading and discarding the
+stream), and samples the server's peak RSS (``VmHWM``) after each. The
+growth over the warmed-up server must stay under ``--max-growth-mib``
+however many tasks the project has; the run fails otherwise.
+
+``--compare-buffered`` also loads the same tasks as ORM objects into a
+list in a child process, the way a non-streaming export would, to show
+the memory that saves.
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.seed --reset --projects 1 --boards 50 --tasks 1000000
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.export --compare-buffered
+
+Linux only (reads ``/proc``).
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.security import create_access_token
+from benchmarks.cold_start import free_port
+
+RUNS = (("ndjson", False), ("csv", False), ("ndjson", True), ("csv", True))
+
+
+def peak_rss_mib(pid):
+    """Peak resident set size of ``pid`` so far"""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not available")
+
+
+async def largest_project():
+    """``(project_id, task count, a user's email)`` for the project with the most tasks"""
+    from app.db.session import AsyncSessionLocal, engine
+    from app.models.board import Board
+    from app.models.task import Task
+    from app.models.user import User
+
+    async with AsyncSessionLocal() as db:
+        project_id, count = (await db.execute(
+            select(Board.project_id, func.count())
+            .join(Task, Task.board_id == Board.id)
+            .group_by(Board.project_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )).one()
+        email = (await db.execute(select(User.email).limit(1))).scalar_one()
+    await engine.dispose()
+    return project_id, count, email
+
+
+async def buffered(project_id):
+    """Load the project's tasks into a list of ORM objects; print the peak RSS growth"""
+    from app.db.session import AsyncSessionLocal, engine
+    from app.models.board import Board
+    from app.models.task import Task
+
+    before = peak_rss_mib(os.getpid())
+    async with AsyncSessionLocal() as db:
+        tasks = (await db.execute(
+            select(Task).join(Board, Board.id == Task.board_id).where(Board.project_id == project_id)
+        )).scalars().all()
+    print(f"{peak_rss_mib(os.getpid()) - before:.1f} {len(tasks)}")
+    await engine.dispose()
+
+
+def wait_healthy(base_url, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server did not become healthy within {timeout:g}s")
+
+
+def download(client, url, fmt, gzip):
+    """Stream an export and discard it; returns ``(bytes on the wire, lines, seconds)``"""
+    headers = {"Accept-Encoding": "gzip" if gzip else "identity"}
+    start = time.perf_counter()
+    lines = 0
+    with client.stream("GET", url, params={"format": fmt}, headers=headers) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            lines += chunk.count(b"\n")
+        wire = response.num_bytes_downloaded
+    return wire, lines, time.perf_counter() - start
+
+
+def run(args):
+    project_id, count, email = asyncio.run(largest_project())
+    print(f"project {project_id}: {count:,} tasks")
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "ADMISSION_CONTROL_ENABLED": "false"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    failed = False
+    try:
+        wait_healthy(base_url)
+        token = create_access_token({"sub": email})
+        url = f"{base_url}/api/v1/projects/{project_id}/export"
+        with httpx.Client(headers={"Authorization": f"Bearer {token}"}, timeout=None) as client:
+            # Warm up every code path on a few rows' worth of the stream
+            for fmt, gzip in RUNS:
+                with client.stream("GET", url, params={"format": fmt},
+                                   headers={"Accept-Encoding": "gzip" if gzip else "identity"}) as response:
+                    next(response.iter_raw())
+            baseline = peak_rss_mib(server.pid)
+            print(f"server peak RSS after warm-up {baseline:.1f} MiB\n")
+            print(f"{'format':12} {'MiB sent':>9} {'rows':>10} {'seconds':>8} {'rows/s':>9} {'peak RSS growth':>16}")
+            for fmt, gzip in RUNS:
+                wire, lines, seconds = download(client, url, fmt, gzip)
+                rows = lines - (fmt == "csv") if not gzip else count
+                growth = peak_rss_mib(server.pid) - baseline
+                label = f"{fmt}{'+gzip' if gzip else ''}"
+                print(f"{label:12} {wire / 2 ** 20:>9.1f} {rows:>10,} {seconds:>8.1f} {rows / seconds:>9,.0f} "
+                      f"{growth:>12.1f} MiB")
+                failed |= growth > args.max_growth_mib
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.compare_buffered:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.export", "--buffered-child", str(project_id)],
+            check=True, capture_output=True, text=True,
+        ).stdout.split()
+        print(f"\nloading {int(output[1]):,} tasks into a list instead: peak RSS +{float(output[0]):.1f} MiB")
+
+    if failed:
+        sys.exit(f"peak RSS grew by more than {args.max_growth_mib:g} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-growth-mib", type=float, default=64.0)
+    parser.add_argument("--compare-buffered", action="store_true")
+    parser.add_argument("--buffered-child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.buffered_child:
+        import uuid
+
+        asyncio.run(buffered(uuid.UUID(args.buffered_child)))
+        return
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Throughput of bulk task imports.
+
+Writes ``--rows`` generated tasks for the first project of a database
+filled by :mod:`benchmarks.seed` to a file in each format (assignees
+picked from the existing users, with ``--invalid`` of the rows broken so
+they are rejected), imports each with
+:meth:`ImportService.import_tasks`, the way the import CLI does, and
+reports rows per second and the process's peak RSS. ``--compare-single``
+also creates that many tasks one at a time through
+:meth:`TaskService.create_task`, as a client without the import would.
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.seed --reset --projects 1 --boards 20 --tasks 10000
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.import_tasks --rows 200000 --compare-single 2000
+
+Every run adds its tasks to the project; reseed to start over.
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import os
+import random
+import resource
+import tempfile
+import time
+import uuid
+
+import orjson
+from sqlalchemy import func, select
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.task import TaskCreate
+from app.services.import_service import ImportService
+from app.services.task_service import TaskService
+from benchmarks.seed import PRIORITIES, VERBS, WORDS
+
+COLUMNS = ["board", "title", "description", "status", "priority", "assignee_email"]
+STATUSES = ("todo", "in_progress", "done")
+
+
+def generate(rng, rows, boards, emails, invalid):
+    for _ in range(rows):
+        row = {
+            "board": rng.choice(boards),
+            "title": f"{rng.choice(VERBS)} {' '.join(rng.choices(WORDS, k=rng.randint(2, 5)))}",
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(0, 40))),
+            "status": rng.choice(STATUSES),
+            "priority": rng.choice(PRIORITIES),
+            "assignee_email": rng.choice(emails) if rng.random() < 0.85 else "",
+        }
+        if rng.random() < invalid:
+            row["status"] = "blocked"
+        yield row
+
+
+def write_file(path, fmt, rows, compress):
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            writer = csv.DictWriter(file, COLUMNS, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                file.write(orjson.dumps(row).decode() + "\n")
+    return os.path.getsize(path)
+
+
+async def read_file(path, chunk_size=1 << 16):
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+async def project_fixture():
+    async with AsyncSessionLocal() as db:
+        project_id = (await db.execute(select(Project.id).order_by(Project.created_at).limit(1))).scalar_one()
+        boards = (await db.execute(select(Board.name, Board.id).where(Board.project_id == project_id))).all()
+        emails = list((await db.execute(select(User.email).limit(200))).scalars())
+    return project_id, boards, emails
+
+
+async def count_tasks(project_id):
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(
+            select(func.count()).select_from(Task).join(Board, Board.id == Task.board_id)
+            .where(Board.project_id == project_id)
+        )).scalar_one()
+
+
+async def run(args):
+    project_id, boards, emails = await project_fixture()
+    names = sorted({name for name, _ in boards})
+    print(f"project {project_id}: {len(names)} boards, {await count_tasks(project_id):,} tasks\n")
+    print(f"{'format':12} {'MiB':>7} {'rows':>9} {'imported':>9} {'rejected':>9} {'seconds':>8} {'rows/s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt, compress in (("ndjson", False), ("csv", False), ("csv", True)):
+            path = os.path.join(directory, f"tasks.{fmt}{'.gz' if compress else ''}")
+            rows = generate(random.Random(args.seed), args.rows, names, emails, args.invalid)
+            size = write_file(path, fmt, rows, compress)
+            start = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                result = await ImportService.import_tasks(
+                    db, project_id, uuid.uuid4(), fmt, read_file(path), gzip=compress
+                )
+            seconds = time.perf_counter() - start
+            label = f"{fmt}{'+gzip' if compress else ''}"
+            print(f"{label:12} {size / 2 ** 20:>7.1f} {result.rows_read:>9,} {result.rows_imported:>9,} "
+                  f"{result.rows_failed:>9,} {seconds:>8.1f} {result.rows_read / seconds:>9,.0f}")
+
+    if args.compare_single:
+        board_ids = dict(boards)
+        rng = random.Random(args.seed)
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            for row in generate(rng, args.compare_single, names, emails, 0):
+                await TaskService.create_task(db, TaskCreate(
+                    board_id=board_ids[row["board"]], title=row["title"], description=row["description"],
+                    status=row["status"], priority=row["priority"],
+                ))
+        seconds = time.perf_counter() - start
+        print(f"\none at a time: {args.compare_single:,} tasks in {seconds:.1f} s, "
+              f"{args.compare_single / seconds:,.0f} rows/s")
+    print(f"\npeak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--invalid", type=float, default=0.01, help="share of rows that fail validation")
+    parser.add_argument("--compare-single", type=int, default=0, metavar="N")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Publish-to-evict lag of the cache invalidation bus.
+
+Starts ``--workers`` buses of the configured kind (``INVALIDATION_BUS``;
+on PostgreSQL each has its own LISTEN and NOTIFY connections, as separate
+worker processes would), publishes ``--messages`` key sets from the first
+at ``--rate`` per second and reports how long the others took to evict
+them. With the in-memory bus this is the cost of the bookkeeping alone.
+
+    DATABASE_URL=postgresql://localhost/taskflow python -m benchmarks.invalidation --workers 4
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.core.invalidation import InMemoryInvalidationBus, PostgresInvalidationBus, invalidation_bus
+
+
+def make_buses(count):
+    if isinstance(invalidation_bus, PostgresInvalidationBus):
+        return [PostgresInvalidationBus(invalidation_bus.dsn, invalidation_bus.channel) for _ in range(count)]
+    network = []
+    return [InMemoryInvalidationBus(network) for _ in range(count)]
+
+
+async def run(args):
+    buses = make_buses(args.workers)
+    evicted = [0] * len(buses)
+
+    def counter(index):
+        def deliver(keys):
+            evicted[index] += len(keys or ())
+        return deliver
+
+    for index, bus in enumerate(buses):
+        await bus.start(counter(index))
+    publisher, receivers = buses[0], buses[1:]
+
+    start = time.perf_counter()
+    for n in range(args.messages):
+        publisher.publish([f"project:{n}", f"project:{n}:boards"][:args.keys])
+        # Pace by the schedule rather than sleeping a fixed interval, so slow sends don't lower the rate
+        delay = start + (n + 1) / args.rate - time.perf_counter()
+        await asyncio.sleep(max(0.0, delay))
+    deadline = time.perf_counter() + args.timeout
+    while any(bus.received < publisher.published for bus in receivers) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+
+    print(f"{type(publisher).__name__}: {publisher.published} messages to {len(receivers)} workers "
+          f"at {args.rate:g}/s")
+    for index, bus in enumerate(receivers, start=1):
+        stats = bus.stats()
+        print(f"worker {index}: received {stats['received']:5}  evicted {evicted[index]:6} keys  "
+              f"lag p50 {stats['lag_ms_p50']} ms  p99 {stats['lag_ms_p99']} ms  max {stats['lag_ms_max']} ms")
+    for bus in buses:
+        await bus.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4, help="buses, including the publisher")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=500.0, help="commits published per second")
+    parser.add_argument("--keys", type=int, default=2, choices=[1, 2], help="keys per commit")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for stragglers")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Latency of unrelated endpoints during a login storm.
+
+Fires a burst of password verifications while a prober keeps calling the
+health endpoint, once with bcrypt run inline on the event loop and once on
+the hashing pool, and prints probe latency percentiles for each mode.
+
+    python -m benchmarks.login_storm --logins 40 --probes 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from httpx import AsyncClient
+
+from app.core.security import get_password_hash, password_hasher, verify_password, verify_password_async
+from app.main import app
+
+
+def percentile(samples, pct):
+    """Return the ``pct`` percentile of ``samples``."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def probe(client, count, interval):
+    """Call the health endpoint at a fixed rate and return latencies in ms.
+
+    Latency is measured from each call's scheduled start, so time spent
+    waiting for a blocked event loop counts against the probe.
+    """
+    latencies = []
+    origin = time.perf_counter()
+    for i in range(count):
+        scheduled = origin + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        response = await client.get("/api/v1/health")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+    return latencies
+
+
+async def storm(mode, logins, hashed):
+    """Verify ``logins`` passwords concurrently, inline or on the pool."""
+
+    async def login():
+        if mode == "inline":
+            return verify_password("password", hashed)
+        return await verify_password_async("password", hashed)
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+
+
+async def run(mode, logins, probes, interval):
+    """Measure probe latency while a login storm runs in ``mode``."""
+    hashed = get_password_hash("password")
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        await probe(client, 5, 0)
+        started = time.perf_counter()
+        latencies, _ = await asyncio.gather(
+            probe(client, probes, interval),
+            storm(mode, logins, hashed),
+        )
+        elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "logins": logins,
+        "elapsed_s": round(elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.01, help="seconds between probes")
+    args = parser.parse_args()
+
+    for mode in ("inline", "pool"):
+        result = asyncio.run(run(mode, args.logins, args.probes, args.interval))
+        print(
+            f"{result['mode']:>6}: {result['logins']} logins in {result['elapsed_s']}s, "
+            f"health p50={result['p50_ms']}ms p99={result['p99_ms']}ms max={result['max_ms']}ms"
+        )
+    print(f"hashing pool: {password_hasher.stats()}")
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Overhead of the request metrics middleware on the health endpoint.
+
+Two measurements, each alternating rounds between a stack with and one
+without ``MetricsMiddleware`` and comparing medians:
+
+* asgi: the application's middleware stack driven directly in-process,
+  which isolates the middleware's own cost (the worst case, as nothing
+  else is paid per request);
+* http: two uvicorn workers, ``METRICS_ENABLED`` on and off, serving
+  sequential keep-alive requests, i.e. what a client actually sees.
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.metrics_overhead --requests 5000
+"""
+
+import argparse
+import asyncio
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.cold_start import free_port
+
+from app.core.metrics import MetricsMiddleware, metrics
+from app.main import app
+
+
+def build_stacks(server_timing):
+    """ASGI apps for the full stack with metrics and the same stack without them"""
+    middleware = app.user_middleware
+    try:
+        app.user_middleware = [m for m in middleware if m.cls is not MetricsMiddleware]
+        without = app.build_middleware_stack()
+        app.user_middleware = [*app.user_middleware, _metrics_middleware(server_timing)]
+        with_metrics = app.build_middleware_stack()
+    finally:
+        app.user_middleware = middleware
+    return without, with_metrics
+
+
+def _metrics_middleware(server_timing):
+    from starlette.middleware import Middleware
+
+    return Middleware(MetricsMiddleware, server_timing=server_timing)
+
+
+async def drive(stack, path, count):
+    """Serve ``count`` GET requests; return seconds per request"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path} returned {message['status']}")
+
+    start = time.perf_counter()
+    for _ in range(count):
+        await stack({**scope, "app": app}, receive, send)
+    return (time.perf_counter() - start) / count
+
+
+async def run_asgi(path, count, rounds, server_timing):
+    without, with_metrics = build_stacks(server_timing)
+    await drive(without, path, count // 10)  # warm up
+    await drive(with_metrics, path, count // 10)
+    base, measured = [], []
+    for _ in range(rounds):
+        base.append(await drive(without, path, count))
+        measured.append(await drive(with_metrics, path, count))
+        metrics.clear()
+    return statistics.median(base), statistics.median(measured)
+
+
+def start_server(enabled, server_timing):
+    port = free_port()
+    env = {**os.environ, "METRICS_ENABLED": str(enabled).lower(), "METRICS_SERVER_TIMING": str(server_timing).lower()}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--no-access-log"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.perf_counter() + 30
+    while True:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/health")
+            connection.getresponse().read()
+            return server, connection
+        except OSError:
+            if time.perf_counter() > deadline:
+                server.terminate()
+                raise
+            time.sleep(0.05)
+
+
+def hammer(connection, path, count):
+    """Serve ``count`` sequential GET requests on one keep-alive connection; seconds per request"""
+    start = time.perf_counter()
+    for _ in range(count):
+        connection.request("GET", path)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{path} returned {response.status}")
+    return (time.perf_counter() - start) / count
+
+
+def run_http(path, count, rounds, server_timing):
+    servers = [start_server(False, False), start_server(True, server_timing)]
+    try:
+        for _, connection in servers:
+            hammer(connection, path, count // 10)  # warm up
+        base, measured = [], []
+        for _ in range(rounds):
+            base.append(hammer(servers[0][1], path, count))
+            measured.append(hammer(servers[1][1], path, count))
+        return statistics.median(base), statistics.median(measured)
+    finally:
+        for server, connection in servers:
+            connection.close()
+            server.terminate()
+            server.wait()
+
+
+def report(label, base, measured):
+    print(f"{label:5} without metrics {base * 1e6:8.1f} us/request   with metrics {measured * 1e6:8.1f} us/request   "
+          f"overhead {(measured - base) * 1e6:6.1f} us ({(measured / base - 1) * 100:+.1f}%)")
+
+
+def run(path, count, rounds, server_timing):
+    if server_timing:
+        print("Server-Timing headers on")
+    report("asgi", *asyncio.run(run_asgi(path, count, rounds, server_timing)))
+    report("http", *run_http(path, count, rounds, server_timing))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/api/v1/health")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--server-timing", action="store_true")
+    args = parser.parse_args()
+    run(args.path, args.requests, args.rounds, args.server_timing)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Tail latency under overload, with and without admission control.
+
+Seeds the load-test project, measures what one worker sustains on a
+scenario of :mod:`benchmarks.load` (closed model, ``--concurrency``
+workers), then offers ``--overload`` times that rate for ``--seconds`` in
+the open model, once against the bare app and once behind
+:class:`~app.core.admission.AdmissionControlMiddleware` with the limits
+from the settings. Latency counts from each request's scheduled start.
+
+Without admission control every request is accepted and waits its turn,
+so latency grows for as long as the overload lasts (and that pass takes
+many times ``--seconds`` to drain). With it, the excess is answered at
+once with 429/503 and the admitted requests' p99 stays near the unloaded
+figure.
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.overload --scenario task_list --overload 5
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+# First, so the bare app is built without admission control
+from benchmarks.load import SCENARIOS, run_closed, seed
+from app.core.admission import AdmissionControlMiddleware, ConcurrencyLimits, MemoryRateLimitBackend, pool_capacity
+from app.core.config import settings
+from app.db.session import engine
+from app.main import app
+from benchmarks.login_storm import percentile
+
+
+def guarded(max_in_flight, route_share):
+    """The app behind admission control configured as in production"""
+    return AdmissionControlMiddleware(
+        app,
+        backend=MemoryRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS),
+        limits=ConcurrencyLimits(max_in_flight, max(1, round(max_in_flight * route_share))),
+        routes=app.router.routes,
+        user_rate=(settings.RATE_LIMIT_USER_PER_MINUTE / 60, settings.RATE_LIMIT_USER_BURST),
+        ip_rate=(settings.RATE_LIMIT_IP_PER_MINUTE / 60, settings.RATE_LIMIT_IP_BURST),
+    )
+
+
+async def offer(asgi_app, requests, rate):
+    """Start ``requests`` at ``rate`` per second; returns ``(latency, status)`` per request"""
+    results = []
+    origin = time.perf_counter()
+    transport = ASGITransport(app=asgi_app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+
+        async def timed(index, request):
+            scheduled = origin + index / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            method, url, kwargs = request
+            response = await client.request(method, url, **kwargs)
+            results.append((time.perf_counter() - scheduled, response.status_code))
+
+        await asyncio.gather(*(timed(index, request) for index, request in enumerate(requests)))
+    return results
+
+
+def summary(label, results, seconds):
+    admitted = [latency for latency, status in results if status < 400]
+    shed = [latency for latency, status in results if status in (429, 503)]
+    errors = len(results) - len(admitted) - len(shed)
+    line = f"{label:22} goodput {len(admitted) / seconds:8.1f} req/s  shed {len(shed):6}  errors {errors:4}"
+    if admitted:
+        line += f"  ok p50 {percentile(admitted, 50) * 1000:8.1f} ms  p99 {percentile(admitted, 99) * 1000:8.1f} ms"
+    if shed:
+        line += f"  shed p99 {percentile(shed, 99) * 1000:6.1f} ms"
+    print(line)
+
+
+async def run(args):
+    fixture = await seed(args.users, args.boards, args.tasks_per_board)
+    rng = random.Random(args.seed)
+    build = SCENARIOS[args.scenario]
+
+    def batch(count):
+        requests = []
+        for index in range(count):
+            method, url, kwargs = build(fixture, rng)
+            # Spread the load over every user, as many clients would
+            headers = {"Authorization": f"Bearer {fixture.tokens[index % len(fixture.tokens)]}"}
+            requests.append((method, url, {**kwargs, "headers": {**kwargs.get("headers", {}), **headers}}))
+        return requests
+
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        await run_closed(client, batch(args.warmup), args.concurrency)
+        start = time.perf_counter()
+        latencies, _ = await run_closed(client, batch(args.capacity_requests), args.concurrency)
+        capacity = len(latencies) / (time.perf_counter() - start)
+    print(f"{args.scenario}: capacity {capacity:.1f} req/s, unloaded p99 {percentile(latencies, 99) * 1000:.1f} ms")
+
+    rate = capacity * args.overload
+    count = int(rate * args.seconds)
+    print(f"offering {rate:.1f} req/s ({args.overload:g}x) for {args.seconds:g}s\n")
+    max_in_flight = args.max_in_flight or pool_capacity()
+    for label, target in (
+        ("no admission control", app),
+        (f"admission ({max_in_flight} in flight)", guarded(max_in_flight, settings.ADMISSION_ROUTE_SHARE)),
+    ):
+        started = time.perf_counter()
+        results = await offer(target, batch(count), rate)
+        summary(label, results, time.perf_counter() - started)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=["auth", "snapshot", "task_list"], default="task_list")
+    parser.add_argument("--overload", type=float, default=5.0, help="multiple of the measured capacity to offer")
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=8, help="workers when measuring capacity")
+    parser.add_argument("--capacity-requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--max-in-flight", type=int, help="defaults to the pool size, as in production")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--boards", type=int, default=5)
+    parser.add_argument("--tasks-per-board", type=int, default=300)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Full-text task search against an ILIKE scan.
+
+Seeds one project with a synthetic corpus, then times the search service
+and an equivalent ``ILIKE '%term%'`` query for a handful of terms.
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.search --tasks 1000000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from sqlalchemy import insert, or_, select
+
+from app.db.base import Base
+from app.db.session import AsyncSessionLocal, engine
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.services.search_service import SearchService
+
+WORDS = (
+    "api deploy login bug docs review design release billing invoice search index cache "
+    "migration onboarding dashboard export import mobile android ios payment refund email "
+    "notification webhook token session profile avatar upload report chart metrics alert"
+).split()
+
+QUERIES = ["deploy", "billing invoice", "webh", "notification email", "zebra"]
+
+
+async def seed(count, boards=20, chunk=10000):
+    """Create one project holding ``count`` tasks; return its id."""
+    rng = random.Random(42)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", name="Bench", hashed_password="x")
+        db.add(user)
+        await db.flush()
+        project = Project(name="Bench", created_by=user.id)
+        db.add(project)
+        await db.flush()
+        board_ids = [uuid.uuid4() for _ in range(boards)]
+        await db.execute(
+            insert(Board), [{"id": board_id, "project_id": project.id, "name": "B"} for board_id in board_ids]
+        )
+        for start in range(0, count, chunk):
+            rows = [
+                {
+                    "id": uuid.uuid4(),
+                    "board_id": rng.choice(board_ids),
+                    "title": " ".join(rng.choices(WORDS, k=4)),
+                    "description": " ".join(rng.choices(WORDS, k=30)),
+                }
+                for _ in range(min(chunk, count - start))
+            ]
+            await db.execute(insert(Task), rows)
+        await db.commit()
+        return project.id
+
+
+async def median_ms(fn, term, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn(term)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def run(count, repeat):
+    start = time.perf_counter()
+    project_id = await seed(count)
+    print(f"seeded {count:,} tasks in {time.perf_counter() - start:.1f}s")
+
+    async with AsyncSessionLocal() as db:
+        board_ids = select(Board.id).where(Board.project_id == project_id)
+
+        async def fts(term):
+            await SearchService.search_project_tasks(db, project_id, term, limit=20)
+
+        async def scan(term):
+            pattern = f"%{term.split()[-1]}%"
+            await db.execute(
+                select(Task)
+                .where(Task.board_id.in_(board_ids))
+                .where(or_(Task.title.ilike(pattern), Task.description.ilike(pattern)))
+                .order_by(Task.updated_at.desc())
+                .limit(20)
+            )
+
+        print(f"{'query':<20} {'search ms':>10} {'ilike ms':>10}")
+        for term in QUERIES:
+            searched = await median_ms(fts, term, repeat)
+            scanned = await median_ms(scan, term, repeat)
+            print(f"{term:<20} {searched:>10.2f} {scanned:>10.2f}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Serializing a large task list: ORM + Pydantic + json against rows + orjson.
+
+Seeds one board, then builds the same ``TaskPage`` payload two ways:
+
+* before: load ``Task`` objects, validate each into ``TaskResponse``, encode
+  the page with ``jsonable_encoder`` and the stdlib ``json`` module (what a
+  ``response_model`` endpoint with the default JSON response does);
+* after: load plain rows of ``TASK_RESPONSE_COLUMNS`` and encode their
+  dicts with orjson (what the task listing endpoint now does).
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.serialization --tasks 10000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+
+from app.core.responses import rows_to_dicts
+from app.db.base import Base
+from app.db.session import AsyncSessionLocal, engine
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.task import TaskPage, TaskResponse
+from app.services.task_service import TASK_RESPONSE_COLUMNS
+
+
+async def seed(count):
+    """Create a board holding ``count`` tasks; return its id."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", name="Bench", hashed_password="x")
+        db.add(user)
+        await db.flush()
+        project = Project(name="Bench", created_by=user.id)
+        db.add(project)
+        await db.flush()
+        board = Board(project_id=project.id, name="Bench")
+        db.add(board)
+        await db.flush()
+        await db.execute(insert(Task), [
+            {
+                "id": uuid.uuid4(),
+                "board_id": board.id,
+                "title": f"Task {i}",
+                "description": f"Description of task {i} " * 4,
+                "status": ("todo", "in_progress", "done")[i % 3],
+                "priority": ("low", "medium", "high")[i % 3],
+                "assignee": user.id,
+                "rank": f"{i:06d}",
+            }
+            for i in range(count)
+        ])
+        await db.commit()
+        return board.id
+
+
+async def before(board_id):
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        tasks = (await db.execute(select(Task).where(Task.board_id == board_id))).scalars().all()
+        fetched = time.perf_counter()
+        page = TaskPage(items=[TaskResponse.model_validate(task) for task in tasks], next_cursor=None)
+        body = json.dumps(jsonable_encoder(page)).encode()
+        return fetched - start, time.perf_counter() - fetched, body
+
+
+async def after(board_id):
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        rows = (await db.execute(select(*TASK_RESPONSE_COLUMNS).where(Task.board_id == board_id))).all()
+        fetched = time.perf_counter()
+        body = orjson.dumps({"items": rows_to_dicts(rows), "next_cursor": None})
+        return fetched - start, time.perf_counter() - fetched, body
+
+
+async def run(count, repeat):
+    board_id = await seed(count)
+    results = {}
+    for name, build in (("before", before), ("after", after)):
+        await build(board_id)  # warm up
+        timings = [await build(board_id) for _ in range(repeat)]
+        fetch = statistics.median(t[0] for t in timings)
+        encode = statistics.median(t[1] for t in timings)
+        results[name] = (fetch, encode, timings[-1][2])
+        print(
+            f"{name:6}  fetch {fetch * 1000:8.1f} ms  serialize {encode * 1000:8.1f} ms  "
+            f"total {(fetch + encode) * 1000:8.1f} ms  ({len(timings[-1][2]) / 1024:,.0f} KiB)"
+        )
+    await engine.dispose()
+
+    assert json.loads(results["before"][2]) == json.loads(results["after"][2]), "payloads differ"
+    old, new = (sum(results[name][:2]) for name in ("before", "after"))
+    print(f"speedup: {old / new:.1f}x end to end, "
+          f"{results['before'][1] / results['after'][1]:.1f}x serialization")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Throughput of the batch task endpoint against one request per task.
+
+Seeds a board, then marks every task "done" first with one PATCH per task
+and then with a single ``POST /api/v1/tasks:batch``.
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.task_batch --tasks 200
+"""
+
+import argparse
+import asyncio
+import time
+
+from httpx import AsyncClient
+
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+
+
+async def seed(count):
+    """Create a user, a board with ``count`` tasks; return (token, task ids)."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", name="Bench", hashed_password="x")
+        db.add(user)
+        await db.flush()
+        project = Project(name="Bench", created_by=user.id)
+        db.add(project)
+        await db.flush()
+        board = Board(project_id=project.id, name="Bench")
+        db.add(board)
+        await db.flush()
+        tasks = [Task(board_id=board.id, title=f"Task {i}") for i in range(count)]
+        db.add_all(tasks)
+        await db.commit()
+        return create_access_token({"sub": user.email}), [task.id for task in tasks]
+
+
+async def run(count):
+    token, ids = await seed(count)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with AsyncClient(app=app, base_url="http://bench", headers=headers) as client:
+        start = time.perf_counter()
+        for task_id in ids:
+            response = await client.patch(f"/api/v1/tasks/{task_id}", json={"status": "done"})
+            response.raise_for_status()
+        single = time.perf_counter() - start
+
+        operations = [{"op": "move", "id": str(task_id), "status": "todo"} for task_id in ids]
+        start = time.perf_counter()
+        response = await client.post("/api/v1/tasks:batch", json={"operations": operations})
+        response.raise_for_status()
+        batch = time.perf_counter() - start
+    await engine.dispose()
+
+    print(f"single-item: {count} requests in {single:.3f}s ({count / single:,.0f} tasks/s)")
+    print(f"batch:       1 request in {batch:.3f}s ({count / batch:,.0f} tasks/s)")
+    print(f"speedup:     {single / batch:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +0,0 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-import os
-
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./taskflow.db")
-
-# For async operations
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    future=True,
-    pool_pre_ping=True
-)
-
-async_session = async_sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
-
-async def get_db() -> AsyncSession:
-    async with async_session() as session:
-        yield session
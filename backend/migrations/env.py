@@ -0,0 +1,79 @@
+"""Alembic environment.
+
+Migrations run against ``DATABASE_URL`` from the application settings (or
+``sqlalchemy.url`` when set in the Alembic config) through the async
+driver the app uses. Callers that already hold a connection, such as the
+tests, can pass it as ``config.attributes["connection"]``.
+"""
+
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import get_async_url
+from app import models  # noqa: F401  (registers tables on Base.metadata)
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+target_metadata = Base.metadata
+
+# Search index objects are managed by hand-written DDL (see app.db.search)
+SEARCH_OBJECTS = {"search_vector", "ix_tasks_search_vector"}
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Keep autogenerate away from the full-text search objects"""
+    if type_ == "table" and name.startswith("tasks_fts"):
+        return False
+    return name not in SEARCH_OBJECTS
+
+
+def get_url():
+    return get_async_url(config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL)
+
+
+def do_run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of running it (``alembic upgrade --sql``)"""
+    url = get_url()
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        render_as_batch=url.get_backend_name() == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online() -> None:
+    engine = create_async_engine(get_url(), poolclass=NullPool)
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+        await connection.commit()
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    do_run_migrations(config.attributes["connection"])
+else:
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,69 @@
+"""Status transitions and daily flow rollups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("tasks") as batch:
+        batch.add_column(sa.Column("started_at", sa.DateTime()))
+
+    op.create_table(
+        "task_transitions",
+        sa.Column(
+            "id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True, autoincrement=True
+        ),
+        sa.Column("task_id", sa.Uuid(), nullable=False),
+        sa.Column("from_project_id", sa.Uuid()),
+        sa.Column("from_board_id", sa.Uuid()),
+        sa.Column("from_status", sa.String()),
+        sa.Column("to_project_id", sa.Uuid()),
+        sa.Column("to_board_id", sa.Uuid()),
+        sa.Column("to_status", sa.String()),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.Column("cycle_seconds", sa.Float()),
+    )
+    op.create_index("ix_task_transitions_task", "task_transitions", ["task_id", "id"])
+    op.create_index(
+        "ix_task_transitions_to_project_occurred", "task_transitions", ["to_project_id", "occurred_at"]
+    )
+    op.create_index(
+        "ix_task_transitions_from_project_occurred", "task_transitions", ["from_project_id", "occurred_at"]
+    )
+
+    op.create_table(
+        "flow_daily",
+        sa.Column("scope_id", sa.Uuid(), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("status", sa.String(), primary_key=True),
+        sa.Column("entered", sa.Integer(), nullable=False),
+        sa.Column("exited", sa.Integer(), nullable=False),
+    )
+
+    op.create_table(
+        "cycle_time_daily",
+        sa.Column("scope_id", sa.Uuid(), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("bucket", sa.Integer(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("total_seconds", sa.Float(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cycle_time_daily")
+    op.drop_table("flow_daily")
+    op.drop_table("task_transitions")
+    with op.batch_alter_table("tasks") as batch:
+        batch.drop_column("started_at")
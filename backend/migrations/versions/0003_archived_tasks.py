@@ -0,0 +1,39 @@
+"""Archive table for long-done tasks
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_tasks",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("board_id", sa.Uuid(), sa.ForeignKey("boards.id"), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("assignee", sa.Uuid(), sa.ForeignKey("users.id")),
+        sa.Column("priority", sa.String()),
+        sa.Column("status", sa.String()),
+        sa.Column("rank", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("change_seq", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_archived_tasks_board_updated", "archived_tasks", ["board_id", "updated_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("archived_tasks")
@@ -0,0 +1,115 @@
+"""Key the SQLite search index by task id
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+The FTS5 index pointed at the implicit rowid of ``tasks``, which VACUUM
+may renumber because the table's primary key is a UUID. It now points at
+``tasks_fts_keys``, whose INTEGER PRIMARY KEY is stable, and is rebuilt.
+PostgreSQL is unaffected.
+"""
+
+from alembic import op
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+TRIGGERS = ("tasks_fts_insert", "tasks_fts_delete", "tasks_fts_update")
+
+SQLITE_SEARCH = [
+    "CREATE TABLE tasks_fts_keys (id INTEGER PRIMARY KEY, task_id NOT NULL UNIQUE)",
+    """
+    CREATE VIEW tasks_fts_content AS
+    SELECT tasks_fts_keys.id AS id, tasks.title AS title, tasks.description AS description
+    FROM tasks_fts_keys JOIN tasks ON tasks.id = tasks_fts_keys.task_id
+    """,
+    """
+    CREATE VIRTUAL TABLE tasks_fts USING fts5(
+        title, description, content='tasks_fts_content', content_rowid='id',
+        prefix='2 3', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts_keys(task_id) VALUES (new.id);
+        INSERT INTO tasks_fts(rowid, title, description)
+        SELECT id, new.title, new.description FROM tasks_fts_keys WHERE task_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        SELECT 'delete', id, old.title, old.description FROM tasks_fts_keys WHERE task_id = old.id;
+        DELETE FROM tasks_fts_keys WHERE task_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        SELECT 'delete', id, old.title, old.description FROM tasks_fts_keys WHERE task_id = old.id;
+        INSERT INTO tasks_fts(rowid, title, description)
+        SELECT id, new.title, new.description FROM tasks_fts_keys WHERE task_id = new.id;
+    END
+    """,
+    "INSERT INTO tasks_fts_keys(task_id) SELECT id FROM tasks",
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+]
+
+# As created by 0001
+SQLITE_ROWID_SEARCH = [
+    """
+    CREATE VIRTUAL TABLE tasks_fts USING fts5(
+        title, description, content='tasks', content_rowid='rowid',
+        prefix='2 3', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description)
+        VALUES (new.rowid, new.title, new.description);
+    END
+    """,
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+]
+
+
+def _drop_search() -> None:
+    for trigger in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS tasks_fts")
+    op.execute("DROP VIEW IF EXISTS tasks_fts_content")
+    op.execute("DROP TABLE IF EXISTS tasks_fts_keys")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _drop_search()
+    for statement in SQLITE_SEARCH:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _drop_search()
+    for statement in SQLITE_ROWID_SEARCH:
+        op.execute(statement)
@@ -1,52 +1,56 @@
 """Pytest configuration and fixtures"""
 
+import os
+
+# Point the application at the test database before it builds its engine
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./test_db.sqlite")
+# Cheap bcrypt cost keeps hashing-heavy tests fast
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Count statements per request; tests marked query_budget enforce their own limit
+os.environ.setdefault("QUERY_BUDGET", "50")
+# Every test authenticates as the same user; admission control is tested on its own app
+os.environ.setdefault("ADMISSION_CONTROL_ENABLED", "false")
+
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.testclient import TestClient
-from app.database import Base, get_db
+from app.core.principal import principal_cache
+from app.core.security import create_access_token
+from app.db.query_budget import query_budget
+from app.db.base import Base
+from app.db.session import engine, get_db
 from app.main import app
-from app.core.config import Settings
-
-
-# Create test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test_db.sqlite"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-def override_get_db():
-    """Override database dependency for tests"""
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+from app.schemas.user import UserCreate
+from app.services.user_service import UserService
 
 
 @pytest.fixture(scope="session")
-def test_db():
+async def test_db():
     """Create test database"""
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     yield
-    Base.metadata.drop_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
 
 
 @pytest.fixture
-def db_session(test_db):
+async def db_session(test_db):
     """Get test database session"""
-    connection = engine.connect()
-    transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
+    connection = await engine.connect()
+    transaction = await connection.begin()
+    session = AsyncSession(
+        bind=connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
     
     yield session
     
-    session.close()
-    transaction.rollback()
-    connection.close()
+    await session.close()
+    await transaction.rollback()
+    await connection.close()
 
 
 @pytest.fixture
@@ -60,8 +64,50 @@ def client(db_session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def forget_principals():
+    """Tokens are deterministic, so drop principals of users rolled back by earlier tests"""
+    principal_cache.clear()
+
+
+@pytest.fixture
+async def user(db_session):
+    """Create a test user"""
+    return await UserService.create_user(
+        db_session, UserCreate(email="tester@example.com", name="Tester", password="password")
+    )
+
+
+@pytest.fixture
+def auth_headers(user):
+    """Authorization headers for the test user"""
+    token = create_access_token({"sub": user.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """Fail tests marked ``query_budget(n, flag_repeats=False)`` whose requests break it
+
+    Only requests made in the test body count, not fixture setup.
+    """
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+    with query_budget.override(*marker.args, **marker.kwargs) as violations:
+        result = yield
+    if violations:
+        pytest.fail("\n\n".join(str(violation) for violation in violations), pytrace=False)
+    return result
+
+
 def pytest_configure(config):
     """Pytest configuration"""
     config.addinivalue_line(
         "markers", "asyncio: mark test as async"
     )
+    config.addinivalue_line(
+        "markers",
+        "query_budget(limit, flag_repeats=False): fail if any request in the test runs more than "
+        "limit SQL statements (or, with flag_repeats, one statement more than once)",
+    )
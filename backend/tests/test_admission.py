@@ -0,0 +1,115 @@
+"""Admission control tests."""
+
+import asyncio
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.api.v1 import dependencies
+from app.core import admission
+from app.core.admission import AdmissionControlMiddleware, ConcurrencyLimits, MemoryRateLimitBackend
+from app.core.principal import Principal
+from app.core.security import create_access_token, decode_token
+from app.db.session import get_db
+
+
+def limited_app(limits, burst=100):
+    """An app whose ``/slow/{n}`` requests wait for ``release``"""
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/fast")
+    async def fast():
+        return {}
+
+    @app.get("/me")
+    async def me(principal: Principal = Depends(dependencies.get_current_user)):
+        return {"email": principal.email}
+
+    @app.get("/slow/{n}")
+    async def slow(n: int):
+        await release.wait()
+        return {}
+
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        backend=MemoryRateLimitBackend(100),
+        limits=limits,
+        routes=app.router.routes,
+        user_rate=(0.001, burst),
+        ip_rate=(0.001, 2),
+        exempt=("/health",),
+    )
+    return app, release
+
+
+def bearer(email):
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+
+async def test_clients_are_limited_by_user_or_by_ip():
+    app, _ = limited_app(ConcurrencyLimits(10, 10), burst=3)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        ada = [await client.get("/fast", headers=bearer("ada@example.com")) for _ in range(4)]
+        assert [r.status_code for r in ada] == [200, 200, 200, 429]
+        assert ada[0].headers["X-RateLimit-Remaining"] == "2"
+        assert int(ada[-1].headers["Retry-After"]) > 0
+
+        # Another user has a bucket of their own; a bad token counts against the IP
+        assert (await client.get("/fast", headers=bearer("grace@example.com"))).status_code == 200
+        anonymous = [await client.get("/fast", headers={"Authorization": "Bearer junk"}) for _ in range(3)]
+        assert [r.status_code for r in anonymous] == [200, 200, 429]
+        assert (await client.get("/health")).status_code == 404
+
+
+async def test_requests_over_the_concurrency_limits_are_shed_without_waiting():
+    limits = ConcurrencyLimits(max_in_flight=3, per_route=2)
+    app, release = limited_app(limits)
+    headers = bearer("ada@example.com")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        held = [asyncio.create_task(client.get(f"/slow/{n}", headers=headers)) for n in range(2)]
+        while limits.in_flight < 2:
+            await asyncio.sleep(0)
+
+        busy = await client.get("/slow/3", headers=headers)
+        assert busy.status_code == 503
+        assert busy.headers["Retry-After"] == "1"
+        assert limits.stats()["routes"] == {"/slow/{n}": 2}
+        # Other routes still have room under the overall limit
+        assert (await client.get("/fast", headers=headers)).status_code == 200
+
+        release.set()
+        assert [r.status_code for r in await asyncio.gather(*held)] == [200, 200]
+        assert (await client.get("/slow/4", headers=headers)).status_code == 200
+    assert limits.in_flight == 0 and limits.rejected == 1
+
+
+async def test_buckets_refill_at_their_rate():
+    now = [0.0]
+    backend = MemoryRateLimitBackend(10, timer=lambda: now[0])
+    assert [(await backend.take("k", 2.0, 2))[0] for _ in range(3)] == [0.0, 0.0, 0.5]
+    now[0] = 0.5
+    assert await backend.take("k", 2.0, 2) == (0.0, 0.0)
+    now[0] = 100.0
+    assert await backend.take("k", 2.0, 2) == (0.0, 1.0)
+
+
+async def test_a_token_is_decoded_once_per_request(db_session, user, monkeypatch):
+    app, _ = limited_app(ConcurrencyLimits(10, 10))
+    app.dependency_overrides[get_db] = lambda: db_session
+    decoded = []
+
+    def counting_decode(token):
+        decoded.append(token)
+        return decode_token(token)
+
+    monkeypatch.setattr(admission, "decode_token", counting_decode)
+    monkeypatch.setattr(dependencies, "decode_token", counting_decode)
+    headers = bearer(user.email)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/me", headers=headers)
+        assert response.json() == {"email": user.email}
+        assert len(decoded) == 1
+        # Afterwards the principal cache answers without decoding
+        await client.get("/me", headers=headers)
+        assert len(decoded) == 1
@@ -0,0 +1,119 @@
+"""Board analytics tests."""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.db.flow import rebuild_rollups
+from app.models.analytics import CycleTimeDaily, FlowDaily
+from app.models.board import Board
+from app.models.project import Project
+from app.services.analytics_service import _bucket_percentile
+
+
+@pytest.fixture
+async def boards(db_session, user):
+    """A project with two empty boards."""
+    project = Project(name="Flow", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    boards = [Board(project_id=project.id, name=name) for name in ("Team", "Other")]
+    db_session.add_all(boards)
+    await db_session.commit()
+    return boards
+
+
+def _work(client, headers, boards):
+    """Create five tasks, then move them around through every write path."""
+    team, other = boards
+    ids = [
+        client.post("/api/v1/tasks", json={"board_id": str(team.id), "title": f"Task {i}"}, headers=headers)
+        .json()["id"]
+        for i in range(5)
+    ]
+    client.patch(f"/api/v1/tasks/{ids[0]}", json={"status": "in_progress"}, headers=headers)
+    client.post(f"/api/v1/tasks/{ids[0]}/move", json={"status": "done"}, headers=headers)
+    client.post(f"/api/v1/tasks/{ids[1]}/move", json={"board_id": str(other.id)}, headers=headers)
+    client.delete(f"/api/v1/tasks/{ids[2]}", headers=headers)
+    operations = [
+        {"op": "move", "id": ids[3], "status": "done"},
+        {"op": "update", "id": ids[4], "changes": {"status": "in_progress"}},
+    ]
+    client.post("/api/v1/tasks:batch", json={"operations": operations}, headers=headers)
+    return ids
+
+
+async def _rollups(db_session):
+    flow = await db_session.execute(select(FlowDaily.scope_id, FlowDaily.day, FlowDaily.status,
+                                           FlowDaily.entered, FlowDaily.exited))
+    cycles = await db_session.execute(select(CycleTimeDaily.scope_id, CycleTimeDaily.day,
+                                             CycleTimeDaily.bucket, CycleTimeDaily.count))
+    return sorted(map(tuple, flow)), sorted(map(tuple, cycles))
+
+
+def test_flow_and_cycle_time_follow_every_write_path(client, auth_headers, boards):
+    """ORM and batch writes both feed the project and board rollups."""
+    team, other = boards
+    _work(client, auth_headers, boards)
+    project_url = f"/api/v1/projects/{team.project_id}/analytics"
+
+    today = client.get(f"{project_url}/flow", headers=auth_headers).json()["days"][-1]
+    assert today["day"] == datetime.utcnow().date().isoformat()
+    assert (today["todo"], today["in_progress"], today["done"], today["completed"]) == (1, 1, 2, 2)
+
+    team_today = client.get(f"{project_url}/flow", params={"board_id": str(team.id)}, headers=auth_headers)
+    assert (team_today.json()["days"][-1]["todo"], team_today.json()["days"][-1]["done"]) == (0, 2)
+
+    cycle = client.get(f"{project_url}/cycle-time", headers=auth_headers).json()
+    assert cycle["completed"] == 2
+    assert cycle["buckets"][0] == {"le_hours": 1, "count": 2}
+    assert cycle["p50_hours"] is not None
+
+
+@pytest.mark.query_budget(5, flag_repeats=True)
+async def test_flow_reads_rollups_before_and_within_the_range(client, auth_headers, boards, db_session):
+    """Earlier days set the starting levels; days without activity carry them forward."""
+    team = boards[0]
+    start = date(2025, 1, 1)
+    db_session.add_all([
+        FlowDaily(scope_id=team.id, day=start - timedelta(days=30), status="todo", entered=5, exited=0),
+        FlowDaily(scope_id=team.id, day=start + timedelta(days=1), status="todo", entered=0, exited=2),
+        FlowDaily(scope_id=team.id, day=start + timedelta(days=1), status="done", entered=2, exited=0),
+    ])
+    await db_session.commit()
+
+    params = {"board_id": str(team.id), "since": start.isoformat(), "until": "2025-01-03"}
+    response = client.get(f"/api/v1/projects/{team.project_id}/analytics/flow", params=params, headers=auth_headers)
+    assert [(day["todo"], day["done"], day["completed"]) for day in response.json()["days"]] == [
+        (5, 0, 0), (3, 2, 2), (3, 2, 0),
+    ]
+
+
+def test_range_is_validated(client, auth_headers, boards):
+    url = f"/api/v1/projects/{boards[0].project_id}/analytics/flow"
+    too_long = {"since": "2024-01-01", "until": "2025-06-01"}
+    assert client.get(url, params=too_long, headers=auth_headers).status_code == 400
+    reversed_range = {"since": "2025-06-01", "until": "2025-05-01"}
+    assert client.get(url, params=reversed_range, headers=auth_headers).status_code == 400
+    foreign_board = {"board_id": str(boards[0].project_id)}
+    assert client.get(url, params=foreign_board, headers=auth_headers).status_code == 404
+
+
+async def test_rebuild_reproduces_incremental_rollups(client, auth_headers, boards, db_session):
+    """Recomputing from the transitions gives the rollups maintained on write."""
+    _work(client, auth_headers, boards)
+    incremental = await _rollups(db_session)
+    assert incremental[0] and incremental[1]
+
+    await db_session.run_sync(rebuild_rollups, boards[0].project_id)
+    assert await _rollups(db_session) == incremental
+
+
+def test_bucket_percentiles_interpolate():
+    counts = [0] * 14
+    counts[3], counts[4] = 2, 2  # 8-24h and 24-48h
+    assert _bucket_percentile(counts, 50) == 24
+    assert _bucket_percentile(counts, 75) == 36
+    counts[-1] = 100
+    assert _bucket_percentile(counts, 99) == 2160
@@ -0,0 +1,77 @@
+"""Task archival tests."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.services.archive_service import ArchiveService
+
+
+@pytest.fixture
+async def board(db_session, user):
+    """A board with three long-done tasks, one recently done and one in progress."""
+    project = Project(name="Archive", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    board = Board(project_id=project.id, name="Board")
+    db_session.add(board)
+    await db_session.flush()
+    old = datetime.utcnow() - timedelta(days=60)
+    db_session.add_all([
+        *(Task(board_id=board.id, title=f"Old {i}", status="done", rank=f"a{i}", updated_at=old) for i in range(3)),
+        Task(board_id=board.id, title="Recent", status="done", rank="b"),
+        Task(board_id=board.id, title="Open", status="in_progress", updated_at=old),
+    ])
+    await db_session.commit()
+    return board
+
+
+def _titles(response):
+    return sorted(item["title"] for item in response.json()["items"])
+
+
+async def test_archive_moves_long_done_tasks_out_of_the_hot_set(client, auth_headers, board, db_session):
+    """Only tasks done before the cutoff move, in batches; reads skip them unless asked."""
+    run = await ArchiveService.archive_done_tasks(db_session, timedelta(days=30), batch_size=2)
+    assert (run.archived, run.batches) == (3, 2)
+
+    url = f"/api/v1/projects/{board.project_id}/tasks"
+    assert _titles(client.get(url, headers=auth_headers)) == ["Open", "Recent"]
+    first = client.get(url, params={"include_archived": True, "limit": 3}, headers=auth_headers).json()
+    rest = client.get(
+        url, params={"include_archived": True, "cursor": first["next_cursor"]}, headers=auth_headers
+    ).json()
+    assert {item["title"]: item["archived_at"] is not None for item in first["items"] + rest["items"]} == {
+        "Recent": False, "Open": False, "Old 0": True, "Old 1": True, "Old 2": True,
+    }
+
+    boards = client.get(f"/api/v1/projects/{board.project_id}/boards", headers=auth_headers).json()
+    assert boards[0]["task_count"] == 2
+    changes = client.get(f"/api/v1/projects/{board.project_id}/changes", headers=auth_headers).json()
+    assert len(changes["deleted"]) == 3
+
+    assert (await ArchiveService.archive_done_tasks(db_session, timedelta(days=30))).archived == 0
+
+
+async def test_restore_returns_a_task_to_the_end_of_its_column(client, auth_headers, board, db_session):
+    await ArchiveService.archive_done_tasks(db_session, timedelta(days=30))
+    archived = client.get(
+        f"/api/v1/projects/{board.project_id}/tasks", params={"include_archived": True}, headers=auth_headers
+    ).json()["items"]
+    task_id = next(item["id"] for item in archived if item["title"] == "Old 1")
+
+    assert client.get(f"/api/v1/tasks/{task_id}", headers=auth_headers).status_code == 404
+    found = client.get(f"/api/v1/tasks/{task_id}", params={"include_archived": True}, headers=auth_headers)
+    assert found.json()["title"] == "Old 1"
+
+    restored = client.post(f"/api/v1/tasks/{task_id}/restore", headers=auth_headers)
+    assert restored.status_code == 200
+    assert restored.json()["rank"] > "b"
+    assert client.get(f"/api/v1/tasks/{task_id}", headers=auth_headers).status_code == 200
+    assert client.post(f"/api/v1/tasks/{task_id}/restore", headers=auth_headers).status_code == 404
+
+    # The restore counts as an edit, so the next pass leaves the task alone
+    assert (await ArchiveService.archive_done_tasks(db_session, timedelta(days=30))).archived == 0
@@ -0,0 +1,34 @@
+"""Bulk loading tests."""
+
+import uuid
+
+from sqlalchemy import func, select, text
+
+from app.db.bulk import copy_rows
+from app.db.search import deferred_search_index
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+
+
+async def test_copy_rows_streams_batches_and_indexes_for_search(db_session, user):
+    """Rows arrive from a generator in batches and are searchable once the block ends."""
+    project = Project(name="Bulk", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    board = Board(project_id=project.id, name="Board")
+    db_session.add(board)
+    await db_session.flush()
+
+    rows = ((uuid.uuid4(), board.id, f"Deploy step {i}", "todo", f"{i:02}") for i in range(12))
+    conn = await db_session.connection()
+    async with deferred_search_index(conn):
+        count = await copy_rows(conn, Task.__table__, ("id", "board_id", "title", "status", "rank"), rows, 5)
+
+    assert count == 12
+    total = await db_session.scalar(select(func.count()).select_from(Task).where(Task.board_id == board.id))
+    assert total == 12
+    matches = await db_session.scalar(text("SELECT count(*) FROM tasks_fts WHERE tasks_fts MATCH 'deploy'"))
+    assert matches == 12
+    triggers = await db_session.scalars(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+    assert {"tasks_fts_insert", "tasks_fts_delete", "tasks_fts_update"} <= set(triggers)
@@ -0,0 +1,107 @@
+"""Delta-sync tests."""
+
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+
+
+@pytest.fixture
+async def project(db_session, user):
+    """A project with one board holding three tasks."""
+    project = Project(name="Sync", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    board = Board(project_id=project.id, name="Board")
+    db_session.add(board)
+    await db_session.flush()
+    db_session.add_all([Task(board_id=board.id, title=f"Task {i}") for i in range(3)])
+    await db_session.commit()
+    return project
+
+
+def changes(client, auth_headers, project, **params):
+    response = client.get(f"/api/v1/projects/{project.id}/changes", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_change_sequence_is_unique_and_increasing(db_session, project):
+    """Every write in a project gets the next number."""
+    tasks = (await db_session.execute(select(Task).order_by(Task.change_seq))).scalars().all()
+    board = (await db_session.execute(select(Board))).scalar_one()
+    assert project.change_seq == 1
+    assert board.change_seq == 2
+    assert [task.change_seq for task in tasks] == [3, 4, 5]
+
+    tasks[0].title = "Renamed"
+    await db_session.commit()
+    assert tasks[0].change_seq == 6
+
+
+def test_full_sync_then_nothing_new(client, auth_headers, project):
+    """Without a cursor everything comes back; the returned cursor is then up to date."""
+    data = changes(client, auth_headers, project)
+    assert data["project"]["name"] == "Sync"
+    assert len(data["boards"]) == 1
+    assert len(data["tasks"]) == 3
+    assert data["deleted"] == []
+    assert data["has_more"] is False
+
+    again = changes(client, auth_headers, project, since=data["next_cursor"])
+    assert again["project"] is None
+    assert again["boards"] == again["tasks"] == again["deleted"] == []
+    assert again["next_cursor"] == data["next_cursor"]
+
+
+def test_delta_returns_only_changed_rows_and_tombstones(client, auth_headers, project):
+    """Updates, batch writes and deletes after the cursor are all reported."""
+    initial = changes(client, auth_headers, project)
+    first, second, third = (task["id"] for task in initial["tasks"])
+    board_id = initial["boards"][0]["id"]
+
+    client.patch(f"/api/v1/tasks/{first}", json={"title": "Edited"}, headers=auth_headers)
+    client.delete(f"/api/v1/tasks/{second}", headers=auth_headers)
+    batch = client.post("/api/v1/tasks:batch", json={"operations": [
+        {"op": "create", "task": {"board_id": board_id, "title": "Batched"}},
+        {"op": "update", "id": third, "changes": {"priority": "high"}},
+        {"op": "delete", "id": first},
+    ]}, headers=auth_headers).json()
+    assert batch["applied"] == 3
+
+    data = changes(client, auth_headers, project, since=initial["next_cursor"])
+    assert data["project"] is None
+    assert data["boards"] == []
+    assert {task["title"] for task in data["tasks"]} == {"Task 2", "Batched"}
+    assert {(item["entity"], item["id"]) for item in data["deleted"]} == {("task", first), ("task", second)}
+
+
+def test_limit_pages_through_changes(client, auth_headers, project):
+    """Following next_cursor while has_more visits each change once."""
+    seen, cursor = [], None
+    while True:
+        data = changes(client, auth_headers, project, limit=2, **({"since": cursor} if cursor else {}))
+        seen += [("project", data["project"]["id"])] if data["project"] else []
+        seen += [("board", board["id"]) for board in data["boards"]]
+        seen += [("task", task["id"]) for task in data["tasks"]]
+        cursor = data["next_cursor"]
+        if not data["has_more"]:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+def test_changes_errors(client, auth_headers, project):
+    """Bad cursors are rejected and unknown projects are 404."""
+    response = client.get(
+        f"/api/v1/projects/{project.id}/changes", params={"since": "bogus"}, headers=auth_headers
+    )
+    assert response.status_code == 400
+
+    response = client.get(f"/api/v1/projects/{uuid.uuid4()}/changes", headers=auth_headers)
+    assert response.status_code == 404
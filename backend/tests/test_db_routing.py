@@ -0,0 +1,112 @@
+"""Primary/replica routing tests, with two SQLite files standing in."""
+
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.core.middleware import DatabaseRoutingMiddleware
+from app.db.base import Base
+from app.db.routing import begin_request_routing, end_request_routing, get_request_routing, stick_to_primary
+from app.db.session import create_engine_from_url, create_session_factory
+from app.models.user import User
+
+
+@pytest.fixture
+async def engines(tmp_path):
+    """Primary and replica engines, each holding one distinguishable user."""
+    primary = create_engine_from_url(f"sqlite:///{tmp_path / 'primary.db'}", "primary")
+    replica = create_engine_from_url(f"sqlite:///{tmp_path / 'replica.db'}", "replica")
+    for name, target in (("primary", primary), ("replica", replica)):
+        async with target.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                User.__table__.insert().values(
+                    id=uuid.uuid4(), email=f"{name}@example.com", name=name, hashed_password="x"
+                )
+            )
+    yield primary, replica
+    await primary.dispose()
+    await replica.dispose()
+
+
+async def _names(session):
+    result = await session.execute(select(User.name))
+    return set(result.scalars())
+
+
+@pytest.fixture
+def routing():
+    """Track routing as if inside a request."""
+    token = begin_request_routing()
+    yield get_request_routing()
+    end_request_routing(token)
+
+
+async def test_reads_go_to_replica(engines, routing):
+    """Plain reads are served by the replica."""
+    factory = create_session_factory(*engines)
+    async with factory() as session:
+        assert await _names(session) == {"replica"}
+    assert routing.served_by == {"replica"}
+
+
+async def test_read_after_write_uses_primary(engines, routing):
+    """Once a session has written, its reads go to the primary."""
+    factory = create_session_factory(*engines)
+    async with factory() as session:
+        session.add(User(email="new@example.com", name="new", hashed_password="x"))
+        await session.commit()
+        assert await _names(session) == {"primary", "new"}
+    assert routing.wrote is True
+    assert routing.served_by == {"primary"}
+
+
+async def test_stick_to_primary(engines):
+    """The escape hatch forces reads onto the primary."""
+    factory = create_session_factory(*engines)
+    with stick_to_primary():
+        async with factory() as session:
+            assert await _names(session) == {"primary"}
+
+
+async def test_without_replica_everything_uses_primary(engines):
+    """Without a read URL the primary serves reads too."""
+    factory = create_session_factory(engines[0])
+    async with factory() as session:
+        assert await _names(session) == {"primary"}
+
+
+def test_write_sets_sticky_cookie(engines):
+    """A write keeps the client's next requests on the primary."""
+    factory = create_session_factory(*engines)
+    app = FastAPI()
+    app.add_middleware(DatabaseRoutingMiddleware, sticky_seconds=5)
+
+    async def get_session():
+        async with factory() as session:
+            yield session
+
+    @app.get("/users")
+    async def list_users(db=Depends(get_session)):
+        return sorted(await _names(db))
+
+    @app.post("/users")
+    async def create_user(db=Depends(get_session)):
+        db.add(User(email="new@example.com", name="new", hashed_password="x"))
+        await db.commit()
+        return {}
+
+    with TestClient(app) as client:
+        response = client.get("/users")
+        assert response.json() == ["replica"]
+        assert response.headers["X-DB-Served-By"] == "replica"
+
+        response = client.post("/users")
+        assert "tf_primary_until" in response.headers["set-cookie"]
+
+        response = client.get("/users")
+        assert response.json() == ["new", "primary"]
+        assert response.headers["X-DB-Served-By"] == "primary"
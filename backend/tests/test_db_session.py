@@ -0,0 +1,61 @@
+"""Database session layer tests."""
+
+import pytest
+
+from app.db.session import create_engine_from_url, get_async_url, get_pool_stats, warm_pool
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.user_service import UserService
+
+
+def test_async_url_selects_driver():
+    """Plain URLs are upgraded to their async drivers."""
+    assert get_async_url("postgresql://u:p@db/taskflow").drivername == "postgresql+asyncpg"
+    assert get_async_url("sqlite:///./x.db").drivername == "sqlite+aiosqlite"
+    assert get_async_url("postgresql+psycopg://u:p@db/t").drivername == "postgresql+psycopg"
+
+
+def test_pool_stats_endpoint(client):
+    """Pool statistics are exposed next to the health check."""
+    response = client.get("/api/v1/health/db")
+    assert response.status_code == 200
+    data = response.json()["primary"]
+    for key in ("pool", "queries", "checked_out", "waiters", "wait_time_total_ms"):
+        assert key in data
+
+
+def test_pool_stats_count_checkouts():
+    """Checkouts are counted on the engine's pool."""
+    stats = get_pool_stats()
+    assert stats["checked_out"] >= 0
+    assert stats["waiters"] == 0
+
+
+@pytest.mark.asyncio
+async def test_user_service_round_trip(db_session):
+    """UserService runs on the async session."""
+    user = await UserService.create_user(
+        db_session, UserCreate(email="ada@example.com", name="Ada", password="secret")
+    )
+    assert (await UserService.get_user_by_username(db_session, "ada@example.com")).id == user.id
+
+    updated = await UserService.update_user(db_session, user.id, UserUpdate(name="Ada L."))
+    assert updated.name == "Ada L."
+
+    assert await UserService.delete_user(db_session, user.id) is True
+    assert await UserService.get_user_by_id(db_session, user.id) is None
+
+
+async def test_warm_pool_survives_unreachable_database(caplog):
+    """A database that can't be reached is logged, not raised, so the worker still boots."""
+    broken = create_engine_from_url("sqlite:////nonexistent/dir/taskflow.db")
+    assert await warm_pool(broken, connections=3, timeout=1) == 0
+    assert "Pool warm-up" in caplog.text
+    await broken.dispose()
+
+
+async def test_warm_pool_opens_connections(test_db):
+    """Warm-up checks a connection out and returns it to the pool."""
+    from app.db.session import engine
+
+    assert await warm_pool(engine, connections=3, timeout=5) == 1  # SQLite: one is enough
+    assert get_pool_stats()["checked_out"] == 0
@@ -0,0 +1,73 @@
+"""Project export tests."""
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.services import export_service
+from app.services.archive_service import ArchiveService
+
+
+@pytest.fixture
+async def project(db_session, user):
+    """A project with five tasks over two boards, one assigned and one long done"""
+    project = Project(name="Export", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    boards = [Board(project_id=project.id, name=name) for name in ("Alpha", "Beta")]
+    db_session.add_all(boards)
+    await db_session.flush()
+    db_session.add_all([
+        Task(board_id=boards[0].id, title="Assigned", assignee=user.id, status="in_progress"),
+        Task(board_id=boards[0].id, title='Quoted, "with" commas', description="two\nlines"),
+        Task(board_id=boards[1].id, title="Plain"),
+        Task(board_id=boards[1].id, title="Old", status="done", updated_at=datetime.utcnow() - timedelta(days=90)),
+        Task(board_id=boards[1].id, title="Last"),
+    ])
+    await db_session.commit()
+    return project
+
+
+async def test_export_streams_every_task_as_ndjson_or_csv(client, auth_headers, db_session, project, monkeypatch):
+    # Several cursor batches per table
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_ROWS", 2)
+    await ArchiveService.archive_done_tasks(db_session, timedelta(days=30))
+    url = f"/api/v1/projects/{project.id}/export"
+
+    response = client.get(url, headers={**auth_headers, "Accept-Encoding": "identity"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["title"] for row in rows) == ["Assigned", "Last", "Plain", 'Quoted, "with" commas']
+    assigned = next(row for row in rows if row["title"] == "Assigned")
+    assert (assigned["board"], assigned["assignee_email"], assigned["archived_at"]) == (
+        "Alpha", "tester@example.com", None
+    )
+
+    response = client.get(url, params={"format": "csv", "include_archived": True}, headers=auth_headers)
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"].endswith(f'project-{project.id}.csv"')
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows][-1] == "Old" and rows[-1]["archived_at"]
+    assert next(row for row in rows if row["title"].startswith("Quoted"))["description"] == "two\nlines"
+
+    assert client.get(url, params={"format": "xml"}, headers=auth_headers).status_code == 422
+    missing = f"/api/v1/projects/{project.created_by}/export"
+    assert client.get(missing, headers=auth_headers).status_code == 404
+
+
+async def test_export_is_gzipped_when_accepted(client, auth_headers, project):
+    url = f"/api/v1/projects/{project.id}/export"
+    plain = client.get(url, headers={**auth_headers, "Accept-Encoding": "identity"})
+    compressed = client.get(url, headers={**auth_headers, "Accept-Encoding": "gzip, deflate"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    # The client decompresses transparently
+    assert compressed.text == plain.text
+    refused = client.get(url, headers={**auth_headers, "Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in refused.headers
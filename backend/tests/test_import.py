@@ -0,0 +1,116 @@
+"""Bulk task import tests."""
+
+import gzip
+import uuid
+
+import orjson
+import pytest
+from sqlalchemy import select
+
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.services import import_service
+from app.services.import_service import ImportService
+
+CSV = (
+    "board,title,description,status,priority,assignee_email\n"
+    "Alpha,First,,,,tester@example.com\n"
+    'Alpha,"Quoted, ""with"" commas","two\nlines",in_progress,high,\n'
+    "Gamma,No such board,,,,\n"
+    "Beta,Bad status,,blocked,,\n"
+    "Beta,Nobody,,,,nobody@example.com\n"
+    "Beta,Last,,done,low,\n"
+).encode()
+
+
+@pytest.fixture
+async def project(db_session, user):
+    """A project with boards Alpha and Beta, and one task already on Alpha"""
+    project = Project(name="Import", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    boards = [Board(project_id=project.id, name=name, order=order) for order, name in enumerate(("Alpha", "Beta"))]
+    db_session.add_all(boards)
+    await db_session.flush()
+    db_session.add(Task(board_id=boards[0].id, title="Existing", rank="i"))
+    await db_session.commit()
+    return project
+
+
+async def project_tasks(db_session, project):
+    rows = await db_session.execute(
+        select(Task, Board.name).join(Board, Board.id == Task.board_id)
+        .where(Board.project_id == project.id)
+        .order_by(Board.order, Task.status, Task.rank)
+    )
+    return [(board, task) for task, board in rows]
+
+
+async def test_csv_import_writes_valid_rows_and_reports_the_rest(
+    client, auth_headers, db_session, user, project, monkeypatch
+):
+    # Several batches, and rows split across upload chunks
+    monkeypatch.setattr(import_service, "IMPORT_BATCH_ROWS", 2)
+    url = f"/api/v1/projects/{project.id}/imports/{uuid.uuid4()}"
+    chunks = [CSV[offset:offset + 7] for offset in range(0, len(CSV), 7)]
+
+    response = client.put(url, params={"format": "csv"}, content=iter(chunks), headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["status"], body["rows_read"], body["rows_imported"], body["rows_failed"]) == (
+        "completed", 6, 3, 3
+    )
+    assert [error["row"] for error in body["errors"]] == [3, 4, 5]
+    assert body["errors"][0]["error"] == "board: No board named 'Gamma' in this project"
+    assert body["errors"][1]["error"].startswith("status: Input should be")
+    assert body["rows_per_second"] > 0
+
+    tasks = await project_tasks(db_session, project)
+    assert [(board, task.title, task.status) for board, task in tasks] == [
+        ("Alpha", 'Quoted, "with" commas', "in_progress"),
+        ("Alpha", "Existing", "todo"),
+        ("Alpha", "First", "todo"),
+        ("Beta", "Last", "done"),
+    ]
+    quoted, _, first, last = (task for _, task in tasks)
+    # Appended after the existing card, with the assignee resolved and change sequence stamped
+    assert first.assignee == user.id and first.started_at is None
+    assert (quoted.description, quoted.priority) == ("two\nlines", "high") and quoted.started_at
+    assert last.change_seq > first.change_seq > 0
+
+    assert client.get(url, headers=auth_headers).json() == body
+    # A finished import can't be uploaded to again
+    assert client.put(url, params={"format": "csv"}, content=CSV, headers=auth_headers).status_code == 409
+    missing = f"/api/v1/projects/{project.id}/imports/{uuid.uuid4()}"
+    assert client.get(missing, headers=auth_headers).status_code == 404
+
+
+async def test_interrupted_import_resumes_without_duplicates(client, auth_headers, db_session, project, monkeypatch):
+    monkeypatch.setattr(import_service, "IMPORT_BATCH_ROWS", 2)
+    rows = [{"board": "Beta", "title": f"Card {n}", "priority": "low", "rank": "ignored"} for n in range(5)]
+    data = b"".join(orjson.dumps(row) + b"\n" for row in rows)
+    import_id = uuid.uuid4()
+
+    async def dropped():
+        # Three and a half rows arrive, then the connection goes
+        yield data[:data.index(b"Card 3") + 3]
+        raise ConnectionResetError
+
+    with pytest.raises(ConnectionResetError):
+        await ImportService.import_tasks(db_session, project.id, import_id, "ndjson", dropped())
+    progress = await ImportService.get_import(db_session, import_id)
+    assert (progress.status, progress.rows_read, progress.rows_imported) == ("running", 2, 2)
+
+    url = f"/api/v1/projects/{project.id}/imports/{import_id}"
+    headers = {**auth_headers, "Content-Encoding": "gzip"}
+    response = client.put(url, content=gzip.compress(data), headers=headers)
+    assert response.status_code == 200
+    assert (response.json()["rows_read"], response.json()["rows_imported"]) == (5, 5)
+    titles = [task.title for board, task in await project_tasks(db_session, project) if board == "Beta"]
+    assert titles == [f"Card {n}" for n in range(5)]
+
+    # A different format or a body that isn't gzip is refused
+    other = f"/api/v1/projects/{project.id}/imports/{uuid.uuid4()}"
+    assert client.put(other, content=b"not gzip", headers=headers).status_code == 400
+    assert client.put(url, params={"format": "csv"}, content=data, headers=auth_headers).status_code == 409
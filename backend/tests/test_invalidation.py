@@ -0,0 +1,68 @@
+"""Cross-worker cache invalidation tests."""
+
+import json
+
+import pytest
+
+from app.core.invalidation import MAX_PAYLOAD_BYTES, InMemoryInvalidationBus, encode, invalidation_bus
+from app.core.principal import Principal, principal_cache
+from app.core.response_cache import evict_keys, project_key, response_cache, user_key
+from app.models.project import Project
+from app.schemas.user import UserUpdate
+from app.services.user_service import UserService
+
+
+@pytest.fixture
+async def peer():
+    """Another worker's bus on the same network as this process's, recording what it receives"""
+    received = []
+    bus = InMemoryInvalidationBus(network=invalidation_bus.network)
+    await bus.start(received.append)
+    yield bus, received
+    await bus.stop()
+
+
+async def test_committed_keys_reach_other_workers(db_session, user, peer):
+    bus, received = peer
+    await UserService.update_user(db_session, user.id, UserUpdate(name="Renamed"))
+    assert received == [[user_key(user.id)]]
+
+    project = Project(name="Shared", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    # Nothing is published before the commit
+    assert len(received) == 1
+    await db_session.commit()
+
+    assert received == [[user_key(user.id)], [project_key(project.id)]]
+    stats = bus.stats()
+    assert stats["received"] == 2 and stats["lag_ms_max"] is not None
+
+
+async def test_other_workers_keys_are_evicted_locally(user, peer):
+    bus, _ = peer
+    await invalidation_bus.start(evict_keys)
+    try:
+        principal_cache.put("token", Principal(user.id, user.email, user.name, True))
+        await response_cache.backend.set(user_key(user.id), b"{}", ttl=60)
+        await response_cache.backend.set(project_key(user.id), b"{}", ttl=60)
+
+        bus.publish([user_key(user.id)])
+        assert principal_cache.get("token") is None
+        assert await response_cache.backend.get(user_key(user.id)) is None
+        assert await response_cache.backend.get(project_key(user.id)) == b"{}"
+
+        # After a lost connection everything goes
+        invalidation_bus.reset()
+        assert await response_cache.backend.get(project_key(user.id)) is None
+    finally:
+        await invalidation_bus.stop()
+        response_cache.clear()
+
+
+def test_large_key_sets_are_split_to_fit_a_notification():
+    keys = [f"project:{n:036d}:boards" for n in range(1000)]
+    messages = list(encode("origin", 1.0, keys))
+    assert len(messages) > 1
+    assert all(len(message) < MAX_PAYLOAD_BYTES + 100 for message in messages)
+    assert [key for message in messages for key in json.loads(message)["k"]] == keys
@@ -0,0 +1,108 @@
+"""Background job queue tests."""
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.jobs.queue import FAILED, JobQueue, handlers, retry_delay
+from app.jobs.worker import Worker
+from app.models.job import Job
+from app.models.project import Project
+
+
+@pytest.fixture
+def sessions(db_session):
+    """Session factory for workers, sharing the test's rolled-back connection"""
+    return lambda: AsyncSession(bind=db_session.bind, expire_on_commit=False, join_transaction_mode="create_savepoint")
+
+
+async def test_waiting_jobs_are_deduplicated_and_claimed_once(db_session):
+    first = await JobQueue.enqueue(db_session, "test.noop", {"n": 1}, dedup_key="same")
+    assert await JobQueue.enqueue(db_session, "test.noop", {"n": 2}, dedup_key="same") is None
+    assert await JobQueue.enqueue(db_session, "test.noop", delay=60) is not None
+    await db_session.commit()
+
+    claimed = await JobQueue.claim(db_session, "a", limit=10, lease=60)
+    assert [(job.id, job.payload, job.attempts) for job in claimed] == [(first, {"n": 1}, 1)]
+    assert await JobQueue.claim(db_session, "b", limit=10, lease=60) == []
+
+    # Once the first is running, the same key may be queued again
+    assert await JobQueue.enqueue(db_session, "test.noop", dedup_key="same") is not None
+    await db_session.commit()
+    assert (await JobQueue.depth(db_session))["test.noop"] == {
+        "queued": 2, "running": 1, "failed": 0, "oldest_due_seconds": pytest.approx(0, abs=5),
+    }
+
+
+async def test_failed_jobs_are_retried_then_given_up(db_session, sessions, monkeypatch):
+    calls = {"flaky": 0, "broken": 0}
+
+    async def flaky(db, fail_times):
+        calls["flaky"] += 1
+        if calls["flaky"] <= fail_times:
+            raise RuntimeError("not yet")
+
+    async def broken(db):
+        calls["broken"] += 1
+        raise ValueError("always")
+
+    monkeypatch.setitem(handlers, "test.flaky", flaky)
+    monkeypatch.setitem(handlers, "test.broken", broken)
+    await JobQueue.enqueue(db_session, "test.flaky", {"fail_times": 2})
+    broken_id = await JobQueue.enqueue(db_session, "test.broken", max_attempts=2)
+    await db_session.commit()
+
+    # One at a time: the sessions share a connection
+    worker = Worker(sessions, concurrency=1, retry_base=0, retry_max=0)
+    assert await worker.run_until_empty() == 5
+    assert calls == {"flaky": 3, "broken": 2}
+
+    remaining = (await db_session.execute(select(Job))).scalars().all()
+    assert [(job.id, job.status, job.attempts, job.last_error) for job in remaining] == [
+        (broken_id, FAILED, 2, "ValueError: always")
+    ]
+    stats = worker.stats()["kinds"]
+    assert (stats["test.flaky"]["succeeded"], stats["test.flaky"]["retried"]) == (1, 2)
+    assert (stats["test.broken"]["retried"], stats["test.broken"]["failed"]) == (1, 1)
+    assert stats["test.flaky"]["run_ms_p95"] is not None
+
+
+async def test_jobs_with_expired_leases_are_taken_over(db_session, sessions, monkeypatch):
+    ran = []
+
+    async def record(db):
+        ran.append(True)
+
+    monkeypatch.setitem(handlers, "test.record", record)
+    await JobQueue.enqueue(db_session, "test.record")
+    await db_session.commit()
+    # A worker claims the job and dies; its lease has already run out
+    [abandoned] = await JobQueue.claim(db_session, "dead", limit=1, lease=-1)
+
+    assert await Worker(sessions, concurrency=1).run_until_empty() == 1
+    assert ran == [True]
+    assert (await db_session.execute(select(Job))).scalars().all() == []
+    # The dead worker coming back can no longer settle the job
+    await JobQueue.complete(db_session, abandoned.id, "dead")
+
+
+def test_retry_delay_doubles_up_to_the_cap_with_jitter():
+    assert [retry_delay(attempts, 5, 60, rng=lambda: 1.0) for attempts in (1, 2, 3, 4, 5)] == [5, 10, 20, 40, 60]
+    assert retry_delay(1, 5, 60, rng=lambda: 0.0) == 2.5
+
+
+async def test_rollup_rebuild_is_queued_and_run_by_a_worker(client, auth_headers, db_session, sessions, user):
+    project = Project(name="Jobs", created_by=user.id)
+    db_session.add(project)
+    await db_session.commit()
+
+    url = f"/api/v1/projects/{project.id}/analytics/rebuild"
+    queued = client.post(url, headers=auth_headers)
+    assert queued.status_code == 202 and queued.json()["job_id"] is not None
+    assert client.post(url, headers=auth_headers).json() == {"job_id": None}
+    assert client.get("/api/v1/health/jobs").json()["analytics.rebuild_rollups"]["queued"] == 1
+
+    worker = Worker(sessions, concurrency=1)
+    assert await worker.run_until_empty() == 1
+    assert worker.stats()["kinds"]["analytics.rebuild_rollups"]["succeeded"] == 1
+    assert client.get("/api/v1/health/jobs").json() == {}
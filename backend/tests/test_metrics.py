@@ -0,0 +1,91 @@
+"""Request metrics tests."""
+
+import re
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.core.metrics import Histogram, MetricsMiddleware, MetricsRegistry, metrics
+from app.models.project import Project
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.clear()
+    yield metrics
+    metrics.clear()
+
+
+def sample(text, name, **labels):
+    """Value of the sample ``name`` whose labels include ``labels``"""
+    for line in text.splitlines():
+        match = re.match(r"(\w+)\{(.*)\} (\S+)$", line)
+        if match and match.group(1) == name:
+            found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2)))
+            if all(found.get(key) == value for key, value in labels.items()):
+                return float(match.group(3))
+    return None
+
+
+def test_histogram_buckets_are_cumulative():
+    """Each bucket counts every observation at or below its bound."""
+    histogram = Histogram((1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    assert list(histogram.samples()) == [
+        ("_bucket", "1", 2), ("_bucket", "5", 3), ("_bucket", "+Inf", 4), ("_sum", "", 14.5), ("_count", "", 4),
+    ]
+
+
+async def test_metrics_are_kept_per_route_template(client, auth_headers, user, db_session):
+    """Requests are grouped by route template, with their SQL statements counted."""
+    project = Project(name="Measured", created_by=user.id)
+    db_session.add(project)
+    await db_session.commit()
+
+    for _ in range(2):
+        assert client.get(f"/api/v1/projects/{project.id}", headers=auth_headers).status_code == 200
+    client.get(f"/api/v1/projects/{uuid.uuid4()}", headers=auth_headers)
+    client.get("/no/such/path")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+
+    route = {"method": "GET", "route": "/api/v1/projects/{project_id}"}
+    assert sample(text, "taskflow_http_requests_total", status="200", **route) == 2
+    assert sample(text, "taskflow_http_requests_total", status="404", **route) == 1
+    assert sample(text, "taskflow_http_requests_total", route="unmatched", status="404") == 1
+    assert sample(text, "taskflow_http_request_duration_seconds_count", **route) == 3
+    assert sample(text, "taskflow_db_statements_per_request_sum", **route) > 0
+    assert sample(text, "taskflow_http_response_size_bytes_sum", **route) > 0
+    assert str(project.id) not in text
+
+
+def test_server_timing_header(db_session):
+    """With Server-Timing on, responses report app and database time."""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        await db_session.execute(select(1))
+        await db_session.execute(select(2))
+        return {"id": item_id}
+
+    registry = MetricsRegistry()
+    app.add_middleware(MetricsMiddleware, registry=registry, server_timing=True)
+    with TestClient(app) as client:
+        response = client.get("/items/7")
+
+    timing = re.fullmatch(
+        r'app;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) statements", pool;dur=[\d.]+', response.headers["server-timing"]
+    )
+    # Both selects, plus the SAVEPOINT the test session opens first
+    assert int(timing.group(1)) >= 2
+    assert sample(registry.render(), "taskflow_db_statements_per_request_sum", route="/items/{item_id}") == int(
+        timing.group(1)
+    )
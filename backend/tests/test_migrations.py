@@ -0,0 +1,41 @@
+"""Migration tests."""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def alembic_config(url: str) -> Config:
+    config = Config(str(BACKEND / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    # Leave pytest's log capture alone
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def test_migrations_match_models(tmp_path):
+    """Upgrading a fresh database yields the models' schema; downgrading removes it."""
+    path = tmp_path / "migrated.sqlite"
+    config = alembic_config(f"sqlite:///{path}")
+    command.upgrade(config, "head")
+    # Fails if the models have changes that no migration covers
+    command.check(config)
+
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        tables = set(inspect(conn).get_table_names())
+        assert {"users", "projects", "boards", "tasks", "change_counters", "tombstones", "tasks_fts"} <= tables
+        conn.execute(text(
+            "INSERT INTO tasks (id, board_id, title, change_seq) VALUES ('1', '1', 'Migrated search', 0)"
+        ))
+        assert conn.execute(text("SELECT count(*) FROM tasks_fts WHERE tasks_fts MATCH 'migrat*'")).scalar() == 1
+
+    command.downgrade(config, "base")
+    with engine.connect() as conn:
+        assert set(inspect(conn).get_table_names()) == {"alembic_version"}
+    engine.dispose()
@@ -0,0 +1,158 @@
+"""Authenticated-principal cache tests."""
+
+import uuid
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api.v1.dependencies import get_current_user
+from app.core.cache import TTLCache
+from app.core.principal import Principal, PrincipalCache, principal_cache
+from app.core.security import create_access_token
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.user_service import UserService
+
+
+class FakeTimer:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """The oldest untouched entry goes first when the cache is full."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries():
+    """Entries are not served past their TTL."""
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=10, ttl=60, timer=timer)
+    cache.set("a", 1, ttl=5)
+    timer.now = 4
+    assert cache.get("a") == 1
+    timer.now = 6
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.fixture
+def clean_principal_cache():
+    """Start each test with an empty principal cache."""
+    principal_cache.clear()
+    principal_cache.reset_stats()
+    yield principal_cache
+    principal_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_is_cached(db_session, clean_principal_cache):
+    """Repeat lookups of one token are served from the cache until the user changes."""
+    user = await UserService.create_user(
+        db_session, UserCreate(email="grace@example.com", name="Grace", password="secret")
+    )
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": user.email})
+    )
+
+    first = await get_current_user(credentials, db_session)
+    second = await get_current_user(credentials, db_session)
+    assert first.id == second.id == user.id
+    stats = clean_principal_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    await UserService.update_user(db_session, user.id, UserUpdate(name="Grace H."))
+    assert clean_principal_cache.stats()["size"] == 0
+
+    refreshed = await get_current_user(credentials, db_session)
+    assert refreshed.name == "Grace H."
+
+
+@pytest.mark.asyncio
+async def test_principal_read_before_an_invalidation_is_not_cached(db_session, clean_principal_cache, monkeypatch):
+    """A user change landing while the user row is being read keeps the stale read out of the cache."""
+    user = await UserService.create_user(
+        db_session, UserCreate(email="ada@example.com", name="Ada", password="secret")
+    )
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": user.email})
+    )
+    get_user_by_username = UserService.get_user_by_username
+
+    async def racing_read(db, username):
+        found = await get_user_by_username(db, username)
+        clean_principal_cache.invalidate_user(user.id)
+        return found
+
+    monkeypatch.setattr(UserService, "get_user_by_username", staticmethod(racing_read))
+    assert (await get_current_user(credentials, db_session)).id == user.id
+    assert clean_principal_cache.stats()["size"] == 0
+
+    monkeypatch.setattr(UserService, "get_user_by_username", staticmethod(get_user_by_username))
+    await get_current_user(credentials, db_session)
+    assert clean_principal_cache.stats()["size"] == 1
+
+
+def test_put_after_invalidation_or_clear_is_dropped():
+    """Only principals read after the last invalidation of their user are cached."""
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    users = [uuid.uuid4() for _ in range(3)]
+    principals = [Principal(id=user_id, email=f"{n}@example.com", name=str(n), is_active=True)
+                  for n, user_id in enumerate(users)]
+
+    before = cache.generation()
+    cache.invalidate_user(users[0])
+    cache.put("a", principals[0], before)
+    cache.put("b", principals[1], before)
+    assert cache.get("a") is None and cache.get("b") == principals[1]
+
+    # Users pushed out of the bounded invalidation log still block older reads
+    before = cache.generation()
+    for user_id in users:
+        cache.invalidate_user(user_id)
+    cache.put("a", principals[0], before)
+    assert cache.get("a") is None
+    cache.put("a", principals[0], cache.generation())
+    assert cache.get("a") == principals[0]
+
+    before = cache.generation()
+    cache.clear()
+    cache.put("c", principals[2], before)
+    assert cache.get("c") is None
+
+
+@pytest.mark.asyncio
+async def test_user_changes_evict_principals_on_commit(db_session, clean_principal_cache):
+    """Any ORM write to a user evicts its principals once committed, not at flush."""
+    user = await UserService.create_user(
+        db_session, UserCreate(email="lin@example.com", name="Lin", password="secret")
+    )
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": user.email})
+    )
+    await get_current_user(credentials, db_session)
+
+    user.is_active = False
+    await db_session.flush()
+    # A read between flush and commit still sees the committed row
+    generation = clean_principal_cache.generation()
+    stale = clean_principal_cache.get(credentials.credentials)
+    assert stale.is_active
+
+    await db_session.commit()
+    assert clean_principal_cache.stats()["size"] == 0
+    clean_principal_cache.put(credentials.credentials, stale, generation)
+    assert clean_principal_cache.get(credentials.credentials) is None
+    assert not (await get_current_user(credentials, db_session)).is_active
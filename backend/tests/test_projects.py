@@ -0,0 +1,72 @@
+"""Project endpoint tests."""
+
+import uuid
+
+import pytest
+
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+
+
+@pytest.fixture
+async def project(db_session, user):
+    """A project with two boards, created out of order, and three tasks."""
+    project = Project(name="Launch", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    doing = Board(project_id=project.id, name="Doing", order=1)
+    todo = Board(project_id=project.id, name="To do", order=0)
+    db_session.add_all([doing, todo])
+    await db_session.flush()
+    db_session.add_all([
+        Task(board_id=todo.id, title="Write spec"),
+        Task(board_id=todo.id, title="Review spec"),
+        Task(board_id=doing.id, title="Build it", status="in_progress"),
+    ])
+    await db_session.commit()
+    return project
+
+
+@pytest.mark.query_budget(5, flag_repeats=True)
+def test_snapshot_groups_tasks_by_board(client, auth_headers, project):
+    """Boards come back in order with their own tasks."""
+    response = client.get(f"/api/v1/projects/{project.id}/snapshot", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["name"] == "Launch"
+    assert [board["name"] for board in data["boards"]] == ["To do", "Doing"]
+    assert [task["title"] for task in data["boards"][0]["tasks"]] == ["Write spec", "Review spec"]
+    assert [task["title"] for task in data["boards"][1]["tasks"]] == ["Build it"]
+    assert response.headers["ETag"].startswith('"')
+
+
+@pytest.mark.asyncio
+async def test_snapshot_etag_revalidation(client, auth_headers, project, db_session):
+    """An unchanged project answers 304; a change yields a new ETag."""
+    url = f"/api/v1/projects/{project.id}/snapshot"
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    board = Board(project_id=project.id, name="Done", order=2)
+    db_session.add(board)
+    await db_session.commit()
+
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_snapshot_unknown_project(client, auth_headers):
+    """Missing projects are a 404."""
+    response = client.get(f"/api/v1/projects/{uuid.uuid4()}/snapshot", headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_snapshot_requires_auth(client, project):
+    """Anonymous requests are rejected."""
+    response = client.get(f"/api/v1/projects/{project.id}/snapshot")
+    assert response.status_code == 403
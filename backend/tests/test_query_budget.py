@@ -0,0 +1,51 @@
+"""Query budget tests."""
+
+import logging
+
+import pytest
+from sqlalchemy import select
+
+from app.db.query_budget import QueryBudget, query_budget, record_queries
+from app.models.project import Project
+from app.models.user import User
+
+
+@pytest.fixture
+async def project(db_session, user):
+    project = Project(name="Budgeted", created_by=user.id)
+    db_session.add(project)
+    await db_session.commit()
+    return project
+
+
+async def test_log_skips_transaction_control_and_finds_repeats(db_session, user):
+    """Only queries are logged, and a statement run twice is reported as repeated."""
+    with record_queries() as log:
+        for _ in range(2):
+            await db_session.execute(select(User).where(User.id == user.id))
+    assert len(log) == 2
+    assert not any(statement.startswith(("BEGIN", "SAVEPOINT")) for statement, _ in log.statements)
+    assert list(log.repeated().values()) == [2]
+
+    violation = QueryBudget(limit=5, flag_repeats=True).check("test", log)
+    assert "Repeated statements:\n  2x SELECT users.id" in str(violation)
+    assert QueryBudget(limit=5).check("test", log) is None
+
+
+def test_violation_lists_the_statements(client, auth_headers, project, caplog):
+    """A request over budget is collected with its statements and logged by the middleware."""
+    url = f"/api/v1/projects/{project.id}/snapshot"
+    with caplog.at_level(logging.WARNING), query_budget.override(1) as violations:
+        assert client.get(url, headers=auth_headers).status_code == 200
+
+    assert len(violations) == 1
+    report = str(violations[0])
+    assert report.startswith(f"GET {url} ran {len(violations[0].log)} SQL statements (budget 1):")
+    assert "  1. SELECT" in report
+    assert "Query budget exceeded" in caplog.text
+
+
+@pytest.mark.query_budget(3, flag_repeats=True)
+def test_marker_budget_holds_for_cheap_requests(client, auth_headers, project):
+    """The marker applies to requests in the test body, not to fixture setup."""
+    assert client.get(f"/api/v1/projects/{project.id}/boards", headers=auth_headers).status_code == 200
@@ -0,0 +1,47 @@
+"""Fractional rank tests."""
+
+import random
+
+import pytest
+
+from app.core.ranking import MAX_RANK_LENGTH, needs_rebalance, rank_after, rank_between, spaced_ranks
+
+
+def test_rank_between_always_fits():
+    """Random inserts always find a rank strictly between the neighbours."""
+    rng = random.Random(7)
+    column = spaced_ranks(5)
+    for _ in range(2000):
+        position = rng.randint(0, len(column))
+        before = column[position - 1] if position else None
+        after = column[position] if position < len(column) else None
+        rank = rank_between(before, after)
+        assert (before is None or before < rank) and (after is None or rank < after)
+        assert not rank.endswith("0")
+        column.insert(position, rank)
+    assert column == sorted(column)
+
+
+def test_rank_between_rejects_reversed_bounds():
+    """Neighbours must be in order."""
+    with pytest.raises(ValueError):
+        rank_between("m", "c")
+
+
+def test_rank_after_stays_short():
+    """Appending many cards doesn't grow ranks."""
+    rank = None
+    for _ in range(10000):
+        following = rank_after(rank)
+        assert rank is None or following > rank
+        rank = following
+    assert len(rank) <= 6
+
+
+def test_spaced_ranks_and_rebalance_threshold():
+    """Respaced ranks are ordered, unique and short."""
+    ranks = spaced_ranks(5000)
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == 5000
+    assert not any(needs_rebalance(rank) for rank in ranks)
+    assert needs_rebalance("i" * (MAX_RANK_LENGTH + 1))
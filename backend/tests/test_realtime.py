@@ -0,0 +1,121 @@
+"""Real-time board feed tests."""
+
+import asyncio
+import uuid
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.security import create_access_token
+from app.models.board import Board
+from app.models.project import Project
+from app.realtime.broker import InMemoryBroker
+from app.realtime.hub import (
+    TASK_CREATED,
+    TASK_DELETED,
+    TASK_MOVED,
+    TASK_UPDATED,
+    BoardHub,
+    BoardSubscription,
+    task_event,
+)
+
+
+@pytest.fixture
+async def board(db_session, user):
+    """An empty board."""
+    project = Project(name="Live", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    board = Board(project_id=project.id, name="Sprint")
+    db_session.add(board)
+    await db_session.commit()
+    return board
+
+
+async def test_subscription_coalesces_events_per_task():
+    """A burst collapses to one event per task carrying its latest fields."""
+    first, second, third = (str(uuid.uuid4()) for _ in range(3))
+    subscription = BoardSubscription(max_pending=10)
+    subscription.push([
+        task_event(TASK_CREATED, {"id": first, "title": "Draft"}),
+        task_event(TASK_UPDATED, {"id": first, "title": "Final"}),
+        task_event(TASK_UPDATED, {"id": second, "priority": "high"}),
+        task_event(TASK_MOVED, {"id": second, "status": "done"}),
+        task_event(TASK_CREATED, {"id": third, "title": "Gone"}),
+        task_event(TASK_DELETED, {"id": third}),
+    ])
+
+    frame = await subscription.next_frame(tick=0)
+
+    assert frame == {"type": "events", "events": [
+        {"type": TASK_CREATED, "task": {"id": first, "title": "Final"}},
+        {"type": TASK_MOVED, "task": {"id": second, "priority": "high", "status": "done"}},
+    ]}
+
+
+async def test_slow_subscriber_gets_resync_instead_of_backlog():
+    """Falling too far behind drops the backlog for a single resync frame."""
+    subscription = BoardSubscription(max_pending=3)
+    subscription.push([task_event(TASK_CREATED, {"id": str(uuid.uuid4())}) for _ in range(5)])
+    subscription.push([task_event(TASK_CREATED, {"id": str(uuid.uuid4())})])
+
+    assert await subscription.next_frame(tick=0) == {"type": "resync"}
+
+    subscription.push([task_event(TASK_DELETED, {"id": "after"})])
+    frame = await subscription.next_frame(tick=0)
+    assert frame["events"] == [{"type": TASK_DELETED, "task": {"id": "after"}}]
+
+
+async def test_broker_shares_events_between_hubs():
+    """Events published on one worker reach subscribers on another."""
+    broker = InMemoryBroker()
+    publisher, listener = BoardHub(broker, 0, 10), BoardHub(broker, 0, 10)
+    await publisher.start()
+    await listener.start()
+    subscription = listener.subscribe("board-1")
+    other_board = listener.subscribe("board-2")
+
+    await publisher.publish("board-1", [task_event(TASK_DELETED, {"id": "x"})])
+
+    frame = await asyncio.wait_for(subscription.next_frame(0), timeout=1)
+    assert frame["events"][0]["task"] == {"id": "x"}
+    assert other_board._pending == {}
+    await publisher.stop()
+    await listener.stop()
+
+
+def test_websocket_receives_task_events(client, auth_headers, user, board):
+    """Creating, moving and deleting a task is pushed to board subscribers."""
+    token = create_access_token({"sub": user.email})
+    with client.websocket_connect(f"/ws/boards/{board.id}?token={token}") as websocket:
+        created = client.post(
+            "/api/v1/tasks", json={"board_id": str(board.id), "title": "Live task"}, headers=auth_headers
+        ).json()
+        frame = websocket.receive_json()
+        assert frame["type"] == "events"
+        assert frame["board_id"] == str(board.id)
+        assert frame["events"] == [{"type": TASK_CREATED, "task": created}]
+
+        client.post(f"/api/v1/tasks/{created['id']}/move", json={"status": "done"}, headers=auth_headers)
+        frame = websocket.receive_json()
+        assert frame["events"][0]["type"] == TASK_MOVED
+        assert frame["events"][0]["task"]["status"] == "done"
+
+        client.delete(f"/api/v1/tasks/{created['id']}", headers=auth_headers)
+        frame = websocket.receive_json()
+        assert frame["events"] == [{"type": TASK_DELETED, "task": {"id": created["id"]}}]
+
+
+def test_websocket_rejects_bad_token_and_unknown_board(client, user, board):
+    """Connections need a valid token and an existing board."""
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect(f"/ws/boards/{board.id}?token=invalid"):
+            pass
+    assert exc.value.code == 1008
+
+    token = create_access_token({"sub": user.email})
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect(f"/ws/boards/{uuid.uuid4()}?token={token}"):
+            pass
+    assert exc.value.code == 1008
@@ -0,0 +1,144 @@
+"""Response cache tests."""
+
+import asyncio
+
+import pytest
+
+from app.core.response_cache import MemoryBackend, ResponseCache, response_cache
+from app.models.board import Board
+from app.models.project import Project
+from app.schemas.user import UserUpdate
+from app.services.user_service import UserService
+
+
+@pytest.fixture(autouse=True)
+def clean_response_cache():
+    """Start each test with an empty cache and zeroed counters."""
+    response_cache.clear()
+    yield response_cache
+    response_cache.clear()
+
+
+@pytest.fixture
+async def project(db_session, user):
+    """A project with one empty board."""
+    project = Project(name="Cached", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    db_session.add(Board(project_id=project.id, name="Board"))
+    await db_session.commit()
+    return project
+
+
+async def test_single_flight_loads_once():
+    """Concurrent misses for one key share a single load."""
+    cache = ResponseCache(MemoryBackend(maxsize=10, ttl=60), ttl=60)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"body"
+
+    results = await asyncio.gather(*(cache.get_or_load("test", "key", load) for _ in range(5)))
+    assert results == [b"body"] * 5
+    assert calls == 1
+    assert await cache.get_or_load("test", "key", load) == b"body"
+    stats = cache.stats()["endpoints"]["test"]
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 4, 1)
+
+
+async def test_invalidation_during_load_is_not_overwritten():
+    """A load that races with an invalidation doesn't store its stale result."""
+    cache = ResponseCache(MemoryBackend(maxsize=10, ttl=60), ttl=60)
+    started = asyncio.Event()
+
+    async def load():
+        started.set()
+        await asyncio.sleep(0.01)
+        return b"stale"
+
+    loading = asyncio.create_task(cache.get_or_load("test", "key", load))
+    await started.wait()
+    cache.invalidate(["key"])
+    assert await loading == b"stale"
+
+    async def reload():
+        return b"fresh"
+
+    assert await cache.get_or_load("test", "key", reload) == b"fresh"
+
+
+async def test_cancelled_load_is_taken_over_by_a_waiter():
+    """Cancelling the request running a load doesn't fail the requests waiting on it."""
+    cache = ResponseCache(MemoryBackend(maxsize=10, ttl=60), ttl=60)
+    started = asyncio.Event()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        started.set()
+        await asyncio.sleep(0.01)
+        return b"body"
+
+    leader = asyncio.create_task(cache.get_or_load("test", "key", load))
+    await started.wait()
+    waiter = asyncio.create_task(cache.get_or_load("test", "key", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await waiter == b"body"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert calls == 2
+    assert await cache.get_or_load("test", "key", load) == b"body"
+    stats = cache.stats()["endpoints"]["test"]
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 1, 1)
+
+
+async def test_project_detail_is_cached_until_the_project_changes(client, auth_headers, project, db_session):
+    """Repeat reads hit the cache; a committed write evicts the key."""
+    url = f"/api/v1/projects/{project.id}"
+    assert client.get(url, headers=auth_headers).json()["name"] == "Cached"
+    assert client.get(url, headers=auth_headers).json()["name"] == "Cached"
+    assert response_cache.stats()["endpoints"]["project"]["hits"] == 1
+
+    project.name = "Renamed"
+    await db_session.commit()
+    assert client.get(url, headers=auth_headers).json()["name"] == "Renamed"
+
+    assert client.get(f"/api/v1/projects/{project.id}x", headers=auth_headers).status_code == 422
+
+
+def test_board_list_counts_follow_task_writes(client, auth_headers, project):
+    """Creating, batch-creating and deleting tasks refreshes the cached board list."""
+    url = f"/api/v1/projects/{project.id}/boards"
+    boards = client.get(url, headers=auth_headers).json()
+    assert [board["task_count"] for board in boards] == [0]
+    board_id = boards[0]["id"]
+
+    task = client.post("/api/v1/tasks", json={"board_id": board_id, "title": "One"}, headers=auth_headers).json()
+    assert client.get(url, headers=auth_headers).json()[0]["task_count"] == 1
+
+    client.post("/api/v1/tasks:batch", json={"operations": [
+        {"op": "create", "task": {"board_id": board_id, "title": "Two"}},
+        {"op": "create", "task": {"board_id": board_id, "title": "Three"}},
+    ]}, headers=auth_headers)
+    assert client.get(url, headers=auth_headers).json()[0]["task_count"] == 3
+
+    # Edits don't change counts, so the cached list stays valid
+    client.patch(f"/api/v1/tasks/{task['id']}", json={"title": "Edited"}, headers=auth_headers)
+    client.get(url, headers=auth_headers)
+    assert response_cache.stats()["endpoints"]["project_boards"]["hits"] == 1
+
+    client.delete(f"/api/v1/tasks/{task['id']}", headers=auth_headers)
+    assert client.get(url, headers=auth_headers).json()[0]["task_count"] == 2
+
+
+async def test_user_profile_is_evicted_on_update(client, auth_headers, user, db_session):
+    """Profile changes show up on the next read."""
+    assert client.get("/api/v1/users/me", headers=auth_headers).json()["name"] == "Tester"
+    await UserService.update_user(db_session, user.id, UserUpdate(name="Renamed"))
+    assert client.get("/api/v1/users/me", headers=auth_headers).json()["name"] == "Renamed"
@@ -0,0 +1,88 @@
+"""Task search tests."""
+
+import pytest
+from sqlalchemy import select, text
+
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.services.search_service import search_terms
+
+
+@pytest.fixture
+async def projects(db_session, user):
+    """Two projects with overlapping task vocabulary."""
+    mine = Project(name="Mine", created_by=user.id)
+    other = Project(name="Other", created_by=user.id)
+    db_session.add_all([mine, other])
+    await db_session.flush()
+    mine_board = Board(project_id=mine.id, name="Board")
+    other_board = Board(project_id=other.id, name="Board")
+    db_session.add_all([mine_board, other_board])
+    await db_session.flush()
+    db_session.add_all([
+        Task(board_id=mine_board.id, title="Deploy API", description="Roll out the deployment pipeline"),
+        Task(board_id=mine_board.id, title="Write docs", description="Mention the deploy steps"),
+        Task(board_id=mine_board.id, title="Fix login bug"),
+        Task(board_id=other_board.id, title="Deploy website"),
+    ])
+    await db_session.commit()
+    return mine, other
+
+
+def _search(client, headers, project, q, **params):
+    response = client.get(
+        f"/api/v1/projects/{project.id}/search", params={"q": q, **params}, headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_search_is_ranked_and_scoped(client, auth_headers, projects):
+    """Title matches outrank description matches; other projects are excluded."""
+    mine, _ = projects
+    titles = [task["title"] for task in _search(client, auth_headers, mine, "deploy")["items"]]
+    assert titles == ["Deploy API", "Write docs"]
+
+
+def test_search_matches_prefixes(client, auth_headers, projects):
+    """The last word matches as a prefix."""
+    mine, _ = projects
+    titles = [task["title"] for task in _search(client, auth_headers, mine, "log")["items"]]
+    assert titles == ["Fix login bug"]
+
+
+def test_search_pages_and_tracks_edits(client, auth_headers, projects):
+    """Results paginate, and edits are searchable immediately."""
+    mine, _ = projects
+    first = _search(client, auth_headers, mine, "deploy", limit=1)
+    assert len(first["items"]) == 1 and first["next_cursor"]
+    second = _search(client, auth_headers, mine, "deploy", limit=1, cursor=first["next_cursor"])
+    assert second["items"][0]["id"] != first["items"][0]["id"]
+
+    task_id = first["items"][0]["id"]
+    client.patch(f"/api/v1/tasks/{task_id}", json={"title": "Ship API"}, headers=auth_headers)
+    titles = [task["title"] for task in _search(client, auth_headers, mine, "ship")["items"]]
+    assert titles == ["Ship API"]
+
+
+async def test_search_survives_renumbered_rows(client, auth_headers, db_session, projects):
+    """The SQLite index follows task ids, not the implicit rowids VACUUM may renumber."""
+    mine, _ = projects
+    # Reverse the rowids, as a VACUUM is allowed to reorder them
+    await db_session.execute(text("UPDATE tasks SET rowid = -rowid"))
+    await db_session.commit()
+    titles = [task["title"] for task in _search(client, auth_headers, mine, "deploy")["items"]]
+    assert titles == ["Deploy API", "Write docs"]
+
+    deploy = (await db_session.execute(select(Task).where(Task.title == "Deploy API"))).scalar_one()
+    await db_session.delete(deploy)
+    await db_session.commit()
+    titles = [task["title"] for task in _search(client, auth_headers, mine, "deploy")["items"]]
+    assert titles == ["Write docs"]
+    assert await db_session.scalar(text("SELECT count(*) FROM tasks_fts_keys")) == 3
+
+
+def test_search_terms_strip_operators():
+    """Query syntax in user input is treated as plain words."""
+    assert search_terms('deploy" OR * NEAR(api') == ["deploy", "or", "near", "api"]
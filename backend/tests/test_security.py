@@ -0,0 +1,62 @@
+"""Password hashing tests."""
+
+import asyncio
+
+import pytest
+from passlib.hash import bcrypt
+
+from app.core.security import (
+    PasswordHasher,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
+from app.schemas.user import UserCreate
+from app.services.user_service import UserService
+
+
+@pytest.mark.asyncio
+async def test_async_hash_round_trip():
+    """Hashes made on the pool verify both ways."""
+    hashed = await get_password_hash_async("s3cret")
+    assert verify_password("s3cret", hashed)
+    assert await verify_password_async("s3cret", hashed)
+    assert not await verify_password_async("wrong", hashed)
+
+
+@pytest.mark.asyncio
+async def test_hasher_caps_concurrency():
+    """No more than max_workers calls run at once; the rest queue."""
+    hasher = PasswordHasher(max_workers=2)
+    peak = 0
+
+    def work():
+        nonlocal peak
+        peak = max(peak, hasher.running)
+        return hasher.running
+
+    try:
+        await asyncio.gather(*(hasher.run(work) for _ in range(10)))
+    finally:
+        hasher.shutdown()
+
+    stats = hasher.stats()
+    assert peak <= 2
+    assert stats["completed"] == 10
+    assert stats["queued"] == 0
+    assert stats["max_queue_depth"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_hash(db_session):
+    """A successful login replaces a hash made with a different cost."""
+    user = await UserService.create_user(
+        db_session, UserCreate(email="linus@example.com", name="Linus", password="pw")
+    )
+    user.hashed_password = bcrypt.using(rounds=5).hash("pw")
+    await db_session.commit()
+
+    authenticated = await UserService.authenticate_user(db_session, "linus@example.com", "pw")
+    assert authenticated is not None
+    assert bcrypt.from_string(authenticated.hashed_password).rounds == 4
+    assert await UserService.authenticate_user(db_session, "linus@example.com", "nope") is None
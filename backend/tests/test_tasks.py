@@ -0,0 +1,285 @@
+"""Task listing tests."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas.task import TaskResponse
+from app.services.task_service import TaskService
+
+
+@pytest.fixture
+async def board(db_session, user):
+    """A board holding 25 tasks with distinct update times, some sharing one."""
+    project = Project(name="Paging", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    board = Board(project_id=project.id, name="Backlog")
+    db_session.add(board)
+    await db_session.flush()
+    base = datetime(2024, 1, 1)
+    for i in range(25):
+        db_session.add(Task(
+            board_id=board.id,
+            title=f"Task {i}",
+            status="done" if i % 5 == 0 else "todo",
+            # Pairs of tasks share a timestamp to exercise the id tiebreaker
+            updated_at=base + timedelta(minutes=i // 2),
+        ))
+    await db_session.commit()
+    return board
+
+
+@pytest.mark.query_budget(3, flag_repeats=True)
+def test_cursor_pagination_walks_every_task_once(client, auth_headers, board):
+    """Following next_cursor visits each task exactly once, newest first."""
+    url = f"/api/v1/projects/{board.project_id}/tasks"
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+        data = client.get(url, params=params, headers=auth_headers).json()
+        seen.extend(data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 25
+    assert len({task["id"] for task in seen}) == 25
+    keys = [(task["updated_at"], task["id"]) for task in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filter_by_status(client, auth_headers, board):
+    """Filters narrow the listing."""
+    response = client.get(
+        f"/api/v1/projects/{board.project_id}/tasks",
+        params={"status": "done"},
+        headers=auth_headers,
+    )
+    data = response.json()
+    assert len(data["items"]) == 5
+    assert {task["status"] for task in data["items"]} == {"done"}
+    assert data["next_cursor"] is None
+
+
+def test_fast_listing_matches_task_schema(client, auth_headers, board):
+    """Rows serialized on the fast path look exactly like validated TaskResponses."""
+    listing = client.get(f"/api/v1/projects/{board.project_id}/tasks", headers=auth_headers).json()
+    for item in listing["items"][:3]:
+        single = client.get(f"/api/v1/tasks/{item['id']}", headers=auth_headers).json()
+        assert item == TaskResponse.model_validate(single).model_dump(mode="json") == single
+
+
+def test_bad_cursor_is_rejected(client, auth_headers, board):
+    """Cursors the API didn't issue are a 400."""
+    response = client.get(
+        f"/api/v1/projects/{board.project_id}/tasks",
+        params={"cursor": "not-a-cursor"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_single_task_crud(client, auth_headers, board):
+    """Tasks can be created, updated and deleted one at a time."""
+    response = client.post(
+        "/api/v1/tasks", json={"board_id": str(board.id), "title": "Solo"}, headers=auth_headers
+    )
+    assert response.status_code == 201
+    task_id = response.json()["id"]
+
+    response = client.patch(f"/api/v1/tasks/{task_id}", json={"status": "done"}, headers=auth_headers)
+    assert response.json()["status"] == "done"
+
+    assert client.delete(f"/api/v1/tasks/{task_id}", headers=auth_headers).status_code == 204
+    assert client.get(f"/api/v1/tasks/{task_id}", headers=auth_headers).status_code == 404
+
+
+@pytest.mark.query_budget(12, flag_repeats=True)
+def test_batch_applies_operations_with_per_item_results(client, auth_headers, board):
+    """A batch reports each operation and applies only the valid ones."""
+    listing = client.get(f"/api/v1/projects/{board.project_id}/tasks", headers=auth_headers).json()
+    ids = [task["id"] for task in listing["items"]]
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    operations = [
+        {"op": "create", "task": {"board_id": str(board.id), "title": "Batch created"}},
+        *({"op": "move", "id": task_id, "status": "done"} for task_id in ids[:10]),
+        {"op": "update", "id": ids[10], "changes": {"title": "Renamed", "priority": "high"}},
+        {"op": "delete", "id": ids[11]},
+        {"op": "delete", "id": missing},
+        {"op": "update", "id": ids[12], "changes": {"status": "bogus"}},
+        {"op": "explode"},
+    ]
+    response = client.post("/api/v1/tasks:batch", json={"operations": operations}, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["applied"], data["failed"]) == (13, 3)
+    results = data["results"]
+    assert [result["index"] for result in results] == list(range(len(operations)))
+    assert results[0]["ok"] and results[0]["id"]
+    assert results[13]["error"] == "Task not found"
+    assert "status" in results[14]["error"]
+    assert results[15]["ok"] is False
+
+    for task_id in ids[:10]:
+        assert client.get(f"/api/v1/tasks/{task_id}", headers=auth_headers).json()["status"] == "done"
+    renamed = client.get(f"/api/v1/tasks/{ids[10]}", headers=auth_headers).json()
+    assert (renamed["title"], renamed["priority"]) == ("Renamed", "high")
+    assert client.get(f"/api/v1/tasks/{ids[11]}", headers=auth_headers).status_code == 404
+    assert client.get(f"/api/v1/tasks/{results[0]['id']}", headers=auth_headers).status_code == 200
+
+
+def test_batch_applies_operations_on_one_task_in_order(client, auth_headers, ranked_board):
+    """Later operations on a task see the earlier ones, and a deleted task takes no more."""
+    x, y = (_create(client, auth_headers, ranked_board, title) for title in "XY")
+    operations = [
+        {"op": "move", "id": x["id"], "status": "done"},
+        {"op": "update", "id": x["id"], "changes": {"status": "in_progress", "title": "X2"}},
+        {"op": "delete", "id": y["id"]},
+        {"op": "update", "id": y["id"], "changes": {"title": "Gone"}},
+        {"op": "move", "id": y["id"], "status": "done"},
+    ]
+    response = client.post("/api/v1/tasks:batch", json={"operations": operations}, headers=auth_headers)
+    data = response.json()
+    assert (data["applied"], data["failed"]) == (3, 2)
+    assert [result["error"] for result in data["results"][3:]] == ["Task not found", "Task not found"]
+
+    moved = client.get(f"/api/v1/tasks/{x['id']}", headers=auth_headers).json()
+    assert (moved["title"], moved["status"]) == ("X2", "in_progress")
+    assert _column(client, auth_headers, ranked_board, "done") == []
+    assert client.get(f"/api/v1/tasks/{y['id']}", headers=auth_headers).status_code == 404
+
+
+def _column(client, headers, board, status="todo"):
+    """Titles of a column in rank order."""
+    tasks = client.get(
+        f"/api/v1/projects/{board.project_id}/tasks",
+        params={"board_id": str(board.id), "status": status, "limit": 200},
+        headers=headers,
+    ).json()["items"]
+    return [task["title"] for task in sorted(tasks, key=lambda task: task["rank"])]
+
+
+def _create(client, headers, board, title):
+    response = client.post(
+        "/api/v1/tasks", json={"board_id": str(board.id), "title": title}, headers=headers
+    )
+    return response.json()
+
+
+@pytest.fixture
+async def ranked_board(db_session, user):
+    """An empty board for ranking tests."""
+    project = Project(name="Ranks", created_by=user.id)
+    db_session.add(project)
+    await db_session.flush()
+    board = Board(project_id=project.id, name="Column")
+    db_session.add(board)
+    await db_session.commit()
+    return board
+
+
+def test_move_between_neighbours(client, auth_headers, ranked_board):
+    """New tasks append; a move lands exactly between the given neighbours."""
+    a, b, c = (_create(client, auth_headers, ranked_board, title) for title in "ABC")
+    assert _column(client, auth_headers, ranked_board) == ["A", "B", "C"]
+
+    response = client.post(
+        f"/api/v1/tasks/{c['id']}/move",
+        json={"after_id": a["id"], "before_id": b["id"]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert a["rank"] < response.json()["rank"] < b["rank"]
+    assert _column(client, auth_headers, ranked_board) == ["A", "C", "B"]
+
+    response = client.post(
+        f"/api/v1/tasks/{a['id']}/move", json={"status": "done"}, headers=auth_headers
+    )
+    assert response.json()["status"] == "done"
+    assert _column(client, auth_headers, ranked_board) == ["C", "B"]
+
+
+def test_move_rejects_reversed_neighbours(client, auth_headers, ranked_board):
+    """Neighbours given out of order are a conflict."""
+    a, b, c = (_create(client, auth_headers, ranked_board, title) for title in "ABC")
+    response = client.post(
+        f"/api/v1/tasks/{c['id']}/move",
+        json={"after_id": b["id"], "before_id": a["id"]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 409
+
+
+def test_move_next_to_one_neighbour(client, auth_headers, ranked_board):
+    """With only after_id or before_id, the task lands right beside that neighbour."""
+    a, b, c, d = (_create(client, auth_headers, ranked_board, title) for title in "ABCD")
+
+    response = client.post(f"/api/v1/tasks/{d['id']}/move", json={"after_id": a["id"]}, headers=auth_headers)
+    assert a["rank"] < response.json()["rank"] < b["rank"]
+    assert _column(client, auth_headers, ranked_board) == ["A", "D", "B", "C"]
+
+    response = client.post(f"/api/v1/tasks/{a['id']}/move", json={"before_id": c["id"]}, headers=auth_headers)
+    assert b["rank"] < response.json()["rank"] < c["rank"]
+    assert _column(client, auth_headers, ranked_board) == ["D", "B", "A", "C"]
+
+    # The moving task's own rank isn't taken as the neighbour's
+    response = client.post(f"/api/v1/tasks/{a['id']}/move", json={"after_id": b["id"]}, headers=auth_headers)
+    assert b["rank"] < response.json()["rank"] < c["rank"]
+    response = client.post(f"/api/v1/tasks/{b['id']}/move", json={"before_id": d["id"]}, headers=auth_headers)
+    assert _column(client, auth_headers, ranked_board) == ["B", "D", "A", "C"]
+    ranks = [task["rank"] for task in client.get(
+        f"/api/v1/projects/{ranked_board.project_id}/tasks", headers=auth_headers
+    ).json()["items"]]
+    assert len(set(ranks)) == 4
+
+
+def test_status_change_appends_to_the_new_column(client, auth_headers, ranked_board):
+    """Changing status by update, single or batched, ranks the task after the new column's cards."""
+    a, b, c, d = (_create(client, auth_headers, ranked_board, title) for title in "ABCD")
+    # D opens the done column with the rank A holds in todo
+    client.post(f"/api/v1/tasks/{d['id']}/move", json={"status": "done"}, headers=auth_headers)
+
+    response = client.patch(f"/api/v1/tasks/{a['id']}", json={"status": "done"}, headers=auth_headers)
+    assert response.json()["rank"] > a["rank"]
+    response = client.post(
+        "/api/v1/tasks:batch",
+        json={"operations": [
+            {"op": "update", "id": b["id"], "changes": {"status": "done"}},
+            {"op": "update", "id": c["id"], "changes": {"status": "done", "title": "C2"}},
+        ]},
+        headers=auth_headers,
+    )
+    assert all(result["ok"] for result in response.json()["results"])
+    assert _column(client, auth_headers, ranked_board, "done") == ["D", "A", "B", "C2"]
+
+    # Every rank in the column is distinct, so moving between neighbours works
+    response = client.post(
+        f"/api/v1/tasks/{c['id']}/move", json={"after_id": d["id"], "before_id": a["id"]}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert _column(client, auth_headers, ranked_board, "done") == ["D", "C2", "A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_rebalance_keeps_order(db_session, ranked_board):
+    """Respacing a column shortens ranks without reordering it."""
+    db_session.add_all([
+        Task(board_id=ranked_board.id, title="first", rank="i" + "1" * 30),
+        Task(board_id=ranked_board.id, title="second", rank="i" + "1" * 29 + "2"),
+        Task(board_id=ranked_board.id, title="unranked"),
+    ])
+    await db_session.commit()
+
+    assert await TaskService.rebalance_column(db_session, ranked_board.id, "todo") == 3
+    result = await db_session.execute(
+        select(Task.title, Task.rank).where(Task.board_id == ranked_board.id).order_by(Task.rank)
+    )
+    rows = result.all()
+    assert [row.title for row in rows] == ["first", "second", "unranked"]
+    assert all(len(row.rank) <= 2 for row in rows)